@@ -1,4 +1,4 @@
-from dataclasses import dataclass
+from dataclasses import dataclass, fields
 from enum import Enum
 
 from requests.exceptions import HTTPError
@@ -6,6 +6,7 @@ from rest_framework.authentication import SessionAuthentication
 from rest_framework.decorators import api_view, authentication_classes
 from rest_framework.response import Response
 
+from jobserver import outbox
 from jobserver.api.authentication import get_backend_from_token
 from jobserver.github import _get_github_api
 from jobserver.models import User, Workspace
@@ -89,6 +90,12 @@ class AirlockEvent:
             repo=repo,
         )
 
+    def to_task_kwargs(self):
+        """Flatten this event into kwargs the outbox can store"""
+        kwargs = {f.name: getattr(self, f.name) for f in fields(self)}
+        kwargs["event_type"] = self.event_type.name
+        return kwargs
+
     def describe_event(self):
         return self.event_type.value
 
@@ -203,6 +210,23 @@ def airlock_event_view(request):
     return Response({"status": "ok"}, status=201)
 
 
+NOTIFICATIONS = {
+    notify_fn.__name__: notify_fn
+    for notify_fns in EVENT_NOTIFICATIONS.values()
+    for notify_fn in notify_fns
+}
+
+
 def handle_notifications(airlock_event: AirlockEvent):
     for notify_fn in EVENT_NOTIFICATIONS[airlock_event.event_type]:
-        notify_fn(airlock_event)
+        outbox.enqueue(
+            send_notification,
+            notification=notify_fn.__name__,
+            **airlock_event.to_task_kwargs(),
+        )
+
+
+def send_notification(notification, event_type, **kwargs):
+    """Outbox task to run a single notification for an AirlockEvent"""
+    airlock_event = AirlockEvent(event_type=EventType[event_type], **kwargs)
+    NOTIFICATIONS[notification](airlock_event)
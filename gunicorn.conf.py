@@ -20,6 +20,12 @@ logconfig_dict = logging_config_dict
 # workers
 workers = 9
 
+# long-polling requests to JobRequestAPIList spend nearly all their time idle,
+# waiting on a per-process LISTEN connection, so use threaded workers which can
+# hold many of them open without tying up a whole process each
+worker_class = "gthread"
+threads = int(os.environ.get("GUNICORN_THREADS", "8"))
+
 # listen
 port = 8000
 bind = "0.0.0.0"
@@ -47,6 +47,7 @@ class Command(BaseCommand):
             identifier=new_id(),
             status="succeeded",
         )
+        job_request.update_from_jobs()
 
         analysis_request = AnalysisRequest.objects.create(
             created_by=user,
@@ -3,6 +3,8 @@ from rest_framework.exceptions import NotAuthenticated, PermissionDenied
 
 from jobserver.models import Backend
 
+from .token_cache import cache
+
 
 def get_backend_from_token(token):
     """
@@ -20,6 +22,9 @@ def get_backend_from_token(token):
 
         Authorization: 401f7ac837da42b97f613d789819ff93537bee6a
 
+    Backends are cached by token for a short time (see token_cache), so
+    callers which need up to date values for fields which change outside of
+    the staff area, such as sync state, should refresh them.
     """
 
     if token is None:
@@ -28,11 +33,17 @@ def get_backend_from_token(token):
     if token == "":
         raise NotAuthenticated("Authorization header is empty")
 
+    if backend := cache.get(token):
+        return backend
+
     try:
-        return Backend.objects.get(auth_token=token)
+        backend = Backend.objects.get(auth_token=token)
     except Backend.DoesNotExist:
         raise NotAuthenticated("Invalid token")
 
+    cache.set(token, backend)
+    return backend
+
 
 class NoAuthentication(BaseAuthentication):
     """Prevent authentication"""
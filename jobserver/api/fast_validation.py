@@ -0,0 +1,180 @@
+"""
+Fast validation of large payloads against DRF serializers
+
+DRF's validation machinery costs a lot per field, which adds up for payloads
+with thousands of items like a full Job sync.  validate() walks the same
+serializer definition, but handles the common field types inline and only
+calls into DRF for the fields it doesn't know about.
+
+Any data the fast path isn't sure about, including anything invalid, is
+handed to the serializer as normal.  That way validated data and error
+responses are exactly what DRF would produce.
+"""
+
+from django.core.validators import ProhibitNullCharactersValidator
+from django.utils.dateparse import parse_datetime
+from rest_framework import serializers
+from rest_framework.fields import _UnvalidatedField, empty
+from rest_framework.validators import ProhibitSurrogateCharactersValidator
+
+
+# the validators every CharField gets, which validate_char() mirrors
+CHAR_DEFAULT_VALIDATORS = (
+    ProhibitNullCharactersValidator,
+    ProhibitSurrogateCharactersValidator,
+)
+
+
+class Fallback(Exception):
+    """The fast path can't validate some data, so DRF should"""
+
+
+def validate(serializer_class, data, many=False):
+    """
+    Return serializer_class's validated data for the given data
+
+    Raises a ValidationError, as serializer.is_valid(raise_exception=True)
+    does, if the data is invalid.
+    """
+    try:
+        return validate_field(serializer_class(many=many), data)
+    except Fallback:
+        serializer = serializer_class(data=data, many=many)
+        serializer.is_valid(raise_exception=True)
+        return serializer.validated_data
+
+
+def validate_field(field, value):
+    try:
+        if value is None:
+            return field.run_validation(value)
+
+        if validator := FIELD_VALIDATORS.get(type(field)):
+            return validator(field, value)
+
+        if isinstance(field, serializers.ListSerializer):
+            return validate_list(field, value)
+
+        if isinstance(field, serializers.Serializer):
+            return validate_serializer(field, value)
+
+        return field.run_validation(value)
+    except serializers.ValidationError:
+        raise Fallback
+
+
+def validate_list(field, value):
+    if type(value) is not list or (not value and not field.allow_empty):
+        raise Fallback
+
+    if field.max_length is not None or field.min_length is not None:
+        raise Fallback
+
+    return [validate_field(field.child, item) for item in value]
+
+
+def validate_serializer(serializer, data):
+    if type(data) is not dict or serializer.validators:
+        raise Fallback
+
+    attrs = {}
+    for name, field in serializer.fields.items():
+        if field.read_only:
+            continue
+
+        # we only handle flat serializers where each field maps straight to a
+        # key in the data, without any per-field validate_<name> methods
+        if field.source != name or hasattr(serializer, f"validate_{name}"):
+            raise Fallback
+
+        if name not in data:
+            if field.required:
+                raise Fallback
+
+            if field.default is not empty:
+                attrs[name] = field.get_default()
+
+            continue
+
+        attrs[name] = validate_field(field, data[name])
+
+    try:
+        return serializer.validate(attrs)
+    except serializers.ValidationError:
+        raise Fallback
+
+
+def validate_char(field, value):
+    if type(value) is not str:
+        raise Fallback
+
+    # length limits and any validators passed in are all added to
+    # field.validators, so leave fields with more than the defaults to DRF
+    if any(not isinstance(v, CHAR_DEFAULT_VALIDATORS) for v in field.validators):
+        return field.run_validation(value)
+
+    if field.trim_whitespace:
+        value = value.strip()
+
+    if not value and not field.allow_blank:
+        raise Fallback
+
+    # mirror CharField's default validators, null characters and lone
+    # surrogates both fail encoding here
+    if "\x00" in value:
+        raise Fallback
+    try:
+        value.encode("utf-8")
+    except UnicodeEncodeError:
+        raise Fallback
+
+    return value
+
+
+def validate_datetime(field, value):
+    if type(value) is not str or getattr(field, "input_formats", None) is not None:
+        raise Fallback
+
+    try:
+        parsed = parse_datetime(value)
+    except ValueError:
+        raise Fallback
+
+    if parsed is None:
+        raise Fallback
+
+    return field.enforce_timezone(parsed)
+
+
+def validate_dict(field, value):
+    if type(value) is not dict or not isinstance(field.child, _UnvalidatedField):
+        raise Fallback
+
+    if not value and not field.allow_empty:
+        raise Fallback
+
+    return dict(value)
+
+
+def validate_integer(field, value):
+    if type(value) is not int or field.validators:
+        raise Fallback
+
+    return value
+
+
+def validate_json(field, value):
+    if field.binary:
+        raise Fallback
+
+    # parsed JSON is always serialisable, which is all JSONField checks
+    return value
+
+
+FIELD_VALIDATORS = {
+    serializers.CharField: validate_char,
+    serializers.DateTimeField: validate_datetime,
+    serializers.DictField: validate_dict,
+    serializers.IntegerField: validate_integer,
+    serializers.JSONField: validate_json,
+}
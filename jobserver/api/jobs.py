@@ -1,27 +1,34 @@
-import itertools
+import collections
+import hashlib
 import json
-import operator
 
 import structlog
-from django.db.models import Q
+from django.db import connection
 from django.http import Http404
-from django.utils import timezone
+from django.utils.cache import get_conditional_response
+from django.utils.http import quote_etag
 from rest_framework import serializers
 from rest_framework.authentication import SessionAuthentication
+from rest_framework.exceptions import ValidationError
 from rest_framework.generics import ListAPIView
 from rest_framework.response import Response
 from rest_framework.views import APIView
 
 from interactive import issues
 from interactive.slacks import notify_tech_support_of_failed_analysis
+from jobserver import api_stats, job_request_events, outbox
+from jobserver.api import fast_validation, fastjson
 from jobserver.api.authentication import get_backend_from_token
 from jobserver.emails import send_finished_notification
 from jobserver.github import _get_github_api
-from jobserver.models import JobRequest, Stats, User, Workspace
+from jobserver.models import Job, JobRequest, User, Workspace
 
 
 COMPLETED_STATES = {"failed", "succeeded"}
 
+# the longest a long-polling request to JobRequestAPIList can wait, in seconds
+MAX_WAIT = 60
+
 
 logger = structlog.get_logger(__name__)
 
@@ -44,31 +51,60 @@ class CoercingCharFieldSerializer(serializers.CharField):
 
 
 def update_stats(backend, url):
-    Stats.objects.update_or_create(
-        backend=backend,
-        url=url,
-        defaults={"api_last_seen": timezone.now()},
-    )
+    api_stats.recorder.record(backend, url)
+
+
+class JobSerializer(serializers.Serializer):
+    job_request_id = serializers.CharField()
+    identifier = serializers.CharField()
+    action = serializers.CharField(allow_blank=True)
+    run_command = CoercingCharFieldSerializer(allow_blank=True, allow_null=True)
+    status = serializers.CharField()
+    status_code = serializers.CharField(allow_blank=True)
+    status_message = serializers.CharField(allow_blank=True)
+    created_at = serializers.DateTimeField()
+    updated_at = serializers.DateTimeField(allow_null=True)
+    started_at = serializers.DateTimeField(allow_null=True)
+    completed_at = serializers.DateTimeField(allow_null=True)
+    trace_context = serializers.JSONField(allow_null=True, required=False)
+    metrics = serializers.JSONField(allow_null=True, required=False)
+
+
+class DeletedJobSerializer(serializers.Serializer):
+    job_request_id = serializers.CharField()
+    identifier = serializers.CharField()
+
+
+class DeltaSyncSerializer(serializers.Serializer):
+    cursor = serializers.DateTimeField(allow_null=True)
+    jobs = JobSerializer(many=True)
+    deleted = DeletedJobSerializer(many=True, required=False, default=list)
 
 
 class JobAPIUpdate(APIView):
+    """
+    Sync Job state from a job-runner
+
+    job-runner can POST either:
+
+     * a list of every active Job it knows about (a full sync), in which case
+       any of our Jobs for those JobRequests which aren't in the payload are
+       deleted, or
+     * an object with only the Jobs whose updated_at is at or after the
+       backend's sync cursor (a delta sync), listing any deleted Jobs
+       explicitly in `deleted`.
+
+    Both modes respond with the backend's new sync cursor.  A delta sync must
+    send the cursor it was built from, if that doesn't match the one we have
+    stored we return a 409 and job-runner should fall back to a full sync.
+    """
+
     authentication_classes = [SessionAuthentication]
-    get_github_api = staticmethod(_get_github_api)
-
-    class serializer_class(serializers.Serializer):
-        job_request_id = serializers.CharField()
-        identifier = serializers.CharField()
-        action = serializers.CharField(allow_blank=True)
-        run_command = CoercingCharFieldSerializer(allow_blank=True, allow_null=True)
-        status = serializers.CharField()
-        status_code = serializers.CharField(allow_blank=True)
-        status_message = serializers.CharField(allow_blank=True)
-        created_at = serializers.DateTimeField()
-        updated_at = serializers.DateTimeField(allow_null=True)
-        started_at = serializers.DateTimeField(allow_null=True)
-        completed_at = serializers.DateTimeField(allow_null=True)
-        trace_context = serializers.JSONField(allow_null=True, required=False)
-        metrics = serializers.JSONField(allow_null=True, required=False)
+    parser_classes = fastjson.PARSER_CLASSES
+    renderer_classes = fastjson.RENDERER_CLASSES
+
+    serializer_class = JobSerializer
+    delta_serializer_class = DeltaSyncSerializer
 
     def initial(self, request, *args, **kwargs):
         token = request.headers.get("Authorization")
@@ -79,32 +115,58 @@ class JobAPIUpdate(APIView):
         return super().initial(request, *args, **kwargs)
 
     def post(self, request, *args, **kwargs):
-        serializer = self.serializer_class(data=request.data, many=True)
-        serializer.is_valid(raise_exception=True)
+        # the Backend may have come from the token cache, so make sure we
+        # have the latest cursor
+        self.backend.refresh_from_db(fields=["jobrunner_cursor"])
+
+        if isinstance(request.data, dict):
+            data = fast_validation.validate(self.delta_serializer_class, request.data)
+
+            if data["cursor"] != self.backend.jobrunner_cursor:
+                return Response(
+                    {
+                        "detail": "Sync cursor is out of date, a full sync is required",
+                        "cursor": self.backend.jobrunner_cursor,
+                    },
+                    status=409,
+                )
 
-        # get JobRequest instances based on the identifiers in the payload
-        incoming_job_request_ids = {
-            j["job_request_id"] for j in serializer.validated_data
-        }
-        job_requests = JobRequest.objects.filter(
-            identifier__in=incoming_job_request_ids
+            incoming_jobs = data["jobs"]
+            deleted = data["deleted"]
+        else:
+            incoming_jobs = fast_validation.validate(
+                self.serializer_class, request.data, many=True
+            )
+            deleted = None
+
+        # group the incoming Jobs by their JobRequest identifier
+        jobs_by_request = collections.defaultdict(list)
+        for job_data in incoming_jobs:
+            jobs_by_request[job_data.pop("job_request_id")].append(job_data)
+
+        # group any deleted Jobs by their JobRequest identifier too.  A full
+        # sync has no explicit deletions, anything missing from the payload is
+        # deleted instead.
+        deleted_by_request = None
+        if deleted is not None:
+            deleted_by_request = collections.defaultdict(set)
+            for job in deleted:
+                deleted_by_request[job["job_request_id"]].add(job["identifier"])
+                jobs_by_request.setdefault(job["job_request_id"], [])
+
+        # get JobRequest instances based on the identifiers in the payload,
+        # along with all of their existing Jobs, so we can work out what has
+        # changed in memory rather than asking the database for each Job.
+        job_requests = (
+            JobRequest.objects.filter(identifier__in=jobs_by_request.keys())
+            .select_related("created_by")
+            .prefetch_related("jobs")
         )
         job_request_lut = {jr.identifier: jr for jr in job_requests}
 
-        # sort the incoming data by JobRequest identifier to ensure the
-        # subsequent groupby call works correctly.
-        job_requests = sorted(
-            serializer.validated_data, key=operator.itemgetter("job_request_id")
-        )
-        # group Jobs by their JobRequest ID
-        jobs_by_request = itertools.groupby(
-            serializer.validated_data, key=operator.itemgetter("job_request_id")
-        )
         created_job_ids = []
         updated_job_ids = []
-        for jr_identifier, jobs in jobs_by_request:
-            jobs = list(jobs)
-
+        for jr_identifier, jobs in jobs_by_request.items():
             # get the JobRequest for this identifier
             job_request = job_request_lut.get(jr_identifier)
             if job_request is None:
@@ -123,63 +185,32 @@ class JobAPIUpdate(APIView):
             # bind the job request ID to further logs so looking them up in the UI is easier
             structlog.contextvars.bind_contextvars(job_request=job_request.id)
 
-            database_jobs = job_request.jobs.all()
-
-            # get the current Jobs for the JobRequest, keyed on their identifier
-            jobs_by_identifier = {j.identifier: j for j in database_jobs}
-
-            payload_identifiers = {j["identifier"] for j in jobs}
+            to_delete = None
+            if deleted_by_request is not None:
+                to_delete = deleted_by_request[jr_identifier]
 
-            # delete local jobs not in the payload
-            identifiers_to_delete = set(jobs_by_identifier.keys()) - payload_identifiers
-            if identifiers_to_delete:
-                job_request.jobs.filter(identifier__in=identifiers_to_delete).delete()
-
-            for job_data in jobs:
-                # remove this value from the data, it's going to be set by
-                # creating/updating Job instances via the JobRequest instances
-                # related Jobs manager (ie job_request.jobs)
-                job_data.pop("job_request_id")
-
-                job, created = job_request.jobs.get_or_create(
-                    identifier=job_data["identifier"],
-                    defaults={**job_data},
-                )
-
-                if created:
-                    created_job_ids.append(str(job.id))
-                    # For newly created jobs we can't tell if they've just transitioned
-                    # to completed so we assume they have to avoid missing notifications
-                    newly_completed = job_data["status"] in COMPLETED_STATES
-                else:
-                    updated_job_ids.append(str(job.id))
-                    # check to see if the Job is about to transition to completed
-                    # (failed or succeeded) so we can notify after the update
-                    newly_completed = (
-                        job.status not in COMPLETED_STATES
-                        and job_data["status"] in COMPLETED_STATES
-                    )
-
-                    # update Job "manually" so we can make the check above for
-                    # status transition
-                    for key, value in job_data.items():
-                        setattr(job, key, value)
-                    job.save()
-
-                # round trip the Job to the db so all fields are converted to
-                # their python representations
-                job.refresh_from_db()
-
-                # We only send notifications or alerts for newly completed jobs
-                if newly_completed:
-                    handle_job_notifications(job_request, job)
-
-            # refresh the JobRequest instance so we can get an updated status
-            job_request.refresh_from_db()
-            current_status = job_request.status
-            if current_status != initial_status and current_status in COMPLETED_STATES:
-                handle_job_request_notifications(
-                    job_request, current_status, self.get_github_api()
+            current, created, updated, newly_completed = sync_jobs(
+                job_request, jobs, to_delete
+            )
+            created_job_ids.extend(str(job.id) for job in created)
+            updated_job_ids.extend(str(job.id) for job in updated)
+
+            # We only send notifications or alerts for newly completed jobs
+            for job in newly_completed:
+                handle_job_notifications(job_request, job)
+
+            # we know every Job this JobRequest now has so we can refresh its
+            # materialised status and aggregates without going back to the
+            # database for them
+            job_request.update_from_jobs(current)
+            if (
+                job_request.status != initial_status
+                and job_request.status in COMPLETED_STATES
+            ):
+                outbox.enqueue(
+                    handle_job_request_notifications,
+                    job_request=job_request,
+                    status=job_request.status,
                 )
 
         logger.info(
@@ -188,23 +219,127 @@ class JobAPIUpdate(APIView):
             updated_job_ids=",".join(updated_job_ids),
         )
 
+        # move the backend's sync cursor on to the most recent update we've
+        # seen, job-runner will send Jobs updated from this point onwards in
+        # its next delta sync.
+        update_fields = []
+        cursor = max(
+            filter(
+                None,
+                [
+                    self.backend.jobrunner_cursor,
+                    *(j["updated_at"] for j in incoming_jobs),
+                ],
+            ),
+            default=None,
+        )
+        if cursor != self.backend.jobrunner_cursor:
+            self.backend.jobrunner_cursor = cursor
+            update_fields.append("jobrunner_cursor")
+
         # store backend state sent up from job-runner.  We might rename the
         # header this is passed in at some point but now this is good enough.
         if flags := request.headers.get("Flags", ""):
             self.backend.jobrunner_state = json.loads(flags)
-            self.backend.save(update_fields=["jobrunner_state"])
+            update_fields.append("jobrunner_state")
+
+        if update_fields:
+            self.backend.save(update_fields=update_fields)
 
         # record use of the API
         update_stats(self.backend, request.path)
 
-        return Response({"status": "success"}, status=200)
+        return Response({"status": "success", "cursor": cursor}, status=200)
+
+
+def sync_jobs(job_request, jobs, deleted=None):
+    """
+    Write the given Jobs payload for a JobRequest in bulk
+
+    The JobRequest's existing Jobs must already be prefetched.  When deleted is
+    None the payload is treated as the full set of Jobs and any local Jobs not
+    in it are deleted, otherwise only the given identifiers are deleted.  Every
+    Job in the payload is then written with a single upsert.
+
+    We return all of the JobRequest's Jobs after the sync, the created Jobs,
+    the updated Jobs, and the subset of those which have just moved to a
+    completed state.
+    """
+    # get the current Jobs for the JobRequest, keyed on their identifier
+    jobs_by_identifier = {j.identifier: j for j in job_request.jobs.all()}
+
+    # an upsert can only touch each row once, so if job-runner has sent us the
+    # same Job twice we keep the last one, as sequential writes would have
+    jobs = list({j["identifier"]: j for j in jobs}.values())
+
+    payload_identifiers = {j["identifier"] for j in jobs}
+
+    if deleted is None:
+        # delete local jobs not in the payload
+        identifiers_to_delete = set(jobs_by_identifier.keys()) - payload_identifiers
+    else:
+        identifiers_to_delete = set(deleted) - payload_identifiers
+
+    if identifiers_to_delete:
+        job_request.jobs.filter(identifier__in=identifiers_to_delete).delete()
+        for identifier in identifiers_to_delete:
+            jobs_by_identifier.pop(identifier, None)
+
+    created = []
+    updated = []
+    newly_completed = []
+    fields = set()
+    for job_data in jobs:
+        fields.update(job_data.keys())
+
+        job = jobs_by_identifier.get(job_data["identifier"])
+        if job is None:
+            job = Job(job_request=job_request, **job_data)
+            created.append(job)
+
+            # For newly created jobs we can't tell if they've just transitioned
+            # to completed so we assume they have to avoid missing notifications
+            if job.status in COMPLETED_STATES:
+                newly_completed.append(job)
+
+            continue
+
+        # check to see if the Job is about to transition to completed (failed
+        # or succeeded) so we can notify after the update
+        if (
+            job.status not in COMPLETED_STATES
+            and job_data["status"] in COMPLETED_STATES
+        ):
+            newly_completed.append(job)
+
+        # update Job "manually" so we can make the check above for status
+        # transition, and so fields missing from the payload keep their
+        # current values when written back
+        for key, value in job_data.items():
+            setattr(job, key, value)
+        updated.append(job)
+
+    if jobs:
+        # upsert on identifier so Jobs created by a concurrent sync are updated
+        # rather than raising an IntegrityError
+        Job.objects.bulk_create(
+            [*updated, *created],
+            update_conflicts=True,
+            unique_fields=["identifier"],
+            update_fields=sorted(fields - {"identifier"}),
+        )
+
+    current = [*jobs_by_identifier.values(), *created]
+
+    return current, created, updated, newly_completed
 
 
 def handle_job_notifications(job_request, job):
     if job_request.will_notify:
-        send_finished_notification(
-            job_request.created_by.email,
-            job,
+        outbox.enqueue(
+            send_finished_notification,
+            email=job_request.created_by.email,
+            job=job,
         )
         logger.info(
             "Notified requesting user of completed job",
@@ -212,9 +347,10 @@ def handle_job_notifications(job_request, job):
         )
 
 
-def handle_job_request_notifications(job_request, status, github_api):
+def handle_job_request_notifications(job_request, status, github_api=None):
     if hasattr(job_request, "analysis_request"):
         if status == "succeeded":
+            github_api = github_api or _get_github_api()
             issues.create_output_checking_request(job_request, github_api)
 
         if status == "failed":
@@ -237,7 +373,20 @@ class WorkspaceSerializer(serializers.ModelSerializer):
 
 
 class JobRequestAPIList(ListAPIView):
+    """
+    List the active JobRequests for job-runner to pick up
+
+    Authenticated responses carry an ETag built from the backend's
+    job_requests_version, so polling with If-None-Match gets a 304 without
+    querying JobRequests when nothing has changed.
+
+    Adding a `wait` query arg, in seconds, turns the request into a long poll:
+    if the client's ETag is current the request is held until the backend's
+    JobRequests change or the wait runs out, and then answered as above.
+    """
+
     authentication_classes = []
+    renderer_classes = fastjson.RENDERER_CLASSES
 
     class serializer_class(serializers.ModelSerializer):
         backend = serializers.CharField(source="backend.slug")
@@ -277,19 +426,85 @@ class JobRequestAPIList(ListAPIView):
         return super().initial(request, *args, **kwargs)
 
     def get(self, request, *args, **kwargs):
-        response = super().get(request, *args, **kwargs)
-
-        # only gather stats when authenticated and response is 2xx
-        if self.backend and response.status_code >= 200 and response.status_code < 300:
+        wait = self.get_wait(request)
+        if wait and self.backend:
+            self.wait_for_changes(request, wait)
+        elif self.backend:
+            # the Backend may have come from the token cache, so make sure we
+            # have the latest version
+            self.backend.refresh_from_db(fields=["job_requests_version"])
+
+        etag = self.get_etag(request)
+
+        response = get_conditional_response(request, etag=etag)
+        if response is None:
+            response = super().get(request, *args, **kwargs)
+
+        if etag and response.status_code == 200:
+            response.headers["ETag"] = etag
+
+        # only gather stats when authenticated and response is 2xx or a 304
+        # for an unchanged list
+        if self.backend and (
+            200 <= response.status_code < 300 or response.status_code == 304
+        ):
             update_stats(self.backend, request.path)
 
         return response
 
+    def get_etag(self, request):
+        if self.backend is None:
+            return None
+
+        # the version covers changes to this backend's JobRequests, the query
+        # args cover pagination.  Long polls share ETags with normal requests.
+        params = request.GET.copy()
+        params.pop("wait", None)
+
+        key = ":".join(
+            [
+                str(self.backend.pk),
+                str(self.backend.job_requests_version),
+                params.urlencode(),
+            ]
+        )
+        return quote_etag(hashlib.sha256(key.encode()).hexdigest())
+
+    def get_wait(self, request):
+        wait = request.GET.get("wait")
+        if wait is None:
+            return None
+
+        try:
+            wait = float(wait)
+        except ValueError:
+            raise ValidationError({"wait": "Must be a number of seconds"})
+
+        return max(0, min(wait, MAX_WAIT))
+
+    def wait_for_changes(self, request, timeout):
+        listener = job_request_events.listener
+
+        # take the marker before reading the version so a change made between
+        # the two still wakes us up
+        marker = listener.mark(self.backend.pk)
+        self.backend.refresh_from_db(fields=["job_requests_version"])
+
+        # there's nothing to wait for if the client's list is already stale
+        if get_conditional_response(request, etag=self.get_etag(request)) is None:
+            return
+
+        # we don't need the database while we wait, so give the connection
+        # back rather than holding it open while idle
+        if not connection.in_atomic_block:
+            connection.close()  # pragma: no cover
+
+        if listener.wait(self.backend.pk, marker, timeout):
+            self.backend.refresh_from_db(fields=["job_requests_version"])
+
     def get_queryset(self):
         qs = (
-            JobRequest.objects.filter(
-                Q(jobs__status__in=["pending", "running"]) | Q(jobs=None),
-            )
+            JobRequest.objects.active()
             .select_related(
                 "backend",
                 "created_by",
@@ -300,7 +515,6 @@ class JobRequestAPIList(ListAPIView):
             )
             .prefetch_related("workspace__project__orgs")
             .order_by("-created_at")
-            .distinct()
         )
 
         backend_slug = getattr(self.backend, "slug", None)
@@ -323,7 +537,10 @@ class UserAPIDetail(APIView):
 
     def get(self, request, *args, **kwargs):
         try:
-            user = User.objects.get(username=self.kwargs["username"])
+            # both get_all_permissions and get_all_roles use the memberships
+            user = User.objects.prefetch_related("project_memberships__project").get(
+                username=self.kwargs["username"]
+            )
         except User.DoesNotExist:
             raise Http404
 
@@ -337,6 +554,7 @@ class UserAPIDetail(APIView):
 class WorkspaceStatusesAPI(APIView):
     authentication_classes = [SessionAuthentication]
     permission_classes = []
+    renderer_classes = fastjson.RENDERER_CLASSES
 
     def get(self, request, *args, **kwargs):
         try:
@@ -0,0 +1,32 @@
+"""
+A process-local cache of verified User personal access tokens
+
+Checking a PAT means hashing it with the configured PASSWORD_HASHERS, which
+are deliberately slow, and scripts downloading outputs present the same PAT
+on every request.  Once a token has been verified we remember, for
+USER_PAT_CACHE_TTL seconds, which User and which stored hash it matched, so
+the next check only has to compare those.
+
+Because each entry records the hash it matched, rotating a token invalidates
+its entries in every process as soon as the new hash is saved, and
+User.rotate_token() also clears this process's cache.  Expiry is checked by
+the User on every request, whether or not the token was cached.
+"""
+
+from .ttl_cache import TTLCache
+
+
+class UserPATCache(TTLCache):
+    key_salt = "jobserver.api.pat_cache"
+    ttl_setting = "USER_PAT_CACHE_TTL"
+
+    def verified(self, token, user):
+        """Has the given token been verified for the given User recently?"""
+        expected = (user.pk, user.pat_token)
+        return self.get(token, is_valid=lambda value: value == expected) is not None
+
+    def set(self, token, user):
+        super().set(token, (user.pk, user.pat_token))
+
+
+cache = UserPATCache()
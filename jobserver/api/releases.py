@@ -1,24 +1,40 @@
+import hashlib
+import io
+import re
+import tarfile
+import tempfile
 from email.message import Message
 from pathlib import Path
 
 import sentry_sdk
 import structlog
 from django.conf import settings
+from django.core.cache import cache
 from django.db import transaction
 from django.db.models import Value
 from django.shortcuts import get_object_or_404
 from django.utils import timezone
+from django.utils.cache import get_conditional_response
+from django.utils.datastructures import MultiValueDict
+from django.utils.http import parse_etags, quote_etag
 from opentelemetry import trace
 from rest_framework import serializers
 from rest_framework.authentication import SessionAuthentication
 from rest_framework.exceptions import (
+    APIException,
     NotAuthenticated,
+    NotFound,
     ParseError,
     PermissionDenied,
     ValidationError,
 )
 from rest_framework.generics import CreateAPIView, RetrieveAPIView
-from rest_framework.parsers import FileUploadParser, JSONParser
+from rest_framework.parsers import (
+    BaseParser,
+    DataAndFiles,
+    FileUploadParser,
+    MultiPartParser,
+)
 from rest_framework.response import Response
 from rest_framework.views import APIView
 
@@ -26,9 +42,17 @@ from interactive.commands import create_report
 from interactive.emails import send_report_uploaded_notification
 from interactive.models import AnalysisRequest
 from interactive.slacks import notify_report_uploaded
-from jobserver import releases, slacks
+from jobserver import outbox, releases, slacks
+from jobserver.api import fast_validation, fastjson
 from jobserver.api.authentication import get_backend_from_token
-from jobserver.authorization import OutputChecker, has_permission, has_role, permissions
+from jobserver.authorization import (
+    OutputChecker,
+    has_permission,
+    has_role,
+    permissions,
+    roles_for_projects,
+)
+from jobserver.authorization.registry import permissions_for
 from jobserver.commands import users
 from jobserver.models import (
     Project,
@@ -41,13 +65,15 @@ from jobserver.models import (
     Workspace,
 )
 from jobserver.releases import serve_file
-from jobserver.utils import set_from_qs
+from jobserver.utils import dotted_path, set_from_qs
 
 from ..github import _get_github_api
 
 
 logger = structlog.get_logger(__name__)
 
+CONTENT_RANGE = re.compile(r"bytes (\d+)-(\d+)/(\d+)")
+
 
 def get_filename(headers):
     """
@@ -210,6 +236,16 @@ def validate_upload_access(request, workspace):
     return backend, user
 
 
+def validate_release_backend(release, backend):
+    """Check a Release's files are being uploaded from the Backend it came from"""
+    if release.backend != backend:
+        raise ValidationError(
+            {
+                "detail": f"Release is from backend {release.backend.slug} not {backend.slug}"
+            }
+        )
+
+
 def validate_release_access(request, workspace):
     """Validate this request can access releases for this workspace.
 
@@ -257,7 +293,7 @@ def validate_snapshot_access(request, snapshot):
 def generate_index(files):
     """Generate a JSON list of files as expected by the SPA."""
 
-    output = dict(
+    return dict(
         files=[
             dict(
                 name=name,
@@ -276,11 +312,30 @@ def generate_index(files):
         ],
     )
 
-    # validate our output data with the serializer, without having to encode
-    # all the source lookups into the serializer itself
-    FileSerializer(data=output, many=True).is_valid()
 
-    return output
+def index_response(request, key, get_files):
+    """
+    Build a response with the index of files get_files returns
+
+    key must identify the index, and change whenever the files in it do, which
+    the workspace's files_version takes care of.  The index is cached under
+    it, and it's used as the ETag so the SPA isn't sent an unchanged index
+    again.
+    """
+    etag = quote_etag(hashlib.sha256(key.encode()).hexdigest())
+
+    response = get_conditional_response(request, etag=etag)
+    if response is None:
+        cache_key = f"release-index:{key}"
+        index = cache.get(cache_key)
+        if index is None:
+            index = generate_index(get_files())
+            cache.set(cache_key, index, timeout=settings.RELEASE_INDEX_CACHE_TIMEOUT)
+
+        response = Response(index)
+
+    response.headers["ETag"] = etag
+    return response
 
 
 class ReleaseWorkspaceAPI(APIView):
@@ -288,7 +343,8 @@ class ReleaseWorkspaceAPI(APIView):
 
     authentication_classes = [SessionAuthentication]
     get_github_api = staticmethod(_get_github_api)
-    parsers = [JSONParser]
+    parser_classes = fastjson.PARSER_CLASSES
+    renderer_classes = fastjson.RENDERER_CLASSES
 
     def post(self, request, workspace_name):
         """Create a new Release for this workspace."""
@@ -296,10 +352,9 @@ class ReleaseWorkspaceAPI(APIView):
         backend, user = validate_upload_access(request, workspace)
 
         # parse the requested files
-        serializer = ReleaseSerializer(data=request.data)
-        serializer.is_valid(raise_exception=True)
-        files = serializer.validated_data["files"]
-        metadata = serializer.validated_data["metadata"]
+        data = fast_validation.validate(ReleaseSerializer, request.data)
+        files = data["files"]
+        metadata = data["metadata"]
         release_id = metadata.pop("airlock_id", None)
 
         try:
@@ -309,7 +364,7 @@ class ReleaseWorkspaceAPI(APIView):
         except releases.ReleaseFileAlreadyExists as exc:
             raise ValidationError({"detail": str(exc)})
 
-        slacks.notify_release_created(release)
+        outbox.enqueue(slacks.notify_release_created, release=release)
 
         # Current osrelease workflow should not create a Github issues, so allow that to be supressed
         # Note: this is broken and spamming issues, so comment out for now
@@ -330,12 +385,61 @@ class ReleaseWorkspaceAPI(APIView):
         """List the most recent versions of files for the Workspace."""
         workspace = get_object_or_404(Workspace, name=workspace_name)
         validate_release_access(request, workspace)
-        files = releases.workspace_files(workspace)
-        return Response(generate_index(files))
+
+        key = f"workspace:{workspace.pk}:{workspace.files_version}"
+        return index_response(request, key, lambda: releases.workspace_files(workspace))
+
+
+def create_interactive_report(rfile):
+    """Create a Report for the given ReleaseFile if it's an Interactive Report"""
+    if analysis_request := is_interactive_report(rfile):
+        with transaction.atomic():
+            create_report(
+                analysis_request=analysis_request,
+                rfile=rfile,
+                user=analysis_request.created_by,
+            )
+
+            outbox.enqueue(
+                send_report_uploaded_notification,
+                analysis_request=analysis_request,
+            )
+            outbox.enqueue(notify_report_uploaded, analysis_request=analysis_request)
+
+
+def file_uploaded(request, rfile):
+    """Let people know a ReleaseFile has been uploaded and build the response"""
+    outbox.enqueue(slacks.notify_release_file_uploaded, rfile=rfile)
+    create_interactive_report(rfile)
+
+    response = Response(status=201)
+    response.headers["File-Id"] = rfile.id
+    response.headers["Location"] = request.build_absolute_uri(rfile.get_api_url())
+    return response
+
+
+def parse_content_range(header, size):
+    """
+    Parse a Content-Range header for a chunk of a file of the given size
+
+    Returns the chunk's start and length.
+    """
+    match = CONTENT_RANGE.fullmatch(header or "")
+    if not match:
+        raise ValidationError({"detail": "Missing or invalid Content-Range header"})
+
+    start, end, total = (int(g) for g in match.groups())
+    if total != size or end < start or end >= total:
+        raise ValidationError(
+            {"detail": f"Content-Range {header} is not within a file of {size} bytes"}
+        )
+
+    return start, end - start + 1
 
 
 class ReleaseAPI(APIView):
     authentication_classes = [SessionAuthentication]
+    renderer_classes = fastjson.RENDERER_CLASSES
 
     # DRF file upload does not use multipart, is just a simple byte stream
     parser_classes = [FileUploadParser]
@@ -370,12 +474,7 @@ class ReleaseAPI(APIView):
 
         # ensure this is being released from the same backend as the Release
         # was created from
-        if release.backend != backend:
-            raise ValidationError(
-                {
-                    "detail": f"Release is from backend {release.backend.slug} not {backend.slug}"
-                }
-            )
+        validate_release_backend(release, backend)
 
         try:
             rfile = releases.handle_file_upload(
@@ -387,30 +486,313 @@ class ReleaseAPI(APIView):
         ) as exc:
             raise ValidationError({"detail": str(exc)})
 
-        slacks.notify_release_file_uploaded(rfile)
+        return file_uploaded(request, rfile)
+
+    def get(self, request, release_id):
+        """A list of files for this Release."""
+        release = get_object_or_404(
+            Release.objects.select_related("workspace"), id=release_id
+        )
+        validate_release_access(request, release.workspace)
+
+        def get_files():
+            files = release.files.select_related("created_by", "release__backend")
+            return {f.name: f for f in files}
+
+        key = f"release:{release.pk}:{release.workspace.files_version}"
+        return index_response(request, key, get_files)
 
-        if analysis_request := is_interactive_report(rfile):
-            with transaction.atomic():
-                create_report(
-                    analysis_request=analysis_request,
-                    rfile=rfile,
-                    user=analysis_request.created_by,
+
+class RequestTooLarge(APIException):
+    status_code = 413
+    default_detail = "Request body is too large"
+    default_code = "request_too_large"
+
+
+class TarParser(BaseParser):
+    """
+    Parse a tar stream, optionally compressed, into a file per member
+
+    The stream is copied to a temporary file first, so the members can all be
+    listed, and checked, before any of them are read.  Views can limit how much
+    of the stream is copied by setting max_upload_size, and larger streams are
+    rejected without reading the rest of them.
+    """
+
+    media_type = "application/x-tar"
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        view = (parser_context or {}).get("view")
+        max_size = getattr(view, "max_upload_size", None)
+
+        archive = tempfile.TemporaryFile()
+        size = 0
+        while stream is not None and (chunk := stream.read(releases.UPLOAD_CHUNK_SIZE)):
+            size += len(chunk)
+            if max_size is not None and size > max_size:
+                archive.close()
+                raise RequestTooLarge
+
+            archive.write(chunk)
+        archive.seek(0)
+
+        try:
+            tar = tarfile.open(fileobj=archive, mode="r:*")
+            members = tar.getmembers()
+        except tarfile.TarError as exc:
+            raise ParseError(f"Tar parse error - {exc}")
+
+        files = MultiValueDict()
+        for member in members:
+            if member.isdir():
+                continue
+            if not member.isfile():
+                raise ParseError(f"{member.name} is not a regular file")
+
+            upload = tar.extractfile(member)
+            upload.size = member.size
+            files.appendlist(member.name.removeprefix("./"), upload)
+
+        return DataAndFiles({}, files)
+
+
+class ReleaseBatchUploadAPI(APIView):
+    """
+    Upload several files for a Release in one request
+
+    Files are sent either as multipart/form-data, with each file's name in the
+    Release as the name of its field (the filename of a part loses any
+    directories), or as a tar stream with each file's name in the Release as
+    its path in the archive.  Django limits multipart requests to
+    DATA_UPLOAD_MAX_NUMBER_FILES files, so use a tar stream for more than that.
+
+    Access is checked once for the whole request, and every file is checked
+    against the Release's requested files before any of them are stored.  A
+    body bigger than all the requested files could be, or without a
+    Content-Length, is rejected with a 413 before any of it is read.  The files are then stored one by one,
+    as ReleaseAPI would, and any which fail are listed in the response so they
+    can be sent again.
+    """
+
+    authentication_classes = [SessionAuthentication]
+    parser_classes = [MultiPartParser, TarParser]
+
+    def post(self, request, release_id):
+        release = get_object_or_404(Release, id=release_id)
+        backend, user = validate_upload_access(request, release.workspace)
+        validate_release_backend(release, backend)
+
+        # a tar stream of every requested file, each at the size limit, along
+        # with a few headers per file and the end of archive marker, which is
+        # more than a multipart body of the same files needs
+        self.max_upload_size = (
+            len(release.requested_files)
+            * (settings.RELEASE_FILE_SIZE_LIMIT + 4 * tarfile.BLOCKSIZE)
+            + tarfile.RECORDSIZE
+        )
+
+        # check the body's size before it's parsed, since parsing a multipart
+        # body writes all of it to disk
+        try:
+            content_length = int(request.META.get("CONTENT_LENGTH"))
+        except (TypeError, ValueError):
+            raise RequestTooLarge("Content-Length is required")
+        if content_length > self.max_upload_size:
+            raise RequestTooLarge
+
+        uploads = request.FILES
+        if not uploads:
+            raise ValidationError({"detail": "No data uploaded"})
+
+        requested = {f["name"] for f in release.requested_files}
+        errors = {}
+        for name in uploads:
+            if name not in requested:
+                errors[name] = f"File {name} not requested in release {release.id}"
+            elif len(uploads.getlist(name)) > 1:
+                errors[name] = f"File {name} was sent more than once"
+            elif uploads[name].size > settings.RELEASE_FILE_SIZE_LIMIT:
+                size_limit = to_mb(settings.RELEASE_FILE_SIZE_LIMIT)
+                errors[name] = f"File is too large, it must be below {size_limit}"
+
+        if errors:
+            raise ValidationError(
+                {"detail": "No files were uploaded", "errors": errors}
+            )
+
+        rfiles = []
+        for name, upload in uploads.items():
+            try:
+                rfile = releases.handle_file_upload(
+                    release, backend, user, upload, name
                 )
+            except (
+                releases.ReleaseFileAlreadyExists,
+                releases.ReleaseFileHashMismatch,
+            ) as exc:
+                errors[name] = str(exc)
+                continue
+
+            create_interactive_report(rfile)
+            rfiles.append(rfile)
+
+        if rfiles:
+            outbox.enqueue(
+                slacks.notify_release_files_uploaded,
+                release=release,
+                user=user,
+                names=[f.name for f in rfiles],
+            )
+
+        files = [
+            {
+                "name": f.name,
+                "id": f.id,
+                "url": request.build_absolute_uri(f.get_api_url()),
+            }
+            for f in rfiles
+        ]
+        if errors:
+            return Response(
+                {
+                    "detail": "Some files could not be uploaded",
+                    "errors": errors,
+                    "files": files,
+                },
+                status=400,
+            )
+
+        return Response({"files": files}, status=201)
 
-                send_report_uploaded_notification(analysis_request)
-                notify_report_uploaded(analysis_request)
+
+class ReleaseUploadAPI(APIView):
+    """
+    Start a resumable upload of a file for a Release
+
+    Large files can be uploaded in chunks, over several requests, so an upload
+    which is interrupted can carry on from where it got to rather than
+    starting again.  POSTing here, with the file's name in the
+    Content-Disposition header as for ReleaseAPI, starts an upload and returns
+    its Location.  See ReleaseUploadSessionAPI for the rest of the protocol.
+    """
+
+    authentication_classes = [SessionAuthentication]
+
+    def post(self, request, release_id):
+        release = get_object_or_404(Release, id=release_id)
+        backend, user = validate_upload_access(request, release.workspace)
+        validate_release_backend(release, backend)
+
+        if "Content-Disposition" not in request.headers:
+            raise ValidationError({"detail": "Missing Content-Disposition header"})
+        filename = get_filename(request.headers)
+
+        rfile = release.files.filter(name=filename).first()
+        if rfile is None:
+            raise ValidationError(
+                {"detail": f"File {filename} not requested in release {release.id}"}
+            )
+
+        try:
+            offset = releases.start_upload(rfile)
+        except releases.ReleaseFileAlreadyExists as exc:
+            raise ValidationError({"detail": str(exc)})
 
         response = Response(status=201)
         response.headers["File-Id"] = rfile.id
-        response.headers["Location"] = request.build_absolute_uri(rfile.get_api_url())
+        response.headers["Location"] = request.build_absolute_uri(
+            rfile.get_upload_url()
+        )
+        response.headers["Upload-Offset"] = offset
         return response
 
-    def get(self, request, release_id):
-        """A list of files for this Release."""
-        release = get_object_or_404(Release, id=release_id)
-        validate_release_access(request, release.workspace)
-        files = {f.name: f for f in release.files.select_related("created_by")}
-        return Response(generate_index(files))
+
+class ReleaseUploadSessionAPI(APIView):
+    """
+    Upload a file for a Release in chunks
+
+    The Upload-Offset header of every response is how much of the file we
+    have, GET this to check it when resuming an upload.  Each chunk is PUT
+    here, starting at that offset, with its position in the file set in the
+    Content-Range header and its sha256 in the Chunk-Sha256 header.  A chunk
+    which doesn't match is discarded and can be sent again.  Once the whole
+    file has been sent POST here to finish the upload, which checks the file
+    matches the sha256 the Release was created with.
+    """
+
+    authentication_classes = [SessionAuthentication]
+
+    def get_rfile(self, request, file_id):
+        rfile = get_object_or_404(
+            ReleaseFile.objects.select_related(
+                "release__backend", "release__workspace__project"
+            ),
+            id=file_id,
+        )
+        backend, user = validate_upload_access(request, rfile.release.workspace)
+        validate_release_backend(rfile.release, backend)
+        return rfile
+
+    def get(self, request, file_id):
+        rfile = self.get_rfile(request, file_id)
+
+        try:
+            offset = releases.get_upload_offset(rfile)
+        except releases.ReleaseFileUploadNotStarted:
+            raise NotFound("Upload has not been started")
+
+        return Response(headers={"Upload-Offset": offset})
+
+    def put(self, request, file_id):
+        rfile = self.get_rfile(request, file_id)
+
+        content_length = request.headers.get("Content-Length")
+        if content_length and int(content_length) > settings.RELEASE_FILE_SIZE_LIMIT:
+            size_limit = to_mb(settings.RELEASE_FILE_SIZE_LIMIT)
+            raise ValidationError(f"Chunk is too large, it must be below {size_limit}")
+
+        start, length = parse_content_range(
+            request.headers.get("Content-Range"), rfile.size
+        )
+
+        checksum = request.headers.get("Chunk-Sha256")
+        if not checksum:
+            raise ValidationError({"detail": "Missing Chunk-Sha256 header"})
+
+        # there's no stream for an empty body
+        stream = request.stream or io.BytesIO()
+
+        try:
+            offset = releases.write_upload_chunk(
+                rfile, stream, start, length, checksum.lower()
+            )
+        except releases.ReleaseFileUploadNotStarted:
+            raise NotFound("Upload has not been started")
+        except releases.ReleaseFileUploadOffsetMismatch as exc:
+            return Response(
+                {"detail": str(exc)},
+                status=409,
+                headers={"Upload-Offset": exc.offset},
+            )
+        except releases.ReleaseFileHashMismatch as exc:
+            raise ValidationError({"detail": str(exc)})
+
+        return Response(headers={"Upload-Offset": offset})
+
+    def post(self, request, file_id):
+        rfile = self.get_rfile(request, file_id)
+
+        try:
+            rfile = releases.finish_upload(rfile)
+        except releases.ReleaseFileUploadNotStarted:
+            raise NotFound("Upload has not been started")
+        except (
+            releases.ReleaseFileAlreadyExists,
+            releases.ReleaseFileHashMismatch,
+        ) as exc:
+            raise ValidationError({"detail": str(exc)})
+
+        return file_uploaded(request, rfile)
 
 
 class ReleaseFileAPI(APIView):
@@ -464,28 +846,39 @@ class ReviewAPI(APIView):
 
 class SnapshotAPI(APIView):
     authentication_classes = [SessionAuthentication]
+    renderer_classes = fastjson.RENDERER_CLASSES
 
     def get(self, request, *args, **kwargs):
         """A list of files for this Snapshot."""
         snapshot = get_object_or_404(
-            Snapshot,
+            Snapshot.objects.select_related("workspace"),
             workspace__name=self.kwargs["workspace_id"],
             pk=self.kwargs["snapshot_id"],
         )
 
         validate_snapshot_access(request, snapshot)
-        files = {
-            f.name: f
-            for f in snapshot.files.select_related(
+        is_published = snapshot.is_published
+
+        def get_files():
+            files = snapshot.files.select_related(
                 "created_by",
                 "release",
                 "release__backend",
                 "workspace",
                 "workspace__project",
-            ).annotate(is_published=Value(snapshot.is_published))
-        }
-
-        return Response(generate_index(files))
+            ).annotate(is_published=Value(is_published))
+            return {f.name: f for f in files}
+
+        # published files are served from a different URL
+        key = ":".join(
+            [
+                "snapshot",
+                str(snapshot.pk),
+                str(snapshot.workspace.files_version),
+                str(is_published),
+            ]
+        )
+        return index_response(request, key, get_files)
 
 
 class SnapshotCreateAPI(APIView):
@@ -582,19 +975,30 @@ def build_level4_user(user):
         Project.Statuses.ONGOING_LINKED,
     }
 
+    # the workspaces of every project the user is a member of, then the
+    # user's roles in all of those projects in one more query
+    user_workspaces = Workspace.objects.filter(
+        project__memberships__user=user
+    ).select_related("project")
+    project_roles = roles_for_projects(user, {w.project for w in user_workspaces})
+
     workspaces = {}
-    # this is 1 or 2 queries per project, not ideal, but we permissions are not stored in the db
-    for project in user.projects.all():
-        if has_permission(user, permissions.unreleased_outputs_view, project=project):
-            for workspace in project.workspaces.all().values("name", "is_archived"):
-                workspaces[workspace["name"]] = {
-                    "project": project.name,  # for backwards compatibility with Airlock
-                    "project_details": {
-                        "name": project.name,
-                        "ongoing": project.status in ongoing_project_statuses,
-                    },
-                    "archived": workspace["is_archived"],
-                }
+    for workspace in user_workspaces:
+        project = workspace.project
+
+        if permissions.unreleased_outputs_view not in permissions_for(
+            project_roles[project]
+        ):
+            continue
+
+        workspaces[workspace.name] = {
+            "project": project.name,  # for backwards compatibility with Airlock
+            "project_details": {
+                "name": project.name,
+                "ongoing": project.status in ongoing_project_statuses,
+            },
+            "archived": workspace.is_archived,
+        }
 
     # using a DRF serializer for now, so we've *some* schema definition
     level4_user = Level4AuthenticatedUser(
@@ -616,8 +1020,43 @@ def build_level4_user(user):
     return level4_user
 
 
+def level4_user_response(request, user):
+    """
+    Build a response with the Level 4 authorisation for the given User
+
+    This is cached against everything it's built from: the User's own fields
+    and their level4_version, which is bumped when their memberships or the
+    workspaces and statuses of their projects change.  It's also used as the
+    ETag, so a backend can send If-None-Match to revalidate what it has.
+    """
+    roles = ",".join(sorted(dotted_path(r) for r in user.roles))
+    key = f"level4-user:{user.pk}:{user.level4_version}"
+    etag = quote_etag(
+        hashlib.sha256(
+            "\0".join([key, user.username, user.fullname, roles]).encode()
+        ).hexdigest()
+    )
+
+    # these are POSTs, which get_conditional_response won't return a 304 for
+    if etag in parse_etags(request.headers.get("If-None-Match", "")):
+        response = Response(status=304)
+    else:
+        cache_key = f"level4-user:{etag}"
+        data = cache.get(cache_key)
+        if data is None:
+            data = build_level4_user(user).data
+            cache.set(cache_key, data, timeout=settings.LEVEL4_USER_CACHE_TIMEOUT)
+
+        response = Response(data)
+
+    response.headers["ETag"] = etag
+    return response
+
+
 class Level4TokenAuthenticationAPI(APIView):
     authentication_classes = []
+    parser_classes = fastjson.PARSER_CLASSES
+    renderer_classes = fastjson.RENDERER_CLASSES
 
     class serializer_class(serializers.Serializer):
         user = serializers.CharField()
@@ -645,13 +1084,13 @@ class Level4TokenAuthenticationAPI(APIView):
 
         logger.info(f"User {user} logged in with login token via API")
 
-        level4_user = build_level4_user(user)
-
-        return Response(level4_user.data)
+        return level4_user_response(request, user)
 
 
 class Level4AuthorisationAPI(APIView):
     authentication_classes = []
+    parser_classes = fastjson.PARSER_CLASSES
+    renderer_classes = fastjson.RENDERER_CLASSES
 
     class serializer_class(serializers.Serializer):
         user = serializers.CharField()
@@ -675,6 +1114,4 @@ class Level4AuthorisationAPI(APIView):
 
         logger.info(f"Provided authorization information for {user} via API")
 
-        level4_user = build_level4_user(user)
-
-        return Response(level4_user.data)
+        return level4_user_response(request, user)
@@ -0,0 +1,78 @@
+"""
+A process-local cache of Backends by their auth token
+
+get_backend_from_token() runs on every request from a backend, so this saves
+it a database round trip each time.
+
+Entries expire after BACKEND_TOKEN_CACHE_TTL seconds, and Backend.save()
+clears this process's cache when a token might have changed.  Once an entry
+is more than BACKEND_TOKEN_CACHE_CHECK_INTERVAL seconds old it's only used
+while its Backend's updated_at matches the database, which each process checks
+for all Backends in one query at most that often.  A token rotated or a
+Backend deleted in another process can keep working here for up to that long.
+"""
+
+import copy
+import threading
+import time
+
+from django.conf import settings
+
+from .ttl_cache import TTLCache
+
+
+class BackendTokenCache(TTLCache):
+    key_salt = "jobserver.api.token_cache"
+    ttl_setting = "BACKEND_TOKEN_CACHE_TTL"
+
+    def __init__(self):
+        super().__init__()
+        self._stamp_lock = threading.Lock()
+        self._updated_ats = None
+        self._checked_at = None
+
+    def get(self, token):
+        entry = super().get(token, is_valid=self._is_current)
+        if entry is None:
+            return None
+
+        # hand out a copy so callers can't change the cached instance
+        return copy.copy(entry[0])
+
+    def set(self, token, backend):
+        super().set(token, (copy.copy(backend), time.monotonic()))
+
+    def clear(self):
+        super().clear()
+
+        with self._stamp_lock:
+            self._updated_ats = None
+
+    def _is_current(self, entry):
+        backend, cached_at = entry
+
+        now = time.monotonic()
+        interval = settings.BACKEND_TOKEN_CACHE_CHECK_INTERVAL
+        if now - cached_at < interval:
+            return True
+
+        return self._get_updated_ats(now, interval).get(backend.pk) == (
+            backend.updated_at
+        )
+
+    def _get_updated_ats(self, now, interval):
+        # avoid circular imports
+        from jobserver.models import Backend
+
+        with self._stamp_lock:
+            stale = self._updated_ats is None or now - self._checked_at >= interval
+            if stale:
+                self._updated_ats = dict(
+                    Backend.objects.values_list("pk", "updated_at")
+                )
+                self._checked_at = now
+
+            return self._updated_ats
+
+
+cache = BackendTokenCache()
@@ -0,0 +1,67 @@
+"""
+A process-local cache of what tokens have been verified as
+
+Verifying a token presented to the API means a database round trip, or
+hashing it with a deliberately slow hasher, and clients present the same token
+on every request.  Once a token has been verified we remember what it was
+verified as for ttl_setting seconds, so the next request can skip that work.
+
+Tokens are keyed by an HMAC, salted differently for each cache, so the cache
+never holds them in the clear.  Setting the TTL to 0 turns the cache off.
+"""
+
+import threading
+import time
+
+from django.conf import settings
+from django.utils.crypto import salted_hmac
+
+
+class TTLCache:
+    # subclasses set the salt for their keys and the setting holding their TTL
+    key_salt = None
+    ttl_setting = None
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._entries = {}
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, token, is_valid=None):
+        """
+        Get what the given token was verified as, if that hasn't expired
+
+        Pass is_valid to also check the cached value still holds, anything it
+        rejects is treated as a miss.
+        """
+        key = self._key(token)
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] < time.monotonic():
+                self._entries.pop(key, None)
+                self.misses += 1
+                return None
+
+            if is_valid is not None and not is_valid(entry[1]):
+                self.misses += 1
+                return None
+
+            self.hits += 1
+            return entry[1]
+
+    def set(self, token, value):
+        ttl = getattr(settings, self.ttl_setting)
+        if not ttl:
+            return
+
+        with self._lock:
+            self._entries[self._key(token)] = (time.monotonic() + ttl, value)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def _key(self, token):
+        return salted_hmac(self.key_salt, token).hexdigest()
@@ -0,0 +1,96 @@
+"""
+Record when each Backend last used each API URL
+
+Backends call the API constantly, so rather than writing a Stats row on every
+request each process collects last-seen timestamps in memory and writes them in
+one bulk upsert at most every API_STATS_FLUSH_INTERVAL seconds.  Setting the
+interval to 0 writes every request through immediately.
+
+Readers should use last_seen(), which includes this process's unflushed
+timestamps.  Other processes' timestamps are at most one interval behind.
+"""
+
+import threading
+
+import structlog
+from django.conf import settings
+from django.db import connection
+from django.db.models import Max
+from django.utils import timezone
+
+from .models import Stats
+
+
+logger = structlog.get_logger(__name__)
+
+
+class StatsRecorder:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._pending = {}
+        self._timer = None
+
+    def record(self, backend, url):
+        now = timezone.now()
+
+        interval = settings.API_STATS_FLUSH_INTERVAL
+        if not interval:
+            self._write({(backend.pk, url): now})
+            return
+
+        with self._lock:
+            self._pending[(backend.pk, url)] = now
+
+            if self._timer is None:
+                self._timer = threading.Timer(interval, self._flush_in_thread)
+                self._timer.daemon = True
+                self._timer.start()
+
+    def flush(self):
+        with self._lock:
+            pending, self._pending = self._pending, {}
+
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+
+        self._write(pending)
+
+    def last_seen(self, backend):
+        """
+        When was the given Backend last seen, or None if it never has been
+        """
+        with self._lock:
+            timestamps = [v for (pk, _), v in self._pending.items() if pk == backend.pk]
+
+        stored = backend.stats.aggregate(last_seen=Max("api_last_seen"))["last_seen"]
+        if stored is not None:
+            timestamps.append(stored)
+
+        return max(timestamps, default=None)
+
+    def _flush_in_thread(self):  # pragma: no cover
+        try:
+            self.flush()
+        except Exception:
+            logger.exception("Failed to flush API stats")
+        finally:
+            # this runs in a thread of its own, so clean up its connection
+            connection.close()
+
+    def _write(self, pending):
+        if not pending:
+            return
+
+        Stats.objects.bulk_create(
+            [
+                Stats(backend_id=backend_id, url=url, api_last_seen=last_seen)
+                for (backend_id, url), last_seen in pending.items()
+            ],
+            update_conflicts=True,
+            unique_fields=["backend", "url"],
+            update_fields=["api_last_seen"],
+        )
+
+
+recorder = StatsRecorder()
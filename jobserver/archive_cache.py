@@ -0,0 +1,173 @@
+"""
+A cache of built zips of ReleaseFiles, kept on disk
+
+Archives are keyed by a fingerprint of exactly what went into them, so any
+change to the set of files, or to one of those files, gives a new key rather
+than needing the old archive to be found and replaced.  They're kept in
+RELEASE_STORAGE so nginx can serve them with X-Accel-Redirect like any other
+released file.
+
+The cache is limited to RELEASE_ARCHIVE_CACHE_SIZE bytes in total, with the
+least recently used archives removed first to make room.
+"""
+
+import hashlib
+import json
+import os
+import tempfile
+from pathlib import Path
+
+import structlog
+from django.conf import settings
+
+from .models import ReleaseFile
+
+
+logger = structlog.get_logger(__name__)
+
+# bump this when the way archives are built changes so old ones aren't reused
+FORMAT_VERSION = "1"
+
+
+def cache_dir():
+    return settings.RELEASE_STORAGE / "archives"
+
+
+def archive_path(key):
+    return cache_dir() / f"{key}.zip"
+
+
+def _files_path(key):
+    # the ids of the ReleaseFiles an archive holds, so it can be found when one
+    # of them is redacted
+    return cache_dir() / f"{key}.json"
+
+
+def fingerprint(release_files, base_url):
+    """
+    Build a key which identifies the archive of the given ReleaseFiles
+
+    Redacted files are replaced with a notice which names who redacted them
+    and links back to this site, so those details, and the URL of the site,
+    are part of the key when there are any.  The order of the files doesn't
+    matter, so querysets without an ordering give a consistent key.
+    """
+    sha256 = hashlib.sha256(FORMAT_VERSION.encode())
+
+    redacted = False
+    for rfile in sorted(release_files, key=lambda f: f.pk):
+        parts = [rfile.pk, rfile.name, rfile.filehash]
+        if rfile.is_deleted:
+            redacted = True
+            name = rfile.deleted_by.name if rfile.deleted_by else ""
+            parts += [rfile.deleted_at.isoformat(), name]
+
+        sha256.update(json.dumps(parts).encode())
+
+    if redacted:
+        sha256.update(base_url.encode())
+
+    return sha256.hexdigest()
+
+
+def lookup(key):
+    """Get the path to the archive for key, if it's been cached"""
+    if not settings.RELEASE_ARCHIVE_CACHE_SIZE:
+        return
+
+    path = archive_path(key)
+    try:
+        # mark the archive as recently used
+        os.utime(path)
+    except FileNotFoundError:
+        return
+
+    return path
+
+
+def store(key, chunks, release_files):
+    """
+    Pass the chunks of an archive through, adding it to the cache as they go
+
+    The archive is only added once all of it has been written, so a download
+    which is abandoned part way through leaves nothing behind.  Once the
+    archive has been sent, failing to cache it is logged rather than raised,
+    since the download itself has succeeded.
+    """
+    if not settings.RELEASE_ARCHIVE_CACHE_SIZE:
+        yield from chunks
+        return
+
+    directory = cache_dir()
+    directory.mkdir(parents=True, exist_ok=True)
+
+    fd, tmp = tempfile.mkstemp(dir=directory, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            for chunk in chunks:
+                f.write(chunk)
+                yield chunk
+    except BaseException:
+        os.unlink(tmp)
+        raise
+
+    try:
+        _add(key, tmp, release_files)
+    except Exception:
+        logger.exception("Failed to cache archive", key=key)
+        Path(tmp).unlink(missing_ok=True)
+
+
+def _add(key, tmp, release_files):
+    _files_path(key).write_text(json.dumps([f.pk for f in release_files]))
+    os.replace(tmp, archive_path(key))
+
+    # a file could have been redacted while the archive was being built, in
+    # which case it's too late for invalidate() to have found it
+    live = [f.pk for f in release_files if not f.is_deleted]
+    if ReleaseFile.objects.filter(pk__in=live, deleted_at__isnull=False).exists():
+        remove(key)
+
+    evict()
+
+
+def remove(key):
+    archive_path(key).unlink(missing_ok=True)
+    _files_path(key).unlink(missing_ok=True)
+
+
+def invalidate(rfile):
+    """Remove any cached archives which hold the given ReleaseFile"""
+    if not cache_dir().exists():
+        return
+
+    for path in cache_dir().glob("*.json"):
+        try:
+            pks = json.loads(path.read_text())
+        except FileNotFoundError:
+            # removed by another process since we listed the directory
+            continue
+
+        if rfile.pk in pks:
+            remove(path.stem)
+
+
+def evict():
+    """Remove the least recently used archives until the cache fits its limit"""
+    archives = []
+    for path in cache_dir().glob("*.zip"):
+        try:
+            archives.append((path, path.stat()))
+        except FileNotFoundError:
+            # removed by another process since we listed the directory
+            continue
+
+    archives.sort(key=lambda archive: archive[1].st_mtime)
+
+    total = sum(stat.st_size for _, stat in archives)
+    for path, stat in archives:
+        if total <= settings.RELEASE_ARCHIVE_CACHE_SIZE:
+            break
+
+        remove(path.stem)
+        total -= stat.st_size
@@ -6,7 +6,13 @@ from .roles import (
     ProjectDeveloper,
     StaffAreaAdministrator,
 )
-from .utils import has_permission, has_role, roles_for, strings_to_roles
+from .utils import (
+    has_permission,
+    has_role,
+    roles_for,
+    roles_for_projects,
+    strings_to_roles,
+)
 
 
 __all__ = [
@@ -19,5 +25,6 @@ __all__ = [
     "has_permission",
     "has_role",
     "roles_for",
+    "roles_for_projects",
     "strings_to_roles",
 ]
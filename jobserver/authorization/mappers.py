@@ -7,11 +7,76 @@ querying the Roles or Permissions of, and return an iterable of Roles for that
 optional relationship.
 
 Each function is expected to handle the lookup of Roles in a given relationship.
+
+Inside roles_cache() each lookup is only made once, so checking several
+permissions for the same User and Project costs a single query.
 """
 
+import contextlib
+import contextvars
+
+
+# Roles looked up for a (user pk, project pk) pair, when caching is enabled
+_project_roles = contextvars.ContextVar("project_roles", default=None)
+
+
+@contextlib.contextmanager
+def roles_cache():
+    """Cache the Roles looked up by the mappers until exiting"""
+    token = _project_roles.set({})
+    try:
+        yield
+    finally:
+        _project_roles.reset(token)
+
+
+def clear_roles_cache():
+    """Forget any cached Roles, so changes to memberships are seen"""
+    cache = _project_roles.get()
+    if cache is not None:
+        cache.clear()
+
 
 def get_project_roles_for_user(project, user):
+    cache = _project_roles.get()
+    key = (user.pk, project.pk)
+    if cache is not None and key in cache:
+        return cache[key]
+
     try:
-        return project.memberships.get(user=user).roles
+        roles = project.memberships.get(user=user).roles
     except project.memberships.model.DoesNotExist:
-        return []
+        roles = []
+
+    if cache is not None:
+        cache[key] = roles
+
+    return roles
+
+
+def get_projects_roles_for_user(projects, user):
+    """
+    Get the User's Roles for each of the given Projects
+
+    Returns a dict of Project pk to Roles, looking up any which aren't cached
+    in a single query.
+    """
+    # avoid circular imports
+    from jobserver.models import ProjectMembership
+
+    cache = _project_roles.get()
+    if cache is None:
+        cache = {}
+
+    pks = {p.pk for p in projects}
+    missing = {pk for pk in pks if (user.pk, pk) not in cache}
+    if missing:
+        memberships = dict(
+            ProjectMembership.objects.filter(
+                project__in=missing, user=user
+            ).values_list("project_id", "roles")
+        )
+        for pk in missing:
+            cache[(user.pk, pk)] = memberships.get(pk, [])
+
+    return {pk: cache[(user.pk, pk)] for pk in pks}
@@ -1,5 +1,7 @@
 from django.utils.module_loading import import_string
 
+from .registry import ROLES_BY_PATH
+
 
 def _ensure_role_paths(paths):
     """
@@ -19,6 +21,10 @@ def _ensure_role_paths(paths):
 
 
 def parse_role(path):
+    # registered Roles' paths are known to be valid
+    if role := ROLES_BY_PATH.get(path):
+        return role
+
     _ensure_role_paths([path])
 
     return import_string(path)
@@ -0,0 +1,55 @@
+"""
+A registry of our Role classes
+
+Looking Roles up by introspecting the roles module, or flattening their
+permissions, on every call adds up on hot paths such as loading RolesArrayField
+values or checking permissions.  The Roles don't change once they're defined so
+we build the lookups we need once, at import time, and freeze them.
+
+Roles defined elsewhere, such as the ones tests create, aren't registered, so
+each lookup falls back to working them out the slow way.
+"""
+
+import functools
+import inspect
+from types import MappingProxyType
+
+from ..utils import dotted_path
+from . import roles
+
+
+def _build_registry():
+    by_name = dict(inspect.getmembers(roles, inspect.isclass))
+
+    by_model = {}
+    for role in by_name.values():
+        for model in role.models:
+            by_model.setdefault(model, []).append(role)
+
+    return (
+        MappingProxyType(by_name),
+        MappingProxyType({dotted_path(r): r for r in by_name.values()}),
+        MappingProxyType({m: tuple(r) for m, r in by_model.items()}),
+        MappingProxyType({r: frozenset(r.permissions) for r in by_name.values()}),
+    )
+
+
+ROLES_BY_NAME, ROLES_BY_PATH, ROLES_BY_MODEL, ROLE_PERMISSIONS = _build_registry()
+
+
+def role_permissions(role):
+    """Get the given Role's permissions as a frozenset"""
+    try:
+        return ROLE_PERMISSIONS[role]
+    except KeyError:
+        return frozenset(role.permissions)
+
+
+@functools.lru_cache(maxsize=1024)
+def _permissions_for(roles):
+    return frozenset().union(*(role_permissions(r) for r in roles))
+
+
+def permissions_for(roles):
+    """Get the union of the given Roles' permissions as a frozenset"""
+    return _permissions_for(frozenset(roles))
@@ -1,9 +1,6 @@
-import inspect
-import itertools
-
 from ..utils import dotted_path
-from . import roles
-from .mappers import get_project_roles_for_user
+from .mappers import get_project_roles_for_user, get_projects_roles_for_user
+from .registry import ROLES_BY_MODEL, ROLES_BY_NAME, role_permissions
 
 
 def _validate_context(allowed_keys, context):
@@ -100,14 +97,9 @@ def has_permission(user, permission, **context):
 
     roles = _get_roles(user, **context)
 
-    # Flatten each Roles permissions list into a single iterable
-    permissions = itertools.chain.from_iterable(r.permissions for r in roles)
-
-    # convert the itertools.chain generator into a set so we can check membership
-    permissions = set(permissions)
-
-    # return a boolean for whether the requested permission is in that set
-    return permission in permissions
+    # return a boolean for whether the requested permission is in any of the
+    # Roles' permissions
+    return any(permission in role_permissions(r) for r in roles)
 
 
 def has_role(user, role, **context):
@@ -117,17 +109,24 @@ def has_role(user, role, **context):
     return role in _get_roles(user, **context)
 
 
-def roles_for(model):
-    """Get Roles linked to the given Model"""
-    path = dotted_path(model)
+def roles_for_projects(user, projects):
+    """
+    Build up the set of Roles the User has for each of the given Projects
+
+    This is the bulk equivalent of calling _get_roles with each Project as the
+    context, and looks up the User's memberships in a single query.
+    """
+    projects = list(projects)
+    if not user.is_authenticated:
+        return {p: set() for p in projects}
 
-    # get all role classes
-    available_roles = [
-        value for name, value in inspect.getmembers(roles, inspect.isclass)
-    ]
+    project_roles = get_projects_roles_for_user(projects, user)
+    return {p: set(user.roles) | set(project_roles[p.pk]) for p in projects}
 
-    # get roles where the given model is listed
-    return [r for r in available_roles if path in r.models]
+
+def roles_for(model):
+    """Get Roles linked to the given Model"""
+    return list(ROLES_BY_MODEL.get(dotted_path(model), []))
 
 
 def strings_to_roles(strings):
@@ -137,23 +136,16 @@ def strings_to_roles(strings):
     Given an iterable of strings, convert them to the appropriate Role
     classes, ensuring they are valid Role names.
     """
-    # use introspection to find the available Role classes, with their string
-    # names
-    available_roles = inspect.getmembers(roles, inspect.isclass)
-
-    # convert available role into just their string names
-    available_names = [name for name, value in available_roles]
-
     # ensure the given strings all map to roles
-    unknown_roles = set(strings) - set(available_names)
+    unknown_roles = set(strings) - ROLES_BY_NAME.keys()
     if unknown_roles:
         unknown_lines = "\n".join(f" - {r}" for r in unknown_roles)
         msg = f"Unknown Roles:\n{unknown_lines}"
 
-        available_lines = "\n".join(f" - {r}" for r in available_names)
+        available_lines = "\n".join(f" - {r}" for r in ROLES_BY_NAME)
         msg += f"\nAvailable Roles are:\n{available_lines}"
 
         raise Exception(msg)
 
     # convert selected role strings to classes
-    return [value for name, value in available_roles if name in strings]
+    return [value for name, value in ROLES_BY_NAME.items() if name in strings]
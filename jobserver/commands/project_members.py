@@ -1,8 +1,9 @@
 from django.db import transaction
 from django.utils import timezone
 
+from ..authorization.mappers import clear_roles_cache
 from ..authorization.utils import dotted_path
-from ..models import AuditableEvent, ProjectMembership
+from ..models import AuditableEvent, ProjectMembership, User
 
 
 @transaction.atomic()
@@ -14,6 +15,8 @@ def add(*, project, user, roles, by):
         roles=roles,
     )
     membership.save(override=True)
+    clear_roles_cache()
+    User.objects.filter(pk=user.pk).bump_level4_version()
 
     # use a single timestamp in case we're also setting roles below and
     # want to match up records in the future
@@ -68,6 +71,8 @@ def update_roles(*, membership, by, roles):
 
     membership.roles = roles
     membership.save(update_fields=["roles"], override=True)
+    clear_roles_cache()
+    User.objects.filter(pk=membership.user_id).bump_level4_version()
 
 
 @transaction.atomic()
@@ -97,3 +102,5 @@ def remove(*, membership, by):
     )
 
     membership.delete(override=True)
+    clear_roles_cache()
+    User.objects.filter(pk=membership.user_id).bump_level4_version()
@@ -0,0 +1,130 @@
+"""
+Push notifications for changes to a backend's JobRequests
+
+Backend.objects.bump_job_requests_version() calls notify() whenever a change
+could alter what JobRequestAPIList returns for a backend.  This uses PostgreSQL's NOTIFY, which
+is only delivered when the surrounding transaction commits.
+
+Each process holds a single LISTENing connection, in a background thread
+started the first time a request waits, and wakes any request threads waiting
+on the relevant backend.  Waiting requests don't hold a database connection of
+their own, so a threaded worker can hold many of them open cheaply.
+"""
+
+import collections
+import select
+import threading
+import time
+
+import structlog
+from django.db import connection, connections
+
+
+logger = structlog.get_logger(__name__)
+
+CHANNEL = "jobserver_job_requests"
+
+# how long to wait before reconnecting after losing the LISTEN connection
+RECONNECT_DELAY = 1
+
+# how often the listening thread checks whether it has been stopped
+POLL_INTERVAL = 1
+
+
+def notify(backend_id):
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT pg_notify(%s, %s)", [CHANNEL, str(backend_id)])
+
+
+class Listener:
+    def __init__(self):
+        self._condition = threading.Condition()
+        self._counts = collections.Counter()
+        self._stopping = threading.Event()
+        self._thread = None
+
+        # set while the background thread is LISTENing
+        self.listening = threading.Event()
+
+    def mark(self, backend_id):
+        """
+        Return a marker for the notifications seen so far for a backend
+
+        Take the marker before checking the database for changes, then pass
+        it to wait() so a notification which arrives in between isn't missed.
+        """
+        self.start()
+
+        with self._condition:
+            return self._counts[str(backend_id)]
+
+    def wait(self, backend_id, marker, timeout):
+        """
+        Wait for a notification for the given backend since marker was taken
+
+        Returns True if one arrived, or False if the timeout passed first.
+        """
+        key = str(backend_id)
+
+        with self._condition:
+            return self._condition.wait_for(
+                lambda: self._counts[key] != marker, timeout=timeout
+            )
+
+    def start(self):
+        with self._condition:
+            if self._thread is not None:
+                return
+
+            self._stopping.clear()
+            self._thread = threading.Thread(
+                target=self._run, name="job-request-listener", daemon=True
+            )
+            self._thread.start()
+
+    def stop(self):
+        with self._condition:
+            thread, self._thread = self._thread, None
+
+        if thread is None:
+            return
+
+        self._stopping.set()
+        thread.join()
+
+    def _run(self):
+        while not self._stopping.is_set():
+            try:
+                self._listen()
+            except Exception:  # pragma: no cover
+                logger.exception("Lost JobRequest LISTEN connection, reconnecting")
+                time.sleep(RECONNECT_DELAY)
+
+    def _listen(self):
+        # use a connection of our own rather than this thread's default one
+        # so it's never closed from under us at the end of a request
+        wrapper = connections.create_connection("default")
+        try:
+            wrapper.ensure_connection()
+            conn = wrapper.connection
+            conn.add_notify_handler(self._handle)
+            conn.execute(f"LISTEN {CHANNEL}")
+            self.listening.set()
+
+            while not self._stopping.is_set():
+                # notifications are only processed when the connection is
+                # used, so wait for data to arrive and then poke it
+                ready, _, _ = select.select([conn.fileno()], [], [], POLL_INTERVAL)
+                if ready:
+                    conn.execute("SELECT 1")
+        finally:
+            self.listening.clear()
+            wrapper.close()
+
+    def _handle(self, notification):
+        with self._condition:
+            self._counts[notification.payload] += 1
+            self._condition.notify_all()
+
+
+listener = Listener()
@@ -0,0 +1,13 @@
+from django_extensions.management.jobs import DailyJob
+from sentry_sdk.crons.decorator import monitor
+
+from jobserver import outbox
+from services.sentry import monitor_config
+
+
+class Job(DailyJob):
+    help = "Delete delivered and failed outbox messages past their retention"  # noqa: A003
+
+    @monitor(monitor_slug="prune_outbox", monitor_config=monitor_config("daily"))
+    def execute(self):
+        outbox.prune()
@@ -0,0 +1,72 @@
+import os
+
+from django.core.management.base import BaseCommand
+
+from ... import releases
+from ...models import ReleaseFile
+
+
+class Command(BaseCommand):
+    """
+    Move uploaded ReleaseFiles into the content addressed store
+
+    Files uploaded before release files were stored by their hash have a copy
+    of their own on disk.  This links each of them to the stored copy for its
+    hash instead, using the first file found with each hash as that copy, so
+    the space used by any duplicates is freed.
+
+    It's safe to run more than once, files which are already linked are
+    skipped.
+    """
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Report what would change without touching any files",
+        )
+
+    def handle(self, *args, dry_run=False, **options):
+        counts = dict.fromkeys(["linked", "stored", "skipped", "missing", "invalid"], 0)
+        freed = 0
+        stored = set()
+
+        files = (
+            ReleaseFile.objects.filter(uploaded_at__isnull=False, deleted_at=None)
+            .exclude(path="")
+            .order_by("pk")
+        )
+        for rfile in files.iterator():
+            path = rfile.absolute_path()
+            blob = releases.blob_path(rfile.filehash)
+            have_blob = blob.exists() or rfile.filehash in stored
+
+            if not path.exists():
+                counts["missing"] += 1
+                continue
+
+            if blob.exists() and os.path.samefile(path, blob):
+                counts["skipped"] += 1
+                continue
+
+            # check the file is what we think it is before trusting it as the
+            # stored copy for this hash
+            if releases.file_hash(path) != rfile.filehash:
+                self.stderr.write(f"{rfile.pk}: {path} does not match its hash")
+                counts["invalid"] += 1
+                continue
+
+            if have_blob:
+                counts["linked"] += 1
+                freed += path.stat().st_size
+                if not dry_run:
+                    releases.link_blob(rfile.filehash, path)
+            else:
+                counts["stored"] += 1
+                stored.add(rfile.filehash)
+                if not dry_run:
+                    blob.parent.mkdir(parents=True, exist_ok=True)
+                    os.link(path, blob)
+
+        summary = ", ".join(f"{k} {v}" for k, v in counts.items())
+        self.stdout.write(f"{summary}, freed {freed} bytes")
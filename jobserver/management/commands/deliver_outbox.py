@@ -0,0 +1,59 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from ... import outbox
+
+
+class Command(BaseCommand):
+    """
+    Deliver side effects queued in the outbox
+
+    Runs forever, polling for due messages, unless --once is passed.
+    """
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--once", action="store_true", help="Deliver one batch and exit"
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=100,
+            help="Number of messages to claim at a time",
+        )
+        parser.add_argument(
+            "--concurrency",
+            type=int,
+            default=4,
+            help="Number of messages to deliver at the same time",
+        )
+        parser.add_argument(
+            "--max-attempts",
+            type=int,
+            default=outbox.MAX_ATTEMPTS,
+            help="Number of attempts before a message is marked as failed",
+        )
+        parser.add_argument(
+            "--interval",
+            type=float,
+            default=1,
+            help="Seconds to wait between polls when there's nothing to deliver",
+        )
+
+    def handle(self, *args, **options):
+        while True:
+            delivered, failed = outbox.deliver_pending(
+                batch_size=options["batch_size"],
+                concurrency=options["concurrency"],
+                max_attempts=options["max_attempts"],
+            )
+
+            if delivered or failed:
+                self.stdout.write(f"Delivered {delivered}, failed {failed}")
+
+            if options["once"]:
+                break
+
+            if not (delivered or failed):  # pragma: no cover
+                time.sleep(options["interval"])
@@ -1,5 +1,6 @@
 from django.conf import settings
 
+from jobserver.authorization.mappers import roles_cache
 from jobserver.models import Backend
 
 
@@ -15,6 +16,22 @@ class XSSFilteringMiddleware:
         return response
 
 
+class RolesCacheMiddleware:
+    """
+    Cache the Roles looked up for permission checks for each request
+
+    Views often check several permissions for the same User and Project, this
+    makes those checks cost a single query.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        with roles_cache():
+            return self.get_response(request)
+
+
 class TemplateNameMiddleware:
     def __init__(self, get_response):
         self.get_response = get_response
@@ -0,0 +1,17 @@
+# Generated by Django 5.1.2 on 2026-10-18 18:24
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("jobserver", "0008_coredeveloper_to_staffareaadministrator"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="backend",
+            name="jobrunner_cursor",
+            field=models.DateTimeField(null=True),
+        ),
+    ]
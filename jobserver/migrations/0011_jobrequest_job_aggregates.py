@@ -0,0 +1,122 @@
+# Generated by Django 5.1.2 on 2026-10-18 18:36
+
+from django.db import migrations, models
+
+
+# frozen copies of get_status() and get_job_aggregates() from
+# jobserver.models.job_request, as they were when this migration was written,
+# so later changes to them don't change what it does
+
+
+def get_status(statuses):
+    if len(set(statuses)) == 1:
+        return statuses[0]
+
+    if "running" in statuses:
+        return "running"
+
+    if "pending" in statuses:
+        return "running"
+
+    if "failed" in statuses:
+        return "failed"
+
+    return "unknown"
+
+
+def get_job_aggregates(jobs):
+    jobs = list(jobs)
+
+    status = get_status([j.status for j in jobs])
+
+    job_status_counts = {}
+    for job in jobs:
+        job_status_counts[job.status] = job_status_counts.get(job.status, 0) + 1
+
+    started_ats = [j.started_at for j in jobs if j.started_at is not None]
+    started_at = min(started_ats, default=None)
+
+    completed_at = None
+    completed_ats = [j.completed_at for j in jobs]
+    if status in ["failed", "succeeded"] and None not in completed_ats:
+        completed_at = max(completed_ats, default=None)
+
+    runtime_seconds = sum(
+        (j.completed_at - j.started_at).total_seconds()
+        for j in jobs
+        if j.status in ["failed", "succeeded"]
+        and j.started_at is not None
+        and j.completed_at is not None
+    )
+
+    return {
+        "status": status,
+        "started_at": started_at,
+        "completed_at": completed_at,
+        "runtime_seconds": int(runtime_seconds),
+        "job_status_counts": job_status_counts,
+        "last_updated_at": max((j.updated_at for j in jobs), default=None),
+    }
+
+
+def backfill_job_aggregates(apps, schema_editor):
+    JobRequest = apps.get_model("jobserver", "JobRequest")
+
+    job_requests = JobRequest.objects.prefetch_related("jobs").order_by("pk")
+
+    batch = []
+    for job_request in job_requests.iterator(chunk_size=1000):
+        aggregates = get_job_aggregates(job_request.jobs.all())
+        for name, value in aggregates.items():
+            setattr(job_request, name, value)
+        batch.append(job_request)
+
+        if len(batch) == 1000:
+            JobRequest.objects.bulk_update(batch, list(aggregates))
+            batch = []
+
+    if batch:
+        JobRequest.objects.bulk_update(batch, list(aggregates))
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("jobserver", "0010_outboxmessage"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="jobrequest",
+            name="completed_at",
+            field=models.DateTimeField(null=True),
+        ),
+        migrations.AddField(
+            model_name="jobrequest",
+            name="job_status_counts",
+            field=models.JSONField(default=dict),
+        ),
+        migrations.AddField(
+            model_name="jobrequest",
+            name="last_updated_at",
+            field=models.DateTimeField(null=True),
+        ),
+        migrations.AddField(
+            model_name="jobrequest",
+            name="runtime_seconds",
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name="jobrequest",
+            name="started_at",
+            field=models.DateTimeField(null=True),
+        ),
+        migrations.AddField(
+            model_name="jobrequest",
+            name="status",
+            field=models.TextField(default="unknown"),
+        ),
+        migrations.RunPython(
+            backfill_job_aggregates,
+            reverse_code=migrations.RunPython.noop,
+        ),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 5.1.2 on 2026-10-18 18:46
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("jobserver", "0011_jobrequest_job_aggregates"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="backend",
+            name="job_requests_version",
+            field=models.PositiveBigIntegerField(default=0),
+        ),
+        migrations.AddIndex(
+            model_name="jobrequest",
+            index=models.Index(
+                condition=models.Q(
+                    ("status__in", ["pending", "running"]),
+                    ("job_status_counts", {}),
+                    _connector="OR",
+                ),
+                fields=["backend", "-created_at"],
+                name="jobrequest_active_idx",
+            ),
+        ),
+    ]
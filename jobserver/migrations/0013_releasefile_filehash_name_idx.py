@@ -0,0 +1,18 @@
+# Generated by Django 5.1.2 on 2026-10-18 19:38
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("jobserver", "0012_jobrequest_list_version"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="releasefile",
+            index=models.Index(
+                fields=["filehash", "name"], name="releasefile_filehash_name_idx"
+            ),
+        ),
+    ]
@@ -0,0 +1,99 @@
+# Generated by Django 5.1.2 on 2026-10-18 19:41
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def backfill_latest_release_files(apps, schema_editor):
+    LatestReleaseFile = apps.get_model("jobserver", "LatestReleaseFile")
+    ReleaseFile = apps.get_model("jobserver", "ReleaseFile")
+
+    latest = (
+        ReleaseFile.objects.order_by(
+            "workspace", "release__backend", "name", "-release__created_at"
+        )
+        .distinct("workspace", "release__backend", "name")
+        .values_list(
+            "workspace", "release__backend", "name", "pk", "release__created_at"
+        )
+    )
+
+    batch = []
+    for workspace_id, backend_id, name, pk, created_at in latest.iterator(
+        chunk_size=1000
+    ):
+        batch.append(
+            LatestReleaseFile(
+                workspace_id=workspace_id,
+                backend_id=backend_id,
+                name=name,
+                release_file_id=pk,
+                release_created_at=created_at,
+            )
+        )
+
+        if len(batch) == 1000:
+            LatestReleaseFile.objects.bulk_create(batch)
+            batch = []
+
+    LatestReleaseFile.objects.bulk_create(batch)
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("jobserver", "0013_releasefile_filehash_name_idx"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="LatestReleaseFile",
+            fields=[
+                (
+                    "id",
+                    models.AutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("name", models.TextField()),
+                ("release_created_at", models.DateTimeField()),
+                (
+                    "backend",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="+",
+                        to="jobserver.backend",
+                    ),
+                ),
+                (
+                    "release_file",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="+",
+                        to="jobserver.releasefile",
+                    ),
+                ),
+                (
+                    "workspace",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="latest_files",
+                        to="jobserver.workspace",
+                    ),
+                ),
+            ],
+            options={
+                "constraints": [
+                    models.UniqueConstraint(
+                        fields=("workspace", "backend", "name"),
+                        name="latestreleasefile_workspace_backend_name_unique",
+                    )
+                ],
+            },
+        ),
+        migrations.RunPython(
+            backfill_latest_release_files, reverse_code=migrations.RunPython.noop
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 5.1.2 on 2026-10-18 19:47
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("jobserver", "0014_latestreleasefile"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="workspace",
+            name="files_version",
+            field=models.PositiveBigIntegerField(default=0),
+        ),
+    ]
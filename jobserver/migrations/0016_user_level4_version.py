@@ -0,0 +1,17 @@
+# Generated by Django 5.1.2 on 2026-10-18 20:31
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("jobserver", "0015_workspace_files_version"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="user",
+            name="level4_version",
+            field=models.PositiveBigIntegerField(default=0),
+        ),
+    ]
@@ -62,3 +62,32 @@ class ImmutableQuerySet(models.QuerySet):
 
 class ImmutableManager(models.Manager.from_queryset(ImmutableQuerySet)):
     pass
+
+
+class VersionFieldsMixin:
+    """
+    Keep version counters out of ordinary saves
+
+    Version fields are only ever changed with F() updates, so writing back
+    whatever value an instance happened to load would rewind them, and reissue
+    versions clients have already seen.
+    """
+
+    version_fields = []
+
+    def save(self, *args, **kwargs):
+        if not self._state.adding:
+            update_fields = kwargs.get("update_fields")
+            if update_fields is None:
+                deferred = self.get_deferred_fields()
+                update_fields = [
+                    f.name
+                    for f in self._meta.concrete_fields
+                    if not f.primary_key and f.attname not in deferred
+                ]
+
+            kwargs["update_fields"] = [
+                f for f in update_fields if f not in self.version_fields
+            ]
+
+        super().save(*args, **kwargs)
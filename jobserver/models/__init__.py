@@ -3,8 +3,10 @@ from .backend import Backend
 from .backend_membership import BackendMembership
 from .job import Job
 from .job_request import JobRequest
+from .latest_release_file import LatestReleaseFile
 from .org import Org
 from .org_membership import OrgMembership
+from .outbox import OutboxMessage
 from .project import Project
 from .project_collaboration import ProjectCollaboration
 from .project_membership import ProjectMembership
@@ -26,8 +28,10 @@ __all__ = [
     "BackendMembership",
     "Job",
     "JobRequest",
+    "LatestReleaseFile",
     "Org",
     "OrgMembership",
+    "OutboxMessage",
     "Project",
     "ProjectCollaboration",
     "ProjectMembership",
@@ -4,9 +4,14 @@ from datetime import timedelta
 
 import structlog
 from django.db import models
+from django.db.models import F
 from django.urls import reverse
 from django.utils import timezone
 
+from .. import job_request_events
+from ..api import token_cache
+from ..model_utils import VersionFieldsMixin
+
 
 logger = structlog.get_logger(__name__)
 
@@ -16,7 +21,27 @@ def generate_token():
     return binascii.hexlify(os.urandom(20)).decode()
 
 
-class Backend(models.Model):
+class BackendQuerySet(models.QuerySet):
+    def bump_job_requests_version(self, pks):
+        """
+        Mark the given Backends' lists of JobRequests as changed
+
+        JobRequestAPIList builds its ETags from job_requests_version, and wakes
+        anyone long polling it for one of these Backends.
+        """
+        pks = set(pks)
+        if not pks:
+            return
+
+        # use an UPDATE so concurrent bumps can't be lost
+        self.filter(pk__in=pks).update(
+            job_requests_version=F("job_requests_version") + 1
+        )
+        for pk in pks:
+            job_request_events.notify(pk)
+
+
+class Backend(VersionFieldsMixin, models.Model):
     """A job-runner instance"""
 
     slug = models.SlugField(max_length=255, unique=True)
@@ -38,12 +63,37 @@ class Backend(models.Model):
 
     jobrunner_state = models.JSONField(null=True)
 
+    # the most recent Job.updated_at we've been sent by this backend's
+    # job-runner, it sends Jobs updated since this point in delta syncs.
+    jobrunner_cursor = models.DateTimeField(null=True)
+
+    # bumped each time one of this backend's JobRequests changes in a way that
+    # could change what JobRequestAPIList returns for it, so that view can
+    # build an ETag without querying JobRequests.
+    job_requests_version = models.PositiveBigIntegerField(default=0)
+    version_fields = ["job_requests_version"]
+
     created_at = models.DateTimeField(default=timezone.now)
     updated_at = models.DateTimeField(auto_now=True)
 
+    objects = BackendQuerySet.as_manager()
+
     def __str__(self):
         return self.slug
 
+    def save(self, *args, **kwargs):
+        # other processes spot a changed token by updated_at moving on
+        update_fields = kwargs.get("update_fields")
+        if update_fields is not None and "auth_token" in update_fields:
+            kwargs["update_fields"] = {*update_fields, "updated_at"}
+
+        super().save(*args, **kwargs)
+
+        # any full save, such as rotating the token or editing the backend in
+        # the staff area, might change what a cached token resolves to
+        if update_fields is None or "auth_token" in update_fields:
+            token_cache.cache.clear()
+
     def get_edit_url(self):
         return reverse("staff:backend-edit", kwargs={"pk": self.pk})
 
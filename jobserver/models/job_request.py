@@ -4,14 +4,16 @@ import secrets
 import structlog
 from django.contrib.postgres.fields import ArrayField
 from django.db import models
-from django.db.models import Max, Min, Q, prefetch_related_objects
+from django.db.models import Q
+from django.db.models.signals import post_delete
+from django.dispatch import receiver
 from django.urls import reverse
 from django.utils import timezone
-from django.utils.functional import cached_property
 from furl import furl
 
 from ..permissions.t1oo import project_is_permitted_to_use_t1oo_data
 from ..runtime import Runtime
+from .backend import Backend
 
 
 logger = structlog.get_logger(__name__)
@@ -32,12 +34,99 @@ def new_id():
     return base64.b32encode(secrets.token_bytes(10)).decode("ascii").lower()
 
 
+def get_status(statuses):
+    """
+    Derive a JobRequest's status from the statuses of its Jobs
+    """
+    # when they're all the same, just use that
+    if len(set(statuses)) == 1:
+        return statuses[0]
+
+    # if any status is running then the JobRequest is running
+    if "running" in statuses:
+        return "running"
+
+    # we've eliminated all statuses being the same so any pending statuses
+    # at this point mean there are other Jobs which are
+    # running/failed/succeeded so the request is still running
+    if "pending" in statuses:
+        return "running"
+
+    # now we know we have no pending or running Jobs left, that leaves us
+    # with failed or succeeded and a JobRequest is failed if any of its
+    # Jobs have failed.
+    if "failed" in statuses:
+        return "failed"
+
+    return "unknown"
+
+
+def get_job_aggregates(jobs):
+    """
+    Summarise the given Jobs into the values JobRequest stores about them
+
+    The returned dict maps JobRequest field names to their values, so it can
+    be applied to a JobRequest directly.
+    """
+    jobs = list(jobs)
+
+    status = get_status([j.status for j in jobs])
+
+    job_status_counts = {}
+    for job in jobs:
+        job_status_counts[job.status] = job_status_counts.get(job.status, 0) + 1
+
+    started_ats = [j.started_at for j in jobs if j.started_at is not None]
+    started_at = min(started_ats, default=None)
+
+    # a JobRequest has only finished once all of its Jobs have
+    completed_at = None
+    completed_ats = [j.completed_at for j in jobs]
+    if status in ["failed", "succeeded"] and None not in completed_ats:
+        completed_at = max(completed_ats, default=None)
+
+    # Runtime of each completed Job is added together, rather than using the
+    # delta of the first start time and last completed time.
+    runtime_seconds = sum(
+        (j.completed_at - j.started_at).total_seconds()
+        for j in jobs
+        if j.status in ["failed", "succeeded"]
+        and j.started_at is not None
+        and j.completed_at is not None
+    )
+
+    return {
+        "status": status,
+        "started_at": started_at,
+        "completed_at": completed_at,
+        "runtime_seconds": int(runtime_seconds),
+        "job_status_counts": job_status_counts,
+        "last_updated_at": max((j.updated_at for j in jobs), default=None),
+    }
+
+
 class JobRequestQuerySet(models.QuerySet):
-    def with_started_at(self):
-        return self.prefetch_related("jobs").annotate(
-            started_at=Min("jobs__started_at")
+    def active(self):
+        """
+        JobRequests which job-runner still has work to do for
+
+        This is any JobRequest which hasn't had Jobs created for it yet, or
+        which has pending or running Jobs.
+        """
+        return self.filter(
+            Q(status__in=["pending", "running"]) | Q(job_status_counts={})
         )
 
+    def bump_job_requests_version(self):
+        """
+        Mark the lists of JobRequests for these JobRequests' Backends as changed
+
+        For changes to related models which JobRequestAPIList includes in each
+        JobRequest, such as its Workspace or Project.
+        """
+        pks = self.order_by().values_list("backend_id", flat=True).distinct()
+        Backend.objects.bump_job_requests_version(pks)
+
 
 class JobRequestManager(models.Manager.from_queryset(JobRequestQuerySet)):
     use_in_migrations = True
@@ -49,14 +138,9 @@ class JobRequestManager(models.Manager.from_queryset(JobRequestQuerySet)):
             id__lt=job_request.id,
         )
         if filter_succeeded:
-            # "succeeded" is the last in an alphabetical sort of the statuses, so
-            # if the minimum of the related Job's statuses is "succeeded" then they
-            # all must be. There are no constraints on this field, however, so
-            # checking the maximum as well ensure this is robust to new statuses
-            # which would sort later than "succeeded"
-            workspace_backend_job_requests = workspace_backend_job_requests.annotate(
-                min_status=Min("jobs__status"), max_status=Max("jobs__status")
-            ).filter(min_status="succeeded", max_status="succeeded")
+            workspace_backend_job_requests = workspace_backend_job_requests.filter(
+                status="succeeded"
+            )
         return workspace_backend_job_requests.order_by("created_at").last()
 
 
@@ -85,6 +169,16 @@ class JobRequest(models.Model):
     project_definition = models.TextField(default="")
     codelists_ok = models.BooleanField(default=True)
 
+    # These fields are derived from the JobRequest's Jobs and maintained by
+    # update_from_jobs() each time job-runner syncs them, so listing pages
+    # and the API can read them without touching the jobs table.
+    status = models.TextField(default="unknown")
+    started_at = models.DateTimeField(null=True)
+    completed_at = models.DateTimeField(null=True)
+    runtime_seconds = models.IntegerField(default=0)
+    job_status_counts = models.JSONField(default=dict)
+    last_updated_at = models.DateTimeField(null=True)
+
     created_at = models.DateTimeField(default=timezone.now)
     created_by = models.ForeignKey(
         "User",
@@ -94,7 +188,27 @@ class JobRequest(models.Model):
 
     objects = JobRequestManager()
 
+    # fields JobRequestAPIList neither returns nor filters on, saves touching
+    # only these don't change the backend's JobRequest list version
+    UNLISTED_FIELDS = {
+        "completed_at",
+        "last_updated_at",
+        "runtime_seconds",
+        "started_at",
+        "will_notify",
+    }
+
     class Meta:
+        indexes = [
+            # backs JobRequestQuerySet.active() so the JobRequests job-runners
+            # poll for stay cheap to find as the table grows
+            models.Index(
+                fields=["backend", "-created_at"],
+                condition=Q(status__in=["pending", "running"])
+                | Q(job_status_counts={}),
+                name="jobrequest_active_idx",
+            ),
+        ]
         constraints = [
             models.CheckConstraint(
                 condition=(
@@ -116,18 +230,6 @@ class JobRequest(models.Model):
     def __str__(self):
         return str(self.pk)
 
-    @cached_property
-    def completed_at(self):
-        last_job = self.jobs.order_by("completed_at").last()
-
-        if not last_job:
-            return
-
-        if self.status not in ["failed", "succeeded"]:
-            return
-
-        return last_job.completed_at
-
     def get_absolute_url(self):
         return reverse(
             "job-request-detail",
@@ -191,7 +293,11 @@ class JobRequest(models.Model):
 
     @property
     def num_completed(self):
-        return len([j for j in self.jobs.all() if j.status == "succeeded"])
+        return self.job_status_counts.get("succeeded", 0)
+
+    @property
+    def num_jobs(self):
+        return sum(self.job_status_counts.values())
 
     def request_cancellation(self):
         # Exclude succeeded jobs (failed or succeeded status, consistent with Job.is_completed method)
@@ -216,57 +322,37 @@ class JobRequest(models.Model):
         if self.started_at is None:
             return Runtime(0, 0, 0)
 
-        def runtime_in_seconds(job):
-            if job.started_at is None or job.completed_at is None:
-                return 0
-
-            return (job.completed_at - job.started_at).total_seconds()
-
-        # Only look at jobs which have completed
-        jobs = self.jobs.filter(Q(status="failed") | Q(status="succeeded"))
-        total_runtime = sum(runtime_in_seconds(j) for j in jobs)
-
-        hours, remainder = divmod(total_runtime, 3600)
+        hours, remainder = divmod(self.runtime_seconds, 3600)
         minutes, seconds = divmod(remainder, 60)
 
-        return Runtime(int(hours), int(minutes), int(seconds))
-
-    @property
-    def status(self):
-        prefetched_jobs = (
-            hasattr(self, "_prefetched_objects_cache")
-            and "jobs" in self._prefetched_objects_cache
-        )
-        if not prefetched_jobs:
-            # require Jobs are prefetched to get statuses since we have to
-            # query every Job for the logic below to work
-            prefetch_related_objects([self], "jobs")
+        return Runtime(hours, minutes, seconds)
 
-        # always make use of prefetched Jobs, so we don't execute O(N) queries
-        # each time.
-        statuses = [j.status for j in self.jobs.all()]
+    def save(self, *args, **kwargs):
+        super().save(*args, **kwargs)
 
-        # when they're all the same, just use that
-        if len(set(statuses)) == 1:
-            return statuses[0]
+        update_fields = kwargs.get("update_fields")
+        if update_fields is None or set(update_fields) - self.UNLISTED_FIELDS:
+            Backend.objects.bump_job_requests_version([self.backend_id])
 
-        # if any status is running then the JobRequest is running
-        if "running" in statuses:
-            return "running"
+    def update_from_jobs(self, jobs=None):
+        """
+        Refresh the fields derived from this JobRequest's Jobs
 
-        # we've eliminated all statuses being the same so any pending statuses
-        # at this point mean there are other Jobs which are
-        # running/failed/succeeded so the request is still running
-        if "pending" in statuses:
-            return "running"
+        Pass jobs when the caller already holds the current set of Jobs to
+        avoid looking them up again.  Only fields whose values have changed
+        are written.
+        """
+        if jobs is None:
+            jobs = self.jobs.all()
 
-        # now we know we have no pending or running Jobs left, that leaves us
-        # with failed or succeeded and a JobRequest is failed if any of its
-        # Jobs have failed.
-        if "failed" in statuses:
-            return "failed"
+        changed = []
+        for name, value in get_job_aggregates(jobs).items():
+            if getattr(self, name) != value:
+                setattr(self, name, value)
+                changed.append(name)
 
-        return "unknown"
+        if changed:
+            self.save(update_fields=changed)
 
     @property
     def database_name(self):
@@ -274,3 +360,10 @@ class JobRequest(models.Model):
             return "include_t1oo"
         else:
             return "default"
+
+
+@receiver(post_delete, sender=JobRequest)
+def job_request_deleted(sender, instance, **kwargs):
+    # a signal rather than delete() so JobRequests deleted along with their
+    # Workspace or creator are caught too
+    Backend.objects.bump_job_requests_version([instance.backend_id])
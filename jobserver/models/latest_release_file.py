@@ -0,0 +1,103 @@
+from django.db import connection, models
+
+
+class LatestReleaseFileQuerySet(models.QuerySet):
+    def record(self, rfiles):
+        """
+        Make each of the given ReleaseFiles the latest version of its path
+
+        A ReleaseFile only replaces the current latest version of its path if
+        its Release was created at the same time or later, so files can be
+        recorded in any order.
+        """
+        candidates = {}
+        for rfile in rfiles:
+            key = (rfile.workspace_id, rfile.release.backend_id, rfile.name)
+            current = candidates.get(key)
+            if (
+                current is None
+                or rfile.release.created_at >= current.release_created_at
+            ):
+                candidates[key] = self.model(
+                    workspace_id=key[0],
+                    backend_id=key[1],
+                    name=key[2],
+                    release_file=rfile,
+                    release_created_at=rfile.release.created_at,
+                )
+
+        if not candidates:
+            return
+
+        # compare against the recorded file in the upsert itself, rather than
+        # reading it first, so a newer file recorded by a concurrent request
+        # between the read and the write can't be overwritten
+        table = self.model._meta.db_table
+        rows = ", ".join(["(%s, %s, %s, %s, %s)"] * len(candidates))
+        sql = f"""
+        INSERT INTO {table}
+          (workspace_id, backend_id, name, release_file_id, release_created_at)
+        VALUES {rows}
+        ON CONFLICT (workspace_id, backend_id, name) DO UPDATE SET
+          release_file_id = EXCLUDED.release_file_id,
+          release_created_at = EXCLUDED.release_created_at
+        WHERE EXCLUDED.release_created_at >= {table}.release_created_at
+        """
+        params = [
+            value
+            for c in candidates.values()
+            for value in [
+                c.workspace_id,
+                c.backend_id,
+                c.name,
+                c.release_file_id,
+                c.release_created_at,
+            ]
+        ]
+        with connection.cursor() as cursor:
+            cursor.execute(sql, params)
+
+
+class LatestReleaseFile(models.Model):
+    """
+    The latest version of each file released to a Workspace from a Backend
+
+    Every version of a file is a ReleaseFile, in the Release it came from, so
+    finding the latest version of every file in a Workspace means looking
+    through its whole release history.  This is kept up to date as
+    ReleaseFiles are created so that's a single indexed read instead.
+    """
+
+    workspace = models.ForeignKey(
+        "Workspace",
+        on_delete=models.CASCADE,
+        related_name="latest_files",
+    )
+    backend = models.ForeignKey(
+        "Backend",
+        on_delete=models.CASCADE,
+        related_name="+",
+    )
+    name = models.TextField()
+
+    release_file = models.ForeignKey(
+        "ReleaseFile",
+        on_delete=models.CASCADE,
+        related_name="+",
+    )
+    # copied from the ReleaseFile's Release so newer versions can be picked
+    # out without a join
+    release_created_at = models.DateTimeField()
+
+    objects = LatestReleaseFileQuerySet.as_manager()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["workspace", "backend", "name"],
+                name="latestreleasefile_workspace_backend_name_unique",
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.backend_id}/{self.name} ({self.release_file_id})"
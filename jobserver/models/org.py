@@ -53,7 +53,19 @@ class Org(models.Model):
         return reverse("staff:org-detail", kwargs={"slug": self.slug})
 
     def save(self, *args, **kwargs):
+        # avoid circular imports
+        from .job_request import JobRequest
+
         if not self.slug:
             self.slug = slugify(self.name)
 
-        return super().save(*args, **kwargs)
+        adding = self._state.adding
+        super().save(*args, **kwargs)
+
+        # JobRequestAPIList includes the slugs of each JobRequest's project's
+        # orgs
+        update_fields = kwargs.get("update_fields")
+        if not adding and (update_fields is None or "slug" in update_fields):
+            JobRequest.objects.active().filter(
+                workspace__project__collaborations__org=self
+            ).bump_job_requests_version()
@@ -0,0 +1,42 @@
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import models
+from django.db.models import Q
+from django.utils import timezone
+
+
+class OutboxMessage(models.Model):
+    """
+    A side effect, eg an email or Slack message, waiting to be delivered
+
+    These are written in the same transaction as the change which caused them
+    and delivered out of band by the deliver_outbox management command so
+    third party latency doesn't hold up requests.
+    """
+
+    # dotted path to the function which performs the side effect
+    task = models.TextField()
+    kwargs = models.JSONField(default=dict, encoder=DjangoJSONEncoder)
+
+    attempts = models.PositiveIntegerField(default=0)
+    last_error = models.TextField(default="", blank=True)
+
+    # when this message can next be picked up by a worker.  Workers push this
+    # forward when they claim a message so a crashed worker's messages will be
+    # retried once their claim has lapsed.
+    next_attempt_at = models.DateTimeField(default=timezone.now)
+
+    created_at = models.DateTimeField(default=timezone.now)
+    delivered_at = models.DateTimeField(null=True)
+    failed_at = models.DateTimeField(null=True)
+
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=["next_attempt_at"],
+                condition=Q(delivered_at=None, failed_at=None),
+                name="outbox_pending_idx",
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.task} ({self.pk})"
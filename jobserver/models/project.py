@@ -1,6 +1,8 @@
 import structlog
 from django.db import models
 from django.db.models import Q
+from django.db.models.signals import pre_delete
+from django.dispatch import receiver
 from django.urls import reverse
 from django.utils import functional, timezone
 from django.utils.text import slugify
@@ -186,10 +188,31 @@ class Project(models.Model):
         return self.workspaces.get(name=self.interactive_slug)
 
     def save(self, *args, **kwargs):
+        # avoid circular imports
+        from .job_request import JobRequest
+        from .user import User
+
         if not self.slug:
             self.slug = slugify(self.name)
 
-        return super().save(*args, **kwargs)
+        adding = self._state.adding
+        super().save(*args, **kwargs)
+
+        # a new Project has no members or JobRequests
+        if adding:
+            return
+
+        update_fields = kwargs.get("update_fields")
+
+        # Level 4 authorisation only includes its name and status
+        if update_fields is None or {"name", "status"} & set(update_fields):
+            User.objects.filter(project_memberships__project=self).bump_level4_version()
+
+        # JobRequestAPIList includes the slug of each JobRequest's project
+        if update_fields is None or "slug" in update_fields:
+            JobRequest.objects.active().filter(
+                workspace__project=self
+            ).bump_job_requests_version()
 
     @property
     def title(self):
@@ -201,3 +224,12 @@ class Project(models.Model):
     @functional.cached_property
     def org(self):
         return self.orgs.filter(collaborations__is_lead=True).first()
+
+
+@receiver(pre_delete, sender=Project)
+def project_deleted(sender, instance, **kwargs):
+    # avoid circular imports
+    from .user import User
+
+    # before the delete, while the memberships it cascades to still exist
+    User.objects.filter(project_memberships__project=instance).bump_level4_version()
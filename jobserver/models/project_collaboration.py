@@ -1,5 +1,7 @@
 from django.db import models
 from django.db.models import Q
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
 from django.utils import timezone
 
 
@@ -43,3 +45,15 @@ class ProjectCollaboration(models.Model):
             )
         ]
         unique_together = ["org", "project"]
+
+
+@receiver(post_save, sender=ProjectCollaboration)
+@receiver(post_delete, sender=ProjectCollaboration)
+def project_collaboration_changed(sender, instance, **kwargs):
+    # avoid circular imports
+    from .job_request import JobRequest
+
+    # JobRequestAPIList includes the slugs of each JobRequest's project's orgs
+    JobRequest.objects.active().filter(
+        workspace__project=instance.project_id
+    ).bump_job_requests_version()
@@ -1,4 +1,5 @@
 import structlog
+from django.conf import settings
 from django.db import models, transaction
 from django.db.models import Q
 from django.urls import reverse
@@ -126,6 +127,12 @@ class PublishRequest(models.Model):
         self.decision = self.Decisions.APPROVED
         self.save(update_fields=["decision_at", "decision_by", "decision"])
 
+        if settings.RELEASE_ARCHIVE_PREWARM:
+            # avoid circular imports
+            from jobserver import outbox, releases
+
+            outbox.enqueue(releases.warm_snapshot_archive, snapshot=self.snapshot)
+
     @classmethod
     @transaction.atomic()
     def create_from_files(cls, *, files, report=None, user):
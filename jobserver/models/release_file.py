@@ -73,6 +73,14 @@ class ReleaseFile(models.Model):
     uploaded_at = models.DateTimeField(null=True)
 
     class Meta:
+        indexes = [
+            # backs the check for files which have already been uploaded when
+            # a Release is created
+            models.Index(
+                fields=["filehash", "name"],
+                name="releasefile_filehash_name_idx",
+            ),
+        ]
         constraints = [
             models.CheckConstraint(
                 condition=(
@@ -107,6 +115,19 @@ class ReleaseFile(models.Model):
     def __str__(self):
         return f"{self.name} ({self.id})"
 
+    def save(self, *args, **kwargs):
+        # avoid circular imports
+        from .latest_release_file import LatestReleaseFile
+        from .workspace import Workspace
+
+        adding = self._state.adding
+        super().save(*args, **kwargs)
+
+        if adding:
+            LatestReleaseFile.objects.record([self])
+
+        Workspace.objects.bump_files_version([self.workspace_id])
+
     def __format__(self, format_spec):
         match format_spec:
             case "b":
@@ -152,6 +173,10 @@ class ReleaseFile(models.Model):
 
         return reverse("api:release-file", kwargs={"file_id": self.id})
 
+    def get_upload_url(self):
+        """The API url for a resumable upload of this file."""
+        return reverse("api:release-upload", kwargs={"file_id": self.id})
+
     def get_delete_url(self):
         return reverse(
             "release-file-delete",
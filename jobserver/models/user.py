@@ -14,15 +14,22 @@ from django.utils import timezone
 from django.utils.functional import cached_property
 from sentry_sdk import capture_message
 
+from ..api import pat_cache
 from ..authorization import InteractiveReporter
 from ..authorization.fields import RolesArrayField
+from ..authorization.registry import permissions_for
 from ..hash_utils import hash_user_pat
+from ..model_utils import VersionFieldsMixin
 
 
 logger = structlog.get_logger(__name__)
 
 
 class UserQuerySet(models.QuerySet):
+    def bump_level4_version(self):
+        # use an UPDATE so concurrent bumps can't be lost
+        self.update(level4_version=models.F("level4_version") + 1)
+
     def order_by_name(self):
         """
         Order Users by their "name".
@@ -93,7 +100,7 @@ def get_or_create_user(username, email, fullname, update_fields=None):
     return user, created
 
 
-class User(AbstractBaseUser):
+class User(VersionFieldsMixin, AbstractBaseUser):
     """
     A custom User model used throughout the codebase.
 
@@ -161,6 +168,12 @@ class User(AbstractBaseUser):
 
     roles = RolesArrayField()
 
+    # bumped each time the User's project memberships, or the workspaces and
+    # statuses of those projects, change, so the authorisation we give Level
+    # 4 backends can be cached against it
+    level4_version = models.PositiveBigIntegerField(default=0)
+    version_fields = ["level4_version"]
+
     objects = UserManager()
 
     EMAIL_FIELD = "email"
@@ -226,8 +239,7 @@ class User(AbstractBaseUser):
         """
 
         def flatten_perms(roles):
-            permissions = itertools.chain.from_iterable(r.permissions for r in roles)
-            return list(sorted(set(permissions)))
+            return sorted(permissions_for(roles))
 
         projects = [
             {
@@ -286,9 +298,13 @@ class User(AbstractBaseUser):
         if not full_token:
             return False
 
-        pat_token = hash_user_pat(full_token)
-        if not secrets.compare_digest(pat_token, self.pat_token):
-            return False
+        # hashing is slow, so skip it for tokens we've verified recently
+        if not pat_cache.cache.verified(full_token, self):
+            pat_token = hash_user_pat(full_token)
+            if not secrets.compare_digest(pat_token, self.pat_token):
+                return False
+
+            pat_cache.cache.set(full_token, self)
 
         if self.pat_expires_at.date() < date.today():
             capture_message(f"Expired token for {self.username}")
@@ -334,6 +350,7 @@ class User(AbstractBaseUser):
         self.pat_expires_at = expires_at
         self.pat_token = hashed_token
         self.save(update_fields=["pat_token", "pat_expires_at"])
+        pat_cache.cache.clear()
 
         # return the unhashed token so it can be passed to a consuming service
         return token
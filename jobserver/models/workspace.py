@@ -1,16 +1,24 @@
 import structlog
 from django.db import connection, models
-from django.db.models import Max, Q
+from django.db.models import F, Max, Q
 from django.db.models.functions import Greatest
+from django.db.models.signals import post_delete
+from django.dispatch import receiver
 from django.urls import reverse
 from django.utils import timezone
 from furl import furl
 
+from ..model_utils import VersionFieldsMixin
+
 
 logger = structlog.get_logger(__name__)
 
 
 class WorkspaceQuerySet(models.QuerySet):
+    def bump_files_version(self, pks):
+        # use an UPDATE so concurrent bumps can't be lost
+        self.filter(pk__in=pks).update(files_version=F("files_version") + 1)
+
     def with_most_recent_activity_at(self):
         return (
             self.prefetch_related("job_requests")
@@ -26,7 +34,7 @@ class WorkspaceQuerySet(models.QuerySet):
         )
 
 
-class Workspace(models.Model):
+class Workspace(VersionFieldsMixin, models.Model):
     """Models a working directory on a Backend server."""
 
     project = models.ForeignKey(
@@ -50,6 +58,11 @@ class Workspace(models.Model):
     # process
     uses_new_release_flow = models.BooleanField(default=True)
 
+    # bumped each time one of this workspace's ReleaseFiles is created,
+    # uploaded or redacted, so the indexes of its files can be cached against it
+    files_version = models.PositiveBigIntegerField(default=0)
+    version_fields = ["files_version"]
+
     signed_off_at = models.DateTimeField(null=True)
     signed_off_by = models.ForeignKey(
         "User",
@@ -120,6 +133,58 @@ class Workspace(models.Model):
     def __str__(self):
         return self.name
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+
+        # remember which Project we were loaded with so save() can tell when
+        # we've been moved to another one
+        instance._loaded_project_id = instance.__dict__.get("project_id")
+
+        return instance
+
+    def save(self, *args, **kwargs):
+        # avoid circular imports
+        from .job_request import JobRequest
+        from .user import User
+
+        adding = self._state.adding
+        super().save(*args, **kwargs)
+
+        project_ids = {self.project_id, getattr(self, "_loaded_project_id", None)}
+        project_ids.discard(None)
+        self._loaded_project_id = self.project_id
+
+        update_fields = kwargs.get("update_fields")
+
+        def changed(*fields):
+            return update_fields is None or set(fields) & set(update_fields)
+
+        # Level 4 authorisation lists the names of a project's workspaces and
+        # whether they're archived, for the members of both projects when a
+        # workspace moves
+        if changed("name", "is_archived", "project", "project_id"):
+            User.objects.filter(
+                project_memberships__project__in=project_ids
+            ).bump_level4_version()
+
+        # JobRequestAPIList includes each JobRequest's workspace and its project
+        listed = [
+            "name",
+            "repo",
+            "repo_id",
+            "branch",
+            "created_by",
+            "created_by_id",
+            "created_at",
+            "project",
+            "project_id",
+        ]
+        if not adding and changed(*listed):
+            JobRequest.objects.active().filter(
+                workspace=self
+            ).bump_job_requests_version()
+
     def get_absolute_url(self):
         return reverse(
             "workspace-detail",
@@ -280,3 +345,15 @@ class Workspace(models.Model):
     @property
     def is_interactive(self):
         return self.name.endswith("-interactive")
+
+
+@receiver(post_delete, sender=Workspace)
+def workspace_deleted(sender, instance, **kwargs):
+    # avoid circular imports
+    from .user import User
+
+    # a signal rather than delete() so workspaces deleted along with their
+    # creator are caught too
+    User.objects.filter(
+        project_memberships__project=instance.project_id
+    ).bump_level4_version()
@@ -0,0 +1,186 @@
+"""
+A transactional outbox for side effects
+
+Side effects which talk to third parties, such as sending emails or Slack
+messages, are passed to enqueue() rather than being called directly.  When the
+outbox is enabled they're written to the OutboxMessage table, in whatever
+transaction the caller is in, and delivered later by the deliver_outbox
+management command.  When it's disabled they're called immediately.
+Delivered and failed messages are removed by prune() once they're RETENTION
+old.
+
+Tasks must be module level functions which take keyword arguments.  Model
+instances are stored as references and looked up again at delivery time, all
+other arguments must be JSON serialisable.
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+
+import structlog
+from django.apps import apps
+from django.conf import settings
+from django.db import connection, models, transaction
+from django.db.models import Q
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+from .models import OutboxMessage
+
+
+logger = structlog.get_logger(__name__)
+
+# how long a worker has to deliver a message it has claimed before another
+# worker can pick it up
+CLAIM_TIMEOUT = timedelta(minutes=5)
+
+# retries back off exponentially from the first delay up to the maximum
+RETRY_DELAY = timedelta(seconds=30)
+MAX_RETRY_DELAY = timedelta(hours=1)
+
+MAX_ATTEMPTS = 10
+
+# how long delivered and failed messages are kept, for debugging, before
+# prune() removes them
+RETENTION = timedelta(days=30)
+
+
+def enqueue(func, **kwargs):
+    """Run func with kwargs via the outbox, or immediately if it's disabled"""
+    if not settings.OUTBOX_ENABLED:
+        return func(**kwargs)
+
+    OutboxMessage.objects.create(
+        task=f"{func.__module__}.{func.__qualname__}",
+        kwargs=serialize(kwargs),
+    )
+
+
+def serialize(kwargs):
+    def encode(value):
+        if isinstance(value, models.Model):
+            return {"model": value._meta.label_lower, "pk": value.pk}
+        return {"value": value}
+
+    return {key: encode(value) for key, value in kwargs.items()}
+
+
+def deserialize(kwargs):
+    def decode(value):
+        if "model" in value:
+            return apps.get_model(value["model"])._default_manager.get(pk=value["pk"])
+        return value["value"]
+
+    return {key: decode(value) for key, value in kwargs.items()}
+
+
+def get_retry_delay(attempts):
+    return min(RETRY_DELAY * 2 ** (attempts - 1), MAX_RETRY_DELAY)
+
+
+def claim(batch_size):
+    """
+    Claim up to batch_size messages which are due for delivery
+
+    Claimed messages are pushed into the future by CLAIM_TIMEOUT so other
+    workers skip them, and rows locked by another worker's claim are skipped
+    rather than waited on.
+    """
+    now = timezone.now()
+
+    with transaction.atomic():
+        messages = list(
+            OutboxMessage.objects.filter(
+                delivered_at=None,
+                failed_at=None,
+                next_attempt_at__lte=now,
+            )
+            .order_by("next_attempt_at")
+            .select_for_update(skip_locked=True)[:batch_size]
+        )
+        OutboxMessage.objects.filter(pk__in=[m.pk for m in messages]).update(
+            next_attempt_at=now + CLAIM_TIMEOUT
+        )
+
+    return messages
+
+
+def deliver(message, max_attempts=MAX_ATTEMPTS):
+    """Run a single message's task, recording the outcome on the message"""
+    message.attempts += 1
+
+    try:
+        func = import_string(message.task)
+        func(**deserialize(message.kwargs))
+    except Exception as e:
+        message.last_error = repr(e)
+
+        if message.attempts >= max_attempts:
+            message.failed_at = timezone.now()
+            logger.error(
+                "Outbox message failed",
+                task=message.task,
+                message_id=message.pk,
+                attempts=message.attempts,
+            )
+        else:
+            message.next_attempt_at = timezone.now() + get_retry_delay(message.attempts)
+            logger.warning(
+                "Outbox message will be retried",
+                task=message.task,
+                message_id=message.pk,
+                attempts=message.attempts,
+            )
+
+        message.save(
+            update_fields=["attempts", "last_error", "next_attempt_at", "failed_at"]
+        )
+        return False
+
+    message.delivered_at = timezone.now()
+    message.save(update_fields=["attempts", "delivered_at"])
+    return True
+
+
+def _deliver_in_thread(message, max_attempts):
+    # each thread gets its own database connection, make sure we don't leave
+    # it hanging around once the thread is done with it
+    try:
+        return deliver(message, max_attempts)
+    finally:
+        connection.close()
+
+
+def deliver_pending(batch_size=100, concurrency=1, max_attempts=MAX_ATTEMPTS):
+    """
+    Deliver a batch of due messages, returning how many succeeded and failed
+
+    With a concurrency above one messages are delivered from a pool of
+    threads, so a slow third party only holds up one slot.
+    """
+    messages = claim(batch_size)
+
+    if concurrency > 1:
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+            results = list(
+                executor.map(
+                    _deliver_in_thread, messages, [max_attempts] * len(messages)
+                )
+            )
+    else:
+        results = [deliver(message, max_attempts) for message in messages]
+
+    delivered = results.count(True)
+    return delivered, len(results) - delivered
+
+
+def prune(retention=RETENTION):
+    """Delete messages which were delivered or failed more than retention ago"""
+    cutoff = timezone.now() - retention
+
+    deleted, _ = OutboxMessage.objects.filter(
+        Q(delivered_at__lt=cutoff) | Q(failed_at__lt=cutoff)
+    ).delete()
+
+    logger.info("Pruned outbox messages", count=deleted)
+    return deleted
@@ -1,17 +1,27 @@
+import fcntl
+import functools
 import hashlib
-import io
+import mimetypes
+import os
+import re
+import secrets
+import tempfile
 import zipfile
 from datetime import UTC, datetime
 from pathlib import Path
+from urllib.parse import quote, urljoin
 
+from django.conf import settings
 from django.db import transaction
-from django.http import FileResponse
+from django.http import FileResponse, HttpResponse, StreamingHttpResponse
 from django.utils import timezone
-from django.utils.http import http_date
+from django.utils.cache import get_conditional_response
+from django.utils.http import content_disposition_header, http_date, quote_etag
 from rest_framework.exceptions import NotFound
 from rest_framework.response import Response
 
-from .models import Release, ReleaseFile
+from . import archive_cache
+from .models import LatestReleaseFile, Release, ReleaseFile, Workspace
 from .models.release_file import absolute_file_path
 
 
@@ -23,7 +33,49 @@ class ReleaseFileHashMismatch(Exception):
     pass
 
 
-def _build_paths(release, filename, data):
+class ReleaseFileUploadNotStarted(Exception):
+    pass
+
+
+class ReleaseFileUploadOffsetMismatch(Exception):
+    def __init__(self, offset):
+        super().__init__(f"Upload is at offset {offset}")
+        self.offset = offset
+
+
+# how much of an upload we hold in memory at once
+UPLOAD_CHUNK_SIZE = 64 * 1024
+
+# suffixes of file types which are already compressed, so we don't try to
+# compress them again when adding them to a zip
+COMPRESSED_SUFFIXES = {
+    ".arrow",
+    ".bz2",
+    ".feather",
+    ".gif",
+    ".gz",
+    ".jpeg",
+    ".jpg",
+    ".parquet",
+    ".png",
+    ".webp",
+    ".xz",
+    ".zip",
+    ".zst",
+}
+
+HASH_MISMATCH_MESSAGE = (
+    "Contents of uploaded file does not match the file which a review was "
+    "requested for"
+)
+
+CHUNK_MISMATCH_MESSAGE = "Uploaded chunk does not match its range or sha256"
+
+# a single byte range, either start-[end] or -suffix_length
+BYTE_RANGE = re.compile(r"bytes=(?:(\d+)-(\d*)|-(\d+))")
+
+
+def _build_paths(release, filename):
     """
     Build the absolute path for a given filename as part of a release
 
@@ -40,52 +92,312 @@ def _build_paths(release, filename, data):
     return relative_path, absolute_path
 
 
-def build_outputs_zip(release_files, url_builder_func):
-    # create an in memory stream so we don't need to write the file to disk
-    in_memory_zf = io.BytesIO()
+def blob_path(filehash):
+    """
+    Build the absolute path of the stored copy of the file with the given hash
+
+    Uploaded files are stored once, under their sha256, and each ReleaseFile's
+    path is a hardlink to that copy.  That way the same output released again,
+    or released from another workspace, takes up no more space and doesn't need
+    writing to disk again.
+    """
+    return absolute_file_path(Path("blobs") / filehash[:2] / filehash)
 
-    # add each ReleaseFile to the zip using their name as the name in the
-    # archive
-    with zipfile.ZipFile(in_memory_zf, "w") as zip_obj:
-        for rfile in release_files:
-            if not rfile.is_deleted:
-                zip_obj.write(rfile.absolute_path(), arcname=rfile.name)
-                continue
 
-            # explain why an on-disk file was deleted, and potentially
-            # overwrite the previously unredacted version.
-            name = rfile.deleted_by.name if rfile.deleted_by else "Unknown"
-            deleted_at = rfile.deleted_at if rfile.deleted_at else "Unknown"
-            first_line = f"This file was redacted by {name} on {deleted_at}"
+def _link_path(absolute_path):
+    return absolute_path.with_name(f".{absolute_path.name}.{secrets.token_hex(8)}.tmp")
 
-            url = url_builder_func(rfile.get_absolute_url())
-            second_line = f"For more information see: {url}"
 
-            zip_obj.writestr(rfile.name, f"{first_line}\n\n{second_line}")
+def _store_blob(tmp_path, filehash, absolute_path):
+    """
+    Point absolute_path at the stored copy of a verified upload
 
-    # rewind the file stream to the start
-    in_memory_zf.seek(0)
+    The upload in tmp_path becomes the stored copy if we don't have one.  It's
+    only removed once absolute_path has been linked, so if a concurrent
+    _unlink() removes the stored copy first we can still store it again.
+    """
+    blob = blob_path(filehash)
+    link_path = _link_path(absolute_path)
+
+    try:
+        os.link(blob, link_path)
+    except FileNotFoundError:
+        # link the upload to its final path before it becomes the stored copy,
+        # so _unlink() never sees the stored copy with nothing else linked to it
+        os.link(tmp_path, link_path)
+        blob.parent.mkdir(parents=True, exist_ok=True)
+        try:
+            os.link(tmp_path, blob)
+        except FileExistsError:
+            # stored by a concurrent upload since we looked, which leaves this
+            # ReleaseFile with its own identical copy
+            pass
 
-    return in_memory_zf
+    tmp_path.unlink()
+    os.replace(link_path, absolute_path)
 
 
-def check_not_already_uploaded(filename, filehash, backend):
-    """Check if this filename/filehash combination has been uploaded before."""
-    duplicate = ReleaseFile.objects.filter(
-        release__backend=backend,
-        name=filename,
-        filehash=filehash,
+def link_blob(filehash, absolute_path):
+    """Atomically point absolute_path at the stored copy of a file"""
+    link_path = _link_path(absolute_path)
+    os.link(blob_path(filehash), link_path)
+    os.replace(link_path, absolute_path)
+
+
+def _unlink(absolute_path, filehash):
+    absolute_path.unlink(missing_ok=True)
+
+    # remove the stored copy too if nothing else links to it
+    blob = blob_path(filehash)
+    try:
+        if blob.stat().st_nlink == 1:
+            blob.unlink()
+    except FileNotFoundError:
+        # uploaded before files were stored by their hash
+        pass
+
+
+def delete_file_from_disk(rfile):
+    """
+    Remove a ReleaseFile's file from disk
+
+    The stored copy of its contents is also removed if no other ReleaseFile
+    links to it, along with any cached archives which include it.
+    """
+    _unlink(rfile.absolute_path(), rfile.filehash)
+    archive_cache.invalidate(rfile)
+
+
+def file_hash(path):
+    sha256 = hashlib.sha256()
+    with path.open("rb") as f:
+        while chunk := f.read(UPLOAD_CHUNK_SIZE):
+            sha256.update(chunk)
+    return sha256.hexdigest()
+
+
+def _iter_chunks(upload):
+    # Django's UploadedFiles know how best to chunk themselves, but the
+    # release command passes us plain file objects
+    if hasattr(upload, "chunks"):
+        return upload.chunks(UPLOAD_CHUNK_SIZE)
+
+    return iter(functools.partial(upload.read, UPLOAD_CHUNK_SIZE), b"")
+
+
+def _hash_upload(upload, max_size=None):
+    """
+    Stream an upload without keeping it, returning its sha256
+
+    Like _write_upload(), this stops with a ReleaseFileHashMismatch as soon as
+    the upload grows past max_size.
+    """
+    sha256 = hashlib.sha256()
+    size = 0
+    for chunk in _iter_chunks(upload):
+        size += len(chunk)
+        if max_size is not None and size > max_size:
+            raise ReleaseFileHashMismatch(HASH_MISMATCH_MESSAGE)
+
+        sha256.update(chunk)
+
+    return sha256.hexdigest()
+
+
+def _write_upload(upload, absolute_path, max_size=None):
+    """
+    Stream an upload to a temporary file alongside absolute_path
+
+    The upload is hashed as it's written so it's never held in memory.  The
+    temporary file is in the same directory as its final location so it can be
+    moved into place atomically with os.replace().
+
+    Writing stops with a ReleaseFileHashMismatch as soon as the upload grows
+    past max_size, since it can't be the file we're expecting.
+
+    Returns the temporary file's path and the upload's sha256.
+    """
+    fd, tmp = tempfile.mkstemp(
+        dir=absolute_path.parent, prefix=f".{absolute_path.name}.", suffix=".tmp"
     )
-    if duplicate.exists():
-        raise ReleaseFileAlreadyExists(
-            f"This version of '{filename}' has already been uploaded from backend '{backend.slug}'"
+    tmp_path = Path(tmp)
+
+    sha256 = hashlib.sha256()
+    size = 0
+    try:
+        with os.fdopen(fd, "wb") as f:
+            for chunk in _iter_chunks(upload):
+                size += len(chunk)
+                if max_size is not None and size > max_size:
+                    raise ReleaseFileHashMismatch(HASH_MISMATCH_MESSAGE)
+
+                sha256.update(chunk)
+                f.write(chunk)
+    except BaseException:
+        tmp_path.unlink(missing_ok=True)
+        raise
+
+    return tmp_path, sha256.hexdigest()
+
+
+class _ZipStream:
+    """A write-only file which hands back whatever has been written to it"""
+
+    def __init__(self):
+        self._chunks = []
+
+    def write(self, data):
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def take(self):
+        data = b"".join(self._chunks)
+        self._chunks = []
+        return data
+
+
+def _redaction_notice(rfile, url_builder_func):
+    # explain why an on-disk file was deleted, and potentially
+    # overwrite the previously unredacted version.
+    name = rfile.deleted_by.name if rfile.deleted_by else "Unknown"
+    deleted_at = rfile.deleted_at if rfile.deleted_at else "Unknown"
+    first_line = f"This file was redacted by {name} on {deleted_at}"
+
+    url = url_builder_func(rfile.get_absolute_url())
+    second_line = f"For more information see: {url}"
+
+    return f"{first_line}\n\n{second_line}"
+
+
+def stream_outputs_zip(release_files, url_builder_func):
+    """
+    Generate a zip of the given ReleaseFiles a chunk at a time
+
+    Files are read from disk as the archive is written, so only a chunk of
+    each is held in memory at once.  Each ReleaseFile is added using its name
+    as the name in the archive, deflated unless it's a type which is already
+    compressed.
+    """
+    stream = _ZipStream()
+
+    with zipfile.ZipFile(stream, "w") as zip_obj:
+        for rfile in release_files:
+            if rfile.is_deleted:
+                zip_obj.writestr(rfile.name, _redaction_notice(rfile, url_builder_func))
+            else:
+                path = rfile.absolute_path()
+
+                zinfo = zipfile.ZipInfo.from_file(path, arcname=rfile.name)
+                if path.suffix.lower() not in COMPRESSED_SUFFIXES:
+                    zinfo.compress_type = zipfile.ZIP_DEFLATED
+
+                with path.open("rb") as f, zip_obj.open(zinfo, "w") as dest:
+                    while chunk := f.read(UPLOAD_CHUNK_SIZE):
+                        dest.write(chunk)
+                        # deflating may buffer the chunk without writing
+                        # anything yet
+                        if data := stream.take():
+                            yield data
+
+            # finishing each entry always writes its header or descriptor
+            yield stream.take()
+
+    # the central directory is written when the archive is closed
+    yield stream.take()
+
+
+def outputs_zip_response(request, release_files, filename):
+    """
+    Build a response which downloads the given ReleaseFiles as a zip
+
+    Archives which have been built before are served from the archive cache,
+    via nginx when it has set the Releases-Redirect header.  Otherwise, behind
+    nginx with mod_zip, which sets the Releases-Zip header to its internal
+    location for RELEASE_STORAGE, we only list the files and nginx builds the
+    archive from disk.  That's not possible when there are redacted files,
+    which are replaced with a notice, or without nginx, so then the archive is
+    streamed as it's built, and cached for next time.
+    """
+    release_files = list(release_files)
+    key = archive_cache.fingerprint(release_files, request.build_absolute_uri("/"))
+
+    internal_location = request.headers.get("Releases-Zip")
+    if path := archive_cache.lookup(key):
+        internal_redirect = request.headers.get("Releases-Redirect")
+        if internal_redirect:
+            relative_path = path.relative_to(settings.RELEASE_STORAGE)
+            response = HttpResponse(content_type="application/zip")
+            response.headers["X-Accel-Redirect"] = (
+                f"{internal_redirect}/{relative_path}"
+            )
+        else:
+            response = FileResponse(path.open("rb"), content_type="application/zip")
+    elif internal_location and not any(f.is_deleted for f in release_files):
+        lines = [
+            f"- {f.size} {quote(f'{internal_location}/{f.path}')} {f.name}\r\n"
+            for f in release_files
+        ]
+        response = HttpResponse("".join(lines))
+        response.headers["X-Archive-Files"] = "zip"
+    else:
+        chunks = stream_outputs_zip(release_files, request.build_absolute_uri)
+        response = StreamingHttpResponse(
+            archive_cache.store(key, chunks, release_files),
+            content_type="application/zip",
         )
 
+    response.headers["Content-Disposition"] = content_disposition_header(True, filename)
+    return response
+
+
+def warm_snapshot_archive(snapshot):
+    """Build and cache a Snapshot's zip ready for its first download"""
+
+    def url_builder_func(path):
+        return urljoin(settings.BASE_URL, path)
+
+    release_files = list(snapshot.files.all())
+    key = archive_cache.fingerprint(release_files, url_builder_func("/"))
+    if archive_cache.lookup(key):
+        return
+
+    chunks = stream_outputs_zip(release_files, url_builder_func)
+    for _ in archive_cache.store(key, chunks, release_files):
+        pass
+
+
+def check_not_already_uploaded(requested_files, backend):
+    """
+    Check none of the requested files have been uploaded before.
+
+    A file has been uploaded before if a ReleaseFile from the same backend has
+    the same filename and filehash.  All the files are checked with a single
+    query, which finds any ReleaseFile matching one of the filenames and one
+    of the filehashes, leaving the pairs to be matched up here.
+    """
+    requested = [(f["name"], f["sha256"]) for f in requested_files]
+
+    existing = set(
+        ReleaseFile.objects.filter(
+            release__backend=backend,
+            name__in={name for name, _ in requested},
+            filehash__in={filehash for _, filehash in requested},
+        ).values_list("name", "filehash")
+    )
+
+    for filename, filehash in requested:
+        if (filename, filehash) in existing:
+            raise ReleaseFileAlreadyExists(
+                f"This version of '{filename}' has already been uploaded from backend '{backend.slug}'"
+            )
+
 
 @transaction.atomic
 def create_release(workspace, backend, created_by, requested_files, **kwargs):
-    for f in requested_files:
-        check_not_already_uploaded(f["name"], f["sha256"], backend)
+    check_not_already_uploaded(requested_files, backend)
 
     release = Release.objects.create(
         workspace=workspace,
@@ -95,8 +407,9 @@ def create_release(workspace, backend, created_by, requested_files, **kwargs):
         **kwargs,
     )
 
-    for f in requested_files:
-        ReleaseFile.objects.create(
+    # bulk_create skips ReleaseFile.save so do what it would have ourselves
+    rfiles = ReleaseFile.objects.bulk_create(
+        ReleaseFile(
             release=release,
             workspace=release.workspace,
             created_by=created_by,
@@ -106,6 +419,10 @@ def create_release(workspace, backend, created_by, requested_files, **kwargs):
             mtime=f["date"],
             metadata=f["metadata"],
         )
+        for f in requested_files
+    )
+    LatestReleaseFile.objects.record(rfiles)
+    Workspace.objects.bump_files_version([workspace.pk])
 
     return release
 
@@ -115,12 +432,12 @@ def handle_file_upload(release, backend, user, upload, filename, **kwargs):
     """Validate and save an uploaded file to disk and database.
 
     Does basic detection of re-uploads of the same file, to avoid duplication.
+
+    The upload is streamed to disk in chunks, and only moved to its final path
+    once its hash has been checked.  Files are stored by their hash, so
+    uploads of a file we already have don't write anything new to disk.
     """
-    # This reads the whole file into memory, but should not be a problem.
-    # TODO: enforce a max upload size?
-    data = upload.read()
-    calculated_hash = hashlib.sha256(data).hexdigest()
-    relative_path, absolute_path = _build_paths(release, filename, data)
+    relative_path, absolute_path = _build_paths(release, filename)
 
     # Check if this filename for this release has been uploaded before.
     rfile = ReleaseFile.objects.filter(
@@ -130,7 +447,8 @@ def handle_file_upload(release, backend, user, upload, filename, **kwargs):
     ).first()
 
     if not rfile:  # old flow
-        absolute_path.write_bytes(data)
+        tmp_path, calculated_hash = _write_upload(upload, absolute_path)
+        _store_blob(tmp_path, calculated_hash, absolute_path)
 
         mtime = datetime.fromtimestamp(absolute_path.stat().st_mtime, tz=UTC)
         size = absolute_path.stat().st_size
@@ -150,7 +468,7 @@ def handle_file_upload(release, backend, user, upload, filename, **kwargs):
             )
         except Exception:
             # something went wrong, clean up file, they will need to reupload
-            absolute_path.unlink(missing_ok=True)
+            _unlink(absolute_path, calculated_hash)
             raise
 
     # New flow
@@ -163,14 +481,38 @@ def handle_file_upload(release, backend, user, upload, filename, **kwargs):
             f"This version of '{filename}' has already been uploaded from backend '{backend.slug}'"
         )
 
-    # We have a ReleaseFile but no file-on-disk, but we still need to confirm
-    # the uploaded files hash matches what was sent to us when the ReleaseFile
-    # and Release were created.
+    # We have a ReleaseFile but no file-on-disk, so we need to confirm the
+    # uploaded file's hash matches the one sent to us when the ReleaseFile and
+    # Release were created.  We know how big that file was, so we can give up
+    # on anything bigger without reading all of it.
+    if blob_path(rfile.filehash).exists():
+        # we already have a file with this hash, so there's nothing to write
+        calculated_hash = _hash_upload(upload, max_size=rfile.size)
+        if rfile.filehash != calculated_hash:
+            raise ReleaseFileHashMismatch(HASH_MISMATCH_MESSAGE)
+
+        try:
+            link_blob(rfile.filehash, absolute_path)
+        except FileNotFoundError:
+            # a concurrent _unlink() removed the stored copy since we looked,
+            # so store this upload after all
+            upload.seek(0)
+        else:
+            return _complete_upload(rfile, relative_path)
+
+    tmp_path, calculated_hash = _write_upload(
+        upload, absolute_path, max_size=rfile.size
+    )
     if rfile.filehash != calculated_hash:
-        msg = "Contents of uploaded file does not match the file which a review was requested for"
-        raise ReleaseFileHashMismatch(msg)
+        tmp_path.unlink()
+        raise ReleaseFileHashMismatch(HASH_MISMATCH_MESSAGE)
+
+    _store_blob(tmp_path, calculated_hash, absolute_path)
 
-    absolute_path.write_bytes(data)
+    return _complete_upload(rfile, relative_path)
+
+
+def _complete_upload(rfile, relative_path):
     rfile.path = str(relative_path)
     rfile.uploaded_at = timezone.now()
     rfile.save(update_fields=["path", "uploaded_at"])
@@ -178,11 +520,190 @@ def handle_file_upload(release, backend, user, upload, filename, **kwargs):
     return rfile
 
 
+def upload_path(rfile):
+    """Build the absolute path a resumable upload of a ReleaseFile is written to"""
+    return absolute_file_path(Path("uploads") / rfile.pk)
+
+
+def get_upload_offset(rfile):
+    """How much of a resumable upload of the given ReleaseFile we've received"""
+    try:
+        return upload_path(rfile).stat().st_size
+    except FileNotFoundError:
+        raise ReleaseFileUploadNotStarted
+
+
+def start_upload(rfile):
+    """
+    Start a resumable upload of the given ReleaseFile, returning its offset
+
+    Starting an upload which has already been started picks up where it got
+    to, so a backend which has lost track of an upload can carry on with it.
+    """
+    if rfile.uploaded_at:
+        raise ReleaseFileAlreadyExists(
+            f"This version of '{rfile.name}' has already been uploaded"
+        )
+
+    path = upload_path(rfile)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.touch()
+
+    return get_upload_offset(rfile)
+
+
+def write_upload_chunk(rfile, stream, start, length, checksum):
+    """
+    Write the next chunk of a resumable upload, returning the new offset
+
+    Chunks must be sent in order, starting at the current offset.  A chunk is
+    only kept if all of it arrived and it matches the given sha256, otherwise
+    it's discarded and can be sent again.
+    """
+    try:
+        f = upload_path(rfile).open("r+b")
+    except FileNotFoundError:
+        raise ReleaseFileUploadNotStarted
+
+    with f:
+        # stop concurrent requests for the same upload interleaving chunks
+        fcntl.flock(f, fcntl.LOCK_EX)
+
+        offset = os.fstat(f.fileno()).st_size
+        if start != offset:
+            raise ReleaseFileUploadOffsetMismatch(offset)
+
+        f.seek(offset)
+        sha256 = hashlib.sha256()
+        remaining = length
+        while remaining and (chunk := stream.read(min(remaining, UPLOAD_CHUNK_SIZE))):
+            f.write(chunk)
+            sha256.update(chunk)
+            remaining -= len(chunk)
+
+        if remaining or sha256.hexdigest() != checksum:
+            f.truncate(offset)
+            raise ReleaseFileHashMismatch(CHUNK_MISMATCH_MESSAGE)
+
+        f.flush()
+        os.fsync(f.fileno())
+
+    return offset + length
+
+
+@transaction.atomic
+def finish_upload(rfile):
+    """
+    Complete a resumable upload of the given ReleaseFile
+
+    The uploaded file must match the hash the ReleaseFile was created with,
+    even when we already have a file with that hash.  If it doesn't the upload
+    is thrown away and needs starting again.
+    """
+    if rfile.uploaded_at:
+        raise ReleaseFileAlreadyExists(
+            f"This version of '{rfile.name}' has already been uploaded"
+        )
+
+    path = upload_path(rfile)
+    relative_path, absolute_path = _build_paths(rfile.release, rfile.name)
+
+    if not path.exists():
+        raise ReleaseFileUploadNotStarted
+
+    if file_hash(path) != rfile.filehash:
+        path.unlink()
+        raise ReleaseFileHashMismatch(HASH_MISMATCH_MESSAGE)
+
+    # this discards the upload if we already have a file with its hash
+    _store_blob(path, rfile.filehash, absolute_path)
+    return _complete_upload(rfile, relative_path)
+
+
+def parse_range(header, size):
+    """
+    Parse a Range header for a file of the given size
+
+    Returns the start and length of the requested range, None when the whole
+    file should be served, or raises ValueError when the range can't be
+    satisfied.  We only support a single range, and RFC 9110 lets us ignore
+    anything else, so those get the whole file.
+    """
+    match = BYTE_RANGE.fullmatch(header.strip())
+    if not match:
+        return None
+
+    start, end, suffix_length = match.groups()
+    if suffix_length is not None:
+        length = min(int(suffix_length), size)
+        if length == 0:
+            raise ValueError(header)
+        return size - length, length
+
+    start = int(start)
+    end = min(int(end), size - 1) if end else size - 1
+    if start >= size or end < start:
+        raise ValueError(header)
+
+    return start, end - start + 1
+
+
+def _iter_range(path, start, length):
+    with path.open("rb") as f:
+        f.seek(start)
+        while length > 0:
+            chunk = f.read(min(UPLOAD_CHUNK_SIZE, length))
+            if not chunk:
+                break
+            length -= len(chunk)
+            yield chunk
+
+
+def _file_response(request, path, etag):
+    size = path.stat().st_size
+
+    # only honour a Range when the client's copy, if it has one, is current
+    byte_range = None
+    header = request.headers.get("Range")
+    if header and request.headers.get("If-Range", etag) == etag:
+        try:
+            byte_range = parse_range(header, size)
+        except ValueError:
+            response = HttpResponse(status=416)
+            response.headers["Content-Range"] = f"bytes */{size}"
+            return response
+
+    if byte_range is None:
+        response = FileResponse(path.open("rb"))
+    else:
+        start, length = byte_range
+        content_type, _ = mimetypes.guess_type(path.name)
+        response = StreamingHttpResponse(
+            _iter_range(path, start, length),
+            status=206,
+            content_type=content_type or "application/octet-stream",
+        )
+        response.headers["Content-Length"] = length
+        response.headers["Content-Range"] = f"bytes {start}-{start + length - 1}/{size}"
+
+    content_type = response.headers.get("Content-Type")
+    if content_type.startswith("text"):
+        # for text-based files append a charset to the existing
+        # content-type header
+        response.headers["Content-Type"] = f"{content_type}; charset=utf-8"
+
+    return response
+
+
 def serve_file(request, rfile):
     """Serve a ReleaseFile as the response.
 
     If Releases-Redirect header is set, use nginx's X-Accel-Redirect to serve
     response. Else just serve the bytes directly (for dev).
+
+    Files are stored by their hash, so that makes a strong ETag.  Conditional
+    requests are answered here, before either path, and byte ranges are
+    served by nginx or by us.
     """
     # check the file has been uploaded
     if rfile.is_deleted:
@@ -192,29 +713,29 @@ def serve_file(request, rfile):
         return Response("File not yet uploaded")
 
     path = rfile.absolute_path()
-
-    internal_redirect = request.headers.get("Releases-Redirect")
-    if internal_redirect:
-        # we're behind nginx, so use X-Accel-Redirect to serve the file
-        # from nginx, relative to RELEASES_STORAGE.
-        response = Response()
-        response.headers["X-Accel-Redirect"] = f"{internal_redirect}/{rfile.path}"
-    else:
-        # serve directly from django in dev use regular django response to
-        # bypass DRFs renderer framework and just serve bytes
-        response = FileResponse(path.open("rb"))
-
-        content_type = response.headers.get("Content-Type")
-        if content_type.startswith("text"):
-            # for text-based files append a charset to the existing
-            # content-type header, being careful just in case the existing
-            # value is empty
-            joiner = "; " if content_type else ""
-            response.headers["Content-Type"] = f"{content_type}{joiner}charset=utf-8"
+    etag = quote_etag(rfile.filehash)
+    last_modified = int(rfile.created_at.timestamp())
+
+    response = get_conditional_response(request, etag=etag, last_modified=last_modified)
+    if response is None:
+        internal_redirect = request.headers.get("Releases-Redirect")
+        if internal_redirect:
+            # we're behind nginx, so use X-Accel-Redirect to serve the file
+            # from nginx, relative to RELEASES_STORAGE.  nginx handles any
+            # Range header itself.
+            response = Response()
+            response.headers["X-Accel-Redirect"] = f"{internal_redirect}/{rfile.path}"
+        else:
+            # serve directly from django in dev use regular django response
+            # to bypass DRFs renderer framework and just serve bytes
+            response = _file_response(request, path, etag)
+
+    response.headers["Accept-Ranges"] = "bytes"
+    response.headers["ETag"] = etag
 
     # set Last-Modified header as per:
     # https://developer.mozilla.org/en-US/docs/Web/HTTP/Headers/Last-Modified
-    response.headers["Last-Modified"] = http_date(rfile.created_at.timestamp())
+    response.headers["Last-Modified"] = http_date(last_modified)
 
     return response
 
@@ -226,15 +747,13 @@ def workspace_files(workspace):
     Returns a mapping of the workspace-relative file name (which includes
     backend) to its RequestFile model.
     """
-
-    files = (
-        workspace.files.select_related("release", "release__backend")
-        .order_by("name", "-release__created_at")
-        .distinct("name", "release__created_at")
+    latest = (
+        LatestReleaseFile.objects.filter(workspace=workspace)
+        .select_related(
+            "backend",
+            "release_file__created_by",
+            "release_file__release__backend",
+        )
+        .order_by("name", "-release_created_at")
     )
-    index = {}
-    for rfile in files:
-        workspace_path = f"{rfile.release.backend.slug}/{rfile.name}"
-        if workspace_path not in index:
-            index[workspace_path] = rfile
-    return index
+    return {f"{f.backend.slug}/{f.name}": f.release_file for f in latest}
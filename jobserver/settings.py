@@ -92,6 +92,7 @@ MIDDLEWARE = [
     "csp.middleware.CSPMiddleware",
     "jobserver.middleware.XSSFilteringMiddleware",
     "jobserver.middleware.ClientAddressIdentification",
+    "jobserver.middleware.RolesCacheMiddleware",
     "jobserver.middleware.TemplateNameMiddleware",
 ]
 
@@ -379,6 +380,36 @@ initialise_sentry()
 # PROJECT SETTINGS
 DISABLE_CREATING_JOBS = env.bool("DISABLE_CREATING_JOBS", default=False)
 
+# Queue side effects (emails, Slack messages, GitHub calls) made while handling
+# requests to the outbox table, to be sent by the deliver_outbox command,
+# rather than making them inline.
+OUTBOX_ENABLED = env.bool("OUTBOX_ENABLED", default=False)
+
+# How often, in seconds, each process writes the API last-seen timestamps it has
+# collected to the Stats table.  0 writes them on every request.
+API_STATS_FLUSH_INTERVAL = env.int("API_STATS_FLUSH_INTERVAL", default=5)
+
+# How long, in seconds, each process caches the Backend for an API token.  0
+# disables the cache.
+BACKEND_TOKEN_CACHE_TTL = env.int("BACKEND_TOKEN_CACHE_TTL", default=60)
+
+# How often, in seconds, each process checks its cached Backends haven't
+# changed.  A token rotated in another process can keep working for up to this
+# long.
+BACKEND_TOKEN_CACHE_CHECK_INTERVAL = env.int(
+    "BACKEND_TOKEN_CACHE_CHECK_INTERVAL", default=5
+)
+
+# How long, in seconds, each process remembers a User PAT it has verified, so
+# it doesn't have to hash it again.  Rotating a token invalidates it
+# everywhere straight away.  0 disables the cache.
+USER_PAT_CACHE_TTL = env.int("USER_PAT_CACHE_TTL", default=60)
+
+# How often, in seconds, each process checks whether its index of Redirects
+# is out of date.  Changes made in other processes can take up to this long
+# to apply.
+REDIRECTS_INDEX_CHECK_INTERVAL = env.int("REDIRECTS_INDEX_CHECK_INTERVAL", default=10)
+
 # GitHub token with write permissions
 # TODO: remove default when we're happy with setting up CI with this token
 INTERACTIVE_GITHUB_TOKEN = env.str("INTERACTIVE_GITHUB_TOKEN", default="")
@@ -398,6 +429,29 @@ RELEASE_FILE_SIZE_LIMIT = env.int(
 # surprises with django's default uploads implementation.
 RELEASE_STORAGE = Path(env.str("RELEASE_STORAGE", default="releases"))
 
+# Zips of released files which have been downloaded are kept in
+# RELEASE_STORAGE, up to this many bytes in total, so repeat downloads don't
+# need building again.  Set to 0 to turn the cache off.
+RELEASE_ARCHIVE_CACHE_SIZE = env.int(
+    "RELEASE_ARCHIVE_CACHE_SIZE", default=10 * 1024 * 1024 * 1024
+)
+
+# How long, in seconds, the indexes of released files the outputs viewer
+# loads are cached for.  They're cached against a version which changes with
+# the files, so this only bounds how stale the names of users and backends in
+# them can be.
+RELEASE_INDEX_CACHE_TIMEOUT = env.int("RELEASE_INDEX_CACHE_TIMEOUT", default=300)
+
+# How long, in seconds, the authorisation we give Level 4 backends for a user
+# is cached for.  It's cached against a version which changes with the user's
+# memberships and their projects, so this only bounds how long unused entries
+# are kept.
+LEVEL4_USER_CACHE_TIMEOUT = env.int("LEVEL4_USER_CACHE_TIMEOUT", default=3600)
+
+# Build and cache a Snapshot's zip as soon as it's published, rather than on
+# its first download
+RELEASE_ARCHIVE_PREWARM = env.bool("RELEASE_ARCHIVE_PREWARM", default=False)
+
 # IP prefix of docker subnet on dokku 4
 TRUSTED_PROXIES = env.list("TRUSTED_PROXIES", ["172.17.0."])
 
@@ -65,6 +65,24 @@ def notify_release_file_uploaded(rfile, channel=settings.RELEASES_SLACK_CHANNEL)
     slack.post(message, channel)
 
 
+def notify_release_files_uploaded(
+    release, user, names, channel=settings.RELEASES_SLACK_CHANNEL
+):
+    workspace_url = slack.link(
+        release.workspace.get_absolute_url(), release.workspace.name
+    )
+    user_url = slack.link(user.get_staff_url(), user.name)
+    release_url = slack.link(release.get_absolute_url(), "release")
+
+    message = [
+        f"{user_url} uploaded {len(names)} files to a {release_url} for {workspace_url} from `{release.backend.name}`:"
+    ]
+    for name in names:
+        message.append(f"`{name}`")
+
+    slack.post("\n".join(message), channel)
+
+
 def notify_new_user(user, channel=settings.REGISTRATIONS_SLACK_CHANNEL):
     slack.post(
         text=f"New user ({user.username}) registered: {slack.link(user.get_staff_url())}",
@@ -17,8 +17,11 @@ from jobserver.api.releases import (
     Level4AuthorisationAPI,
     Level4TokenAuthenticationAPI,
     ReleaseAPI,
+    ReleaseBatchUploadAPI,
     ReleaseFileAPI,
     ReleaseNotificationAPICreate,
+    ReleaseUploadAPI,
+    ReleaseUploadSessionAPI,
     ReleaseWorkspaceAPI,
     ReviewAPI,
     SnapshotAPI,
@@ -125,6 +128,21 @@ api_urls = [
         ReleaseAPI.as_view(),
         name="release",
     ),
+    path(
+        "releases/release/<str:release_id>/files",
+        ReleaseBatchUploadAPI.as_view(),
+        name="release-files",
+    ),
+    path(
+        "releases/release/<str:release_id>/uploads",
+        ReleaseUploadAPI.as_view(),
+        name="release-uploads",
+    ),
+    path(
+        "releases/upload/<file_id>",
+        ReleaseUploadSessionAPI.as_view(),
+        name="release-upload",
+    ),
     path(
         "releases/release/<str:release_id>/reviews",
         ReviewAPI.as_view(),
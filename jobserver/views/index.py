@@ -7,8 +7,7 @@ from ..models import JobRequest, Workspace
 class Index(View):
     def get(self, request, *args, **kwargs):
         job_requests = (
-            JobRequest.objects.with_started_at()
-            .select_related(
+            JobRequest.objects.select_related(
                 "created_by",
                 "workspace",
                 "workspace__project",
@@ -4,7 +4,7 @@ from django.conf import settings
 from django.contrib import messages
 from django.core.exceptions import MultipleObjectsReturned
 from django.db import transaction
-from django.db.models import Max, Q
+from django.db.models import Q
 from django.http import Http404
 from django.shortcuts import get_object_or_404, redirect
 from django.template.response import TemplateResponse
@@ -190,7 +190,7 @@ class JobRequestCreate(CreateView):
 
     def get_latest_job_request(self):
         return (
-            self.workspace.job_requests.with_started_at()
+            self.workspace.job_requests.prefetch_related("jobs")
             .order_by("-created_at")
             .first()
         )
@@ -200,12 +200,8 @@ class JobRequestDetail(View):
     def get(self, request, *args, **kwargs):
         try:
             job_request = (
-                JobRequest.objects.with_started_at()
-                .select_related("backend", "created_by", "workspace")
+                JobRequest.objects.select_related("backend", "created_by", "workspace")
                 .prefetch_related("workspace__project__orgs")
-                .annotate(
-                    last_updated_at=Max("jobs__updated_at", default=timezone.now())
-                )
                 .get(
                     workspace__project__slug=self.kwargs["project_slug"],
                     workspace__name=self.kwargs["workspace_slug"],
@@ -233,10 +229,9 @@ class JobRequestDetail(View):
         # it's completed, we don't expect updates now
         incomplete = not job_request.is_completed
 
-        # was the last update more than our threshold ago?  The last_updated_at
-        # annotation uses a default of `now` so we don't have to deal with None
-        # here.
-        delta = timezone.now() - job_request.last_updated_at
+        # was the last update more than our threshold ago?  last_updated_at is
+        # None until job-runner has synced some Jobs, so treat that as now.
+        delta = timezone.now() - (job_request.last_updated_at or timezone.now())
         threshold = timedelta(minutes=30)
         over_30_minutes_ago = delta > threshold
 
@@ -328,8 +323,7 @@ class JobRequestList(ListView):
 
     def get_queryset(self):
         return (
-            JobRequest.objects.with_started_at()
-            .select_related("backend", "created_by", "workspace")
+            JobRequest.objects.select_related("backend", "created_by", "workspace")
             .prefetch_related("workspace__project__orgs")
             .order_by("-pk")
         )
@@ -12,7 +12,7 @@ from ..authorization import (
     has_role,
     permissions,
 )
-from ..models import Job, JobRequest
+from ..models import Job
 
 
 class JobCancel(View):
@@ -83,15 +83,7 @@ class JobDetail(View):
                 honeycomb_links["Job Trace"] = trace_link
             honeycomb_links["Status and Resources"] = honeycomb.status_link(job)
 
-            # Look this up manually, because if we use job.job_request, the
-            # JobRequest will not have prefetched all associated Jobs, and
-            # we will be unable to use JobRequest.completed_at (as it relies on
-            # JobRequest.status)
-            job_request = JobRequest.objects.filter(
-                jobs__identifier=job.identifier
-            ).first()
-
-            honeycomb_links["Job Request"] = honeycomb.jobrequest_link(job_request)
+            honeycomb_links["Job Request"] = honeycomb.jobrequest_link(job.job_request)
             honeycomb_links["Previous runs of this action"] = (
                 honeycomb.previous_actions_link(job)
             )
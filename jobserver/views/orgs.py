@@ -42,8 +42,7 @@ class OrgEventLog(ListView):
 
     def get_queryset(self):
         return (
-            JobRequest.objects.with_started_at()
-            .filter(workspace__project__orgs__in=[self.org])
+            JobRequest.objects.filter(workspace__project__orgs__in=[self.org])
             .select_related("backend", "workspace", "workspace__project")
             .order_by("-pk")
         )
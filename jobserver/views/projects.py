@@ -241,8 +241,7 @@ class ProjectEventLog(ListView):
 
     def get_queryset(self):
         return (
-            JobRequest.objects.with_started_at()
-            .filter(workspace__project=self.project)
+            JobRequest.objects.filter(workspace__project=self.project)
             .select_related("backend", "created_by", "workspace")
             .prefetch_related("workspace__project__orgs")
             .order_by("-pk")
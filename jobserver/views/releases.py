@@ -2,7 +2,7 @@ from csp.decorators import csp_exempt
 from django.contrib.humanize.templatetags.humanize import naturaltime
 from django.db import transaction
 from django.db.models import Prefetch
-from django.http import FileResponse, Http404
+from django.http import Http404
 from django.shortcuts import get_object_or_404, redirect
 from django.template.response import TemplateResponse
 from django.urls import reverse
@@ -19,7 +19,12 @@ from ..models import (
     Snapshot,
     Workspace,
 )
-from ..releases import build_outputs_zip, serve_file, workspace_files
+from ..releases import (
+    delete_file_from_disk,
+    outputs_zip_response,
+    serve_file,
+    workspace_files,
+)
 from ..utils import build_spa_base_url
 
 
@@ -168,11 +173,8 @@ class ReleaseDownload(View):
         ):
             raise Http404
 
-        zf = build_outputs_zip(release.files.all(), request.build_absolute_uri)
-        return FileResponse(
-            zf,
-            as_attachment=True,
-            filename=f"release-{release.pk}.zip",
+        return outputs_zip_response(
+            request, release.files.all(), filename=f"release-{release.pk}.zip"
         )
 
 
@@ -198,7 +200,7 @@ class ReleaseFileDelete(View):
 
         with transaction.atomic():
             # delete file on disk
-            rfile.absolute_path().unlink()
+            delete_file_from_disk(rfile)
 
             rfile.deleted_by = request.user
             rfile.deleted_at = timezone.now()
@@ -275,11 +277,8 @@ class SnapshotDownload(View):
         if snapshot.is_draft and not can_view_unpublished_files:
             raise Http404
 
-        zf = build_outputs_zip(snapshot.files.all(), request.build_absolute_uri)
-        return FileResponse(
-            zf,
-            as_attachment=True,
-            filename=f"release-{snapshot.pk}.zip",
+        return outputs_zip_response(
+            request, snapshot.files.all(), filename=f"release-{snapshot.pk}.zip"
         )
 
 
@@ -6,6 +6,7 @@ from django.template.response import TemplateResponse
 from django.utils import timezone
 from django.views.generic import View
 
+from .. import api_stats
 from ..backends import show_warning
 from ..models import Backend, Job
 
@@ -36,11 +37,8 @@ class PerBackendStatus(View):
     def get(self, request, *args, **kwargs):
         backend = get_object_or_404(Backend, slug=self.kwargs["backend"])
 
-        try:
-            last_seen = backend.stats.order_by("-api_last_seen").first().api_last_seen
-        except AttributeError:
-            # don't show Backends which have never checked in as an error
-            last_seen = timezone.now()
+        # don't show Backends which have never checked in as an error
+        last_seen = api_stats.recorder.last_seen(backend) or timezone.now()
 
         # how long ago did we last see this backend?
         time_since_last_seen = timezone.now() - last_seen
@@ -83,12 +81,7 @@ class Status(View):
                 if result["status"] == "running":
                     running = result["count"]
 
-            try:
-                last_seen = (
-                    backend.stats.order_by("-api_last_seen").first().api_last_seen
-                )
-            except AttributeError:
-                last_seen = None
+            last_seen = api_stats.recorder.last_seen(backend)
 
             return {
                 "name": backend.name,
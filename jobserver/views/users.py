@@ -327,8 +327,7 @@ class UserEventLog(ListView):
 
     def get_queryset(self):
         return (
-            JobRequest.objects.with_started_at()
-            .filter(created_by=self.user)
+            JobRequest.objects.filter(created_by=self.user)
             .select_related("backend", "workspace", "workspace__project")
             .prefetch_related("workspace__project__orgs")
             .order_by("-pk")
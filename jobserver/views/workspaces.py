@@ -7,7 +7,7 @@ from django.core.exceptions import PermissionDenied
 from django.db import transaction
 from django.db.models import Q
 from django.db.models.functions import Least
-from django.http import FileResponse, Http404
+from django.http import Http404
 from django.shortcuts import get_object_or_404, redirect
 from django.template.response import TemplateResponse
 from django.utils import timezone
@@ -38,7 +38,7 @@ from ..models import (
     Report,
     Workspace,
 )
-from ..releases import build_outputs_zip, workspace_files
+from ..releases import outputs_zip_response, workspace_files
 from ..utils import build_spa_base_url
 
 
@@ -370,9 +370,9 @@ class WorkspaceEventLog(ListView):
 
     def get_queryset(self):
         qs = (
-            JobRequest.objects.with_started_at()
-            .filter(workspace=self.workspace)
+            JobRequest.objects.filter(workspace=self.workspace)
             .select_related("backend", "workspace", "workspace__project")
+            .prefetch_related("jobs")
             .order_by("-pk")
         )
 
@@ -465,11 +465,8 @@ class WorkspaceLatestOutputsDownload(View):
         # get the latest files as an iterable of ReleaseFile instances
         latest_files = workspace_files(workspace).values()
 
-        zf = build_outputs_zip(latest_files, request.build_absolute_uri)
-        return FileResponse(
-            zf,
-            as_attachment=True,
-            filename=f"workspace-{workspace.name}.zip",
+        return outputs_zip_response(
+            request, latest_files, filename=f"workspace-{workspace.name}.zip"
         )
 
 
@@ -0,0 +1,100 @@
+"""
+A process-local index of active Redirects by their old_url
+
+RedirectsMiddleware looks up every user-facing request, so rather than query
+for the longest matching old_url each time we hold the old_urls of unexpired,
+undeleted Redirects in memory.
+
+Each process rebuilds its index when the Redirects table's stamp (its row
+count and latest updated_at) changes, which it checks at most every
+REDIRECTS_INDEX_CHECK_INTERVAL seconds, or when one of its Redirects expires.
+Redirect.save() and Redirect.delete() also invalidate this process's index
+straight away.
+"""
+
+import threading
+import time
+
+from django.conf import settings
+from django.db.models import Count, Max
+from django.utils import timezone
+
+from .models import Redirect
+
+
+def _get_stamp():
+    return Redirect.objects.aggregate(count=Count("pk"), latest=Max("updated_at"))
+
+
+def _load():
+    now = timezone.now()
+    redirects = (
+        Redirect.objects.filter(deleted_at=None, expires_at__gt=now)
+        .order_by("created_at")
+        .values_list("old_url", "pk", "expires_at")
+    )
+
+    urls = {}
+    next_expiry = None
+    for old_url, pk, expires_at in redirects:
+        # the most recently created redirect for a URL wins
+        urls[old_url] = pk
+        if next_expiry is None or expires_at < next_expiry:
+            next_expiry = expires_at
+
+    return urls, next_expiry
+
+
+class RedirectIndex:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._urls = None
+        self._stamp = None
+        self._checked_at = None
+        self._next_expiry = None
+
+    def match(self, path):
+        """
+        Get the pk of the Redirect with the longest old_url which prefixes path
+
+        old_urls always start and end with a slash, so only the prefixes of
+        path which end with one can match.
+        """
+        urls = self._get_urls()
+
+        end = path.rfind("/")
+        while end >= 0:
+            if pk := urls.get(path[: end + 1]):
+                return pk
+            end = path.rfind("/", 0, end)
+
+        return None
+
+    def invalidate(self):
+        with self._lock:
+            self._urls = None
+
+    def _get_urls(self):
+        with self._lock:
+            now = time.monotonic()
+            expired = (
+                self._next_expiry is not None and self._next_expiry <= timezone.now()
+            )
+            fresh = (
+                self._urls is not None
+                and not expired
+                and now - self._checked_at < settings.REDIRECTS_INDEX_CHECK_INTERVAL
+            )
+            if fresh:
+                return self._urls
+
+            stamp = _get_stamp()
+            if self._urls is None or expired or stamp != self._stamp:
+                self._urls, self._next_expiry = _load()
+                self._stamp = stamp
+
+            self._checked_at = now
+            return self._urls
+
+
+index = RedirectIndex()
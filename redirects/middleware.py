@@ -1,13 +1,15 @@
-from django.db.models import CharField, F, Value
-from django.db.models.functions import Length
 from django.shortcuts import redirect
 
+from .index import index
 from .models import Redirect
 
 
 class RedirectsMiddleware:
     """Apply DB redirects to rewrite request URLs, with longer matches
-    preferred. Exact matches take top priority."""
+    preferred. Exact matches take top priority.
+
+    Matching is done against an in-memory index of the active redirects, so
+    requests which don't match one don't touch the DB."""
 
     def __init__(self, get_response):
         self.get_response = get_response
@@ -23,15 +25,8 @@ class RedirectsMiddleware:
 
         # Find the longest old_url that matches the start of request.path
         # (longer URLs are more specific). Exact matches take top priority.
-        redirection = (
-            Redirect.objects.annotate(
-                url_length=Length("old_url"),
-                request_url=Value(request.path, output_field=CharField()),
-            )
-            .filter(request_url__startswith=F("old_url"))
-            .order_by("-url_length")
-            .first()
-        )
+        pk = index.match(request.path)
+        redirection = Redirect.objects.filter(pk=pk).first() if pk else None
 
         # No match, allow the request to proceed.
         if not redirection:
@@ -152,7 +152,19 @@ class Redirect(models.Model):
     def type(self):  # noqa: A003
         return self.obj.__class__.__name__
 
+    def delete(self, *args, **kwargs):
+        # avoid circular imports
+        from .index import index
+
+        result = super().delete(*args, **kwargs)
+        index.invalidate()
+        return result
+
     def save(self, *args, **kwargs):
+        # avoid circular imports
+        from .index import index
+
         # TODO: check old_url doesn't match any path for the given redirect target
         # this avoids us creating a redirect loop by adding a redirect here
-        return super().save(*args, **kwargs)
+        super().save(*args, **kwargs)
+        index.invalidate()
@@ -0,0 +1,47 @@
+import os
+
+import pytest
+
+from .utils import write_results
+
+
+SUMMARIES = pytest.StashKey[list]()
+
+
+@pytest.fixture
+def record(request):
+    """Keep a scenario's summary for the report at the end of the run"""
+
+    def func(result):
+        summary = result.summary()
+        request.config.stash.setdefault(SUMMARIES, []).append(summary)
+        return summary
+
+    return func
+
+
+def pytest_terminal_summary(terminalreporter, config):
+    summaries = config.stash.get(SUMMARIES, [])
+    if not summaries:
+        return
+
+    columns = [
+        "scenario",
+        "concurrency",
+        "requests",
+        "errors",
+        "p50_ms",
+        "p95_ms",
+        "queries_per_request",
+        "rows_per_request",
+    ]
+    rows = [columns] + [[str(s[c]) for c in columns] for s in summaries]
+    widths = [max(len(row[i]) for row in rows) for i in range(len(columns))]
+
+    terminalreporter.section("benchmarks")
+    for row in rows:
+        terminalreporter.line("  ".join(v.ljust(w) for v, w in zip(row, widths)))
+
+    path = os.environ.get("BENCHMARK_RESULTS", "benchmark-results.json")
+    write_results(path, summaries)
+    terminalreporter.line(f"Results written to {path}")
@@ -0,0 +1,266 @@
+"""
+Benchmarks for the APIs job-runner and airlock call most often
+
+Each test seeds a synthetic dataset, drives one API at a fixed concurrency
+through the full Django stack, and records p50/p95 latency along with the
+queries and rows each request touched.
+
+Query counts are deterministic for a given dataset, so each scenario has a
+budget in budgets.json which it must stay within.  Latency depends on the
+machine, so instead pass BENCHMARK_COMPARE the results file from a previous
+run (eg on main) to fail any scenario whose p95 has grown by more than
+BENCHMARK_TOLERANCE.
+"""
+
+import json
+import os
+
+import pytest
+from django.utils import timezone
+
+from jobserver.models import Job
+
+from .utils import env_int, job_payload, load_budgets, load_results, run, seed
+
+
+pytestmark = [pytest.mark.benchmark, pytest.mark.django_db(transaction=True)]
+
+CONCURRENCY = env_int("BENCHMARK_CONCURRENCY", 4)
+REQUESTS = env_int("BENCHMARK_REQUESTS", 40)
+TOLERANCE = float(os.environ.get("BENCHMARK_TOLERANCE", "0.25"))
+
+
+@pytest.fixture
+def dataset(settings):
+    # queue notifications to the outbox rather than sending them inside the
+    # request.  OUTBOX_ENABLED defaults to False, so this measures deployments
+    # which turn it on, and keeps network calls out of the query counts.
+    settings.OUTBOX_ENABLED = True
+
+    return seed(
+        backends=env_int("BENCHMARK_BACKENDS", 4),
+        workspaces=env_int("BENCHMARK_WORKSPACES", 20),
+        job_requests=env_int("BENCHMARK_JOB_REQUESTS", 500),
+        max_jobs=env_int("BENCHMARK_MAX_JOBS", 10),
+        release_files=env_int("BENCHMARK_RELEASE_FILES", 50),
+    )
+
+
+@pytest.fixture
+def check(record):
+    budgets = load_budgets()
+
+    previous = {}
+    if path := os.environ.get("BENCHMARK_COMPARE"):
+        previous = load_results(path)
+
+    def func(result):
+        summary = record(result)
+        scenario = summary["scenario"]
+
+        assert summary["errors"] == 0, result.statuses
+        assert summary["max_queries"] <= budgets[scenario], (
+            f"{scenario} ran {summary['max_queries']} queries in a request, "
+            f"its budget is {budgets[scenario]}"
+        )
+
+        if scenario in previous:
+            limit = previous[scenario]["p95_ms"] * (1 + TOLERANCE)
+            assert summary["p95_ms"] <= limit, (
+                f"{scenario} p95 latency was {summary['p95_ms']}ms, "
+                f"previously {previous[scenario]['p95_ms']}ms"
+            )
+
+    return func
+
+
+def active_jobs(backend):
+    return list(
+        Job.objects.filter(job_request__backend=backend)
+        .filter(job_request__status__in=["pending", "running"])
+        .select_related("job_request")
+        .order_by("pk")
+    )
+
+
+def post_jobs(client, backend, data):
+    return client.post(
+        "/api/v2/jobs/",
+        data=json.dumps(data),
+        content_type="application/json",
+        headers={"authorization": backend.auth_token},
+    )
+
+
+def test_jobapiupdate_full_sync(dataset, check):
+    jobs = {b.pk: active_jobs(b) for b in dataset.backends}
+
+    def request(client, worker, iteration):
+        # job-runner syncs one backend, so give each worker a backend of its
+        # own as far as we can
+        backend = dataset.backends[worker % len(dataset.backends)]
+        now = timezone.now()
+        data = [job_payload(j, updated_at=now.isoformat()) for j in jobs[backend.pk]]
+        return post_jobs(client, backend, data)
+
+    check(
+        run(
+            "jobapiupdate_full_sync",
+            request,
+            concurrency=CONCURRENCY,
+            requests=REQUESTS,
+        )
+    )
+
+
+def test_jobapiupdate_delta_sync(dataset, check):
+    jobs = {b.pk: active_jobs(b)[:5] for b in dataset.backends}
+    cursors = {}
+
+    def request(client, worker, iteration):
+        backend = dataset.backends[worker % len(dataset.backends)]
+        now = timezone.now()
+        data = {
+            "cursor": cursors.get(backend.pk),
+            "jobs": [
+                job_payload(j, updated_at=now.isoformat()) for j in jobs[backend.pk]
+            ],
+            "deleted": [],
+        }
+
+        response = post_jobs(client, backend, data)
+        if response.status_code == 200:
+            cursors[backend.pk] = response.json()["cursor"]
+        return response
+
+    check(
+        run(
+            "jobapiupdate_delta_sync",
+            request,
+            # concurrent delta syncs for the same backend invalidate each
+            # other's cursors, which job-runner never does
+            concurrency=min(CONCURRENCY, len(dataset.backends)),
+            requests=REQUESTS,
+        )
+    )
+
+
+def test_jobrequestapilist(dataset, check):
+    def request(client, worker, iteration):
+        backend = dataset.backends[iteration % len(dataset.backends)]
+        return client.get(
+            "/api/v2/job-requests/", headers={"authorization": backend.auth_token}
+        )
+
+    check(
+        run(
+            "jobrequestapilist",
+            request,
+            concurrency=CONCURRENCY,
+            requests=REQUESTS,
+        )
+    )
+
+
+def test_jobrequestapilist_not_modified(dataset, check, client):
+    etags = {}
+    for backend in dataset.backends:
+        response = client.get(
+            "/api/v2/job-requests/", headers={"authorization": backend.auth_token}
+        )
+        etags[backend.pk] = response["ETag"]
+
+    def request(client, worker, iteration):
+        backend = dataset.backends[iteration % len(dataset.backends)]
+        return client.get(
+            "/api/v2/job-requests/",
+            headers={
+                "authorization": backend.auth_token,
+                "if-none-match": etags[backend.pk],
+            },
+        )
+
+    check(
+        run(
+            "jobrequestapilist_not_modified",
+            request,
+            concurrency=CONCURRENCY,
+            requests=REQUESTS,
+        )
+    )
+
+
+def test_workspacestatusesapi(dataset, check):
+    def request(client, worker, iteration):
+        workspace = dataset.workspaces[iteration % len(dataset.workspaces)]
+        backend = dataset.backends[iteration % len(dataset.backends)]
+        return client.get(
+            f"/api/v2/workspaces/{workspace.name}/statuses/?backend={backend.slug}"
+        )
+
+    check(
+        run(
+            "workspacestatusesapi",
+            request,
+            concurrency=CONCURRENCY,
+            requests=REQUESTS,
+        )
+    )
+
+
+def test_releaseworkspaceapi_index(dataset, check):
+    url = f"/api/v2/releases/workspace/{dataset.release_workspace.name}"
+
+    def request(client, worker, iteration):
+        return client.get(url)
+
+    check(
+        run(
+            "releaseworkspaceapi_index",
+            request,
+            concurrency=CONCURRENCY,
+            requests=REQUESTS,
+            user=dataset.user,
+        )
+    )
+
+
+def test_releaseworkspaceapi_create(dataset, check):
+    url = f"/api/v2/releases/workspace/{dataset.release_workspace.name}"
+
+    def request(client, worker, iteration):
+        backend = dataset.backends[worker % len(dataset.backends)]
+        data = {
+            "files": [
+                {
+                    "name": f"output/release_{iteration}/file_{i}.csv",
+                    "url": "url",
+                    "size": 1024,
+                    "sha256": f"{iteration:032x}{i:032x}",
+                    "date": timezone.now().isoformat(),
+                    "metadata": {},
+                    "review": None,
+                }
+                for i in range(5)
+            ],
+            "metadata": {},
+            "review": None,
+        }
+        return client.post(
+            url,
+            data=json.dumps(data),
+            content_type="application/json",
+            headers={
+                "authorization": backend.auth_token,
+                "os-user": dataset.user.username,
+            },
+        )
+
+    check(
+        run(
+            "releaseworkspaceapi_create",
+            request,
+            concurrency=CONCURRENCY,
+            requests=REQUESTS,
+        )
+    )
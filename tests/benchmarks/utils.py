@@ -0,0 +1,288 @@
+import json
+import os
+import random
+import statistics
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from datetime import timedelta
+from pathlib import Path
+
+from django.db import connection
+from django.test import Client
+from django.utils import timezone
+
+from jobserver.authorization import OutputChecker, ProjectDeveloper
+from jobserver.commands import project_members
+from jobserver.models import Job, JobRequest, LatestReleaseFile, ReleaseFile
+from jobserver.models.job_request import get_job_aggregates
+from tests.factories import (
+    BackendFactory,
+    BackendMembershipFactory,
+    JobFactory,
+    JobRequestFactory,
+    ProjectFactory,
+    ReleaseFactory,
+    UserFactory,
+    WorkspaceFactory,
+)
+
+
+# query budgets, per scenario, are recorded here and checked on every run
+BUDGETS_PATH = Path(__file__).parent / "budgets.json"
+
+ACTIVE_STATUSES = ["pending", "running"]
+COMPLETED_STATUSES = ["failed", "succeeded"]
+
+
+def env_int(name, default):
+    return int(os.environ.get(name, default))
+
+
+@dataclass
+class Dataset:
+    backends: list
+    workspaces: list
+    user: object
+    release_workspace: object
+
+
+def seed(
+    *,
+    backends=4,
+    workspaces=20,
+    job_requests=500,
+    max_jobs=10,
+    active_fraction=0.1,
+    release_files=50,
+    random_seed=0,
+):
+    """
+    Seed a database with a synthetic, but repeatable, dataset
+
+    JobRequests are spread across the given Backends and Workspaces, each with
+    between 1 and max_jobs Jobs.  Most of them have finished, as they would
+    have in production, with active_fraction of them still pending or
+    running.
+
+    The bulk of the rows are inserted with bulk_create so large datasets can
+    be built quickly.
+    """
+    rng = random.Random(random_seed)
+    now = timezone.now()
+
+    user = UserFactory(roles=[OutputChecker])
+    backend_objs = BackendFactory.create_batch(backends)
+    for backend in backend_objs:
+        BackendMembershipFactory(backend=backend, user=user)
+
+    projects = ProjectFactory.create_batch(max(1, workspaces // 5))
+    for project in projects:
+        project_members.add(
+            project=project, user=user, roles=[ProjectDeveloper], by=user
+        )
+
+    workspace_objs = [
+        WorkspaceFactory(project=projects[i % len(projects)], created_by=user)
+        for i in range(workspaces)
+    ]
+
+    request_objs = []
+    job_objs = []
+    for i in range(job_requests):
+        created_at = now - timedelta(minutes=job_requests - i)
+        job_request = JobRequestFactory.build(
+            backend=rng.choice(backend_objs),
+            created_by=user,
+            workspace=rng.choice(workspace_objs),
+            requested_actions=["run_all"],
+            created_at=created_at,
+        )
+
+        active = rng.random() < active_fraction
+        jobs = []
+        for j in range(rng.randint(1, max_jobs)):
+            status = rng.choice(ACTIVE_STATUSES if active else COMPLETED_STATUSES)
+            started_at = created_at if status != "pending" else None
+            completed_at = None
+            if status in COMPLETED_STATUSES:
+                completed_at = created_at + timedelta(seconds=rng.randint(1, 600))
+
+            jobs.append(
+                JobFactory.build(
+                    job_request=job_request,
+                    action=f"action_{j}",
+                    run_command=f"python:latest analysis/action_{j}.py",
+                    status=status,
+                    created_at=created_at,
+                    started_at=started_at,
+                    completed_at=completed_at,
+                    updated_at=completed_at or created_at,
+                )
+            )
+
+        # set the materialised aggregates as a sync would
+        for name, value in get_job_aggregates(jobs).items():
+            setattr(job_request, name, value)
+
+        request_objs.append(job_request)
+        job_objs.extend(jobs)
+
+    JobRequest.objects.bulk_create(request_objs)
+    Job.objects.bulk_create(job_objs)
+
+    # give one Workspace a history of releases on each Backend
+    release_workspace = workspace_objs[0]
+    for backend in backend_objs:
+        release = ReleaseFactory(
+            backend=backend, workspace=release_workspace, created_by=user
+        )
+        rfiles = ReleaseFile.objects.bulk_create(
+            ReleaseFile(
+                release=release,
+                workspace=release_workspace,
+                created_by=user,
+                name=f"output/file_{i}.csv",
+                path=f"{release_workspace.name}/{release.id}/output/file_{i}.csv",
+                filehash=f"{i:064x}",
+                size=1024,
+                mtime=now,
+                metadata={},
+            )
+            for i in range(release_files)
+        )
+        LatestReleaseFile.objects.record(rfiles)
+
+    return Dataset(
+        backends=backend_objs,
+        workspaces=workspace_objs,
+        user=user,
+        release_workspace=release_workspace,
+    )
+
+
+@dataclass
+class Result:
+    scenario: str
+    concurrency: int
+    latencies: list = field(default_factory=list)
+    queries: list = field(default_factory=list)
+    rows: list = field(default_factory=list)
+    statuses: list = field(default_factory=list)
+
+    @property
+    def errors(self):
+        return sum(1 for s in self.statuses if s >= 400)
+
+    def percentile(self, values, pct):
+        # nearest rank, which is stable for the small samples we take
+        ordered = sorted(values)
+        return ordered[max(0, round(pct / 100 * len(ordered)) - 1)]
+
+    def summary(self):
+        return {
+            "scenario": self.scenario,
+            "concurrency": self.concurrency,
+            "requests": len(self.latencies),
+            "errors": self.errors,
+            "p50_ms": round(self.percentile(self.latencies, 50) * 1000, 2),
+            "p95_ms": round(self.percentile(self.latencies, 95) * 1000, 2),
+            "queries_per_request": statistics.mean(self.queries),
+            "max_queries": max(self.queries),
+            "rows_per_request": statistics.mean(self.rows),
+        }
+
+
+class QueryCounter:
+    """
+    Count the queries run, and rows they touched, on this thread's connection
+
+    For SELECTs the row count is the number of rows returned, for other
+    statements it's the number of rows they changed.
+    """
+
+    def __init__(self):
+        self.queries = 0
+        self.rows = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        result = execute(sql, params, many, context)
+
+        self.queries += 1
+        self.rows += max(context["cursor"].rowcount, 0)
+
+        return result
+
+
+def job_payload(job, **kwargs):
+    """Build the payload job-runner would send for the given Job"""
+
+    def isoformat(value):
+        return value.isoformat() if value is not None else None
+
+    return {
+        "job_request_id": job.job_request.identifier,
+        "identifier": job.identifier,
+        "action": job.action,
+        "run_command": job.run_command,
+        "status": job.status,
+        "status_code": job.status_code,
+        "status_message": job.status_message,
+        "created_at": isoformat(job.created_at),
+        "updated_at": isoformat(job.updated_at),
+        "started_at": isoformat(job.started_at),
+        "completed_at": isoformat(job.completed_at),
+    } | kwargs
+
+
+def run(scenario, func, *, concurrency, requests, user=None):
+    """
+    Call func(client, worker, iteration) requests times across a pool of workers
+
+    Each worker gets its own test Client, and so its own database connection,
+    logged in as user if one is given.  func must make exactly one request
+    with the client and return its response.
+    """
+    result = Result(scenario=scenario, concurrency=concurrency)
+    lock = threading.Lock()
+
+    def worker(number):
+        client = Client()
+        if user is not None:
+            client.force_login(user)
+
+        try:
+            for iteration in range(number, requests, concurrency):
+                counter = QueryCounter()
+                with connection.execute_wrapper(counter):
+                    start = time.perf_counter()
+                    response = func(client, number, iteration)
+                    elapsed = time.perf_counter() - start
+
+                with lock:
+                    result.latencies.append(elapsed)
+                    result.queries.append(counter.queries)
+                    result.rows.append(counter.rows)
+                    result.statuses.append(response.status_code)
+        finally:
+            connection.close()
+
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        # consume the results so any exceptions are raised here
+        list(executor.map(worker, range(concurrency)))
+
+    return result
+
+
+def load_budgets():
+    return json.loads(BUDGETS_PATH.read_text())
+
+
+def load_results(path):
+    """Load the summaries from a previous run, keyed by scenario"""
+    return {s["scenario"]: s for s in json.loads(Path(path).read_text())}
+
+
+def write_results(path, summaries):
+    Path(path).write_text(json.dumps(summaries, indent=2) + "\n")
@@ -10,6 +10,7 @@ import structlog
 from django.conf import settings
 from django.contrib.messages.storage.fallback import FallbackStorage
 from django.contrib.sessions.backends.db import SessionStore
+from django.core.cache import cache
 from django.core.handlers.wsgi import WSGIRequest
 from django.test import RequestFactory
 from django.utils import timezone
@@ -22,8 +23,11 @@ from structlog.testing import LogCapture
 import jobserver.authorization.roles
 import services.slack
 from applications.form_specs import form_specs
+from jobserver import job_request_events
+from jobserver.api import pat_cache, token_cache
 from jobserver.authorization.roles import StaffAreaAdministrator
 from jobserver.commands import project_members
+from redirects.index import index as redirect_index
 
 from .factories import (
     BackendFactory,
@@ -70,6 +74,28 @@ def clear_all_traces():
     test_exporter.clear()
 
 
+@pytest.fixture(autouse=True)
+def clear_process_caches():
+    # these live for the whole process but hold rows, or are keyed by pks, from
+    # a test database which is rolled back after each test
+    token_cache.cache.clear()
+    pat_cache.cache.clear()
+    redirect_index.invalidate()
+    cache.clear()
+
+
+@pytest.fixture
+def job_request_listener():
+    listener = job_request_events.listener
+    listener.start()
+    assert listener.listening.wait(timeout=5)
+
+    yield listener
+
+    # stop listening so the connection doesn't outlive the test database
+    listener.stop()
+
+
 @pytest.fixture
 def api_rf():
     from rest_framework.test import APIRequestFactory
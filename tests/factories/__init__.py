@@ -5,8 +5,10 @@ from .backend import *  # noqa: F401, F403
 from .backend_membership import *  # noqa: F401, F403
 from .job import *  # noqa: F401, F403
 from .job_request import *  # noqa: F401, F403
+from .latest_release_file import *  # noqa: F401, F403
 from .org import *  # noqa: F401, F403
 from .org_membership import *  # noqa: F401, F403
+from .outbox import *  # noqa: F401, F403
 from .partial import *  # noqa: F401, F403
 from .project import *  # noqa: F401, F403
 from .project_collaboration import *  # noqa: F401, F403
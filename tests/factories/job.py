@@ -22,6 +22,7 @@ def generate_traceparent():
 class JobFactory(factory.django.DjangoModelFactory):
     class Meta:
         model = Job
+        skip_postgeneration_save = True
 
     job_request = factory.SubFactory("tests.factories.JobRequestFactory")
 
@@ -30,3 +31,10 @@ class JobFactory(factory.django.DjangoModelFactory):
     updated_at = factory.fuzzy.FuzzyDateTime(datetime(2020, 1, 1, tzinfo=UTC))
 
     trace_context = factory.LazyFunction(generate_traceparent)
+
+    @factory.post_generation
+    def update_job_request(obj, create, extracted, **kwargs):
+        # keep the JobRequest's materialised fields in step with its Jobs, as
+        # a sync from job-runner would
+        if create:
+            obj.job_request.update_from_jobs()
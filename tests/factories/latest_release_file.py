@@ -0,0 +1,16 @@
+from datetime import UTC
+
+import factory
+
+from jobserver.models import LatestReleaseFile
+
+
+class LatestReleaseFileFactory(factory.django.DjangoModelFactory):
+    class Meta:
+        model = LatestReleaseFile
+
+    workspace = factory.SubFactory("tests.factories.WorkspaceFactory")
+    backend = factory.SubFactory("tests.factories.BackendFactory")
+    name = factory.Sequence(lambda n: f"output/file{n}.txt")
+    release_file = factory.SubFactory("tests.factories.ReleaseFileFactory")
+    release_created_at = factory.Faker("date_time", tzinfo=UTC)
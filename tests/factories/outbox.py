@@ -0,0 +1,10 @@
+import factory
+
+from jobserver.models import OutboxMessage
+
+
+class OutboxMessageFactory(factory.django.DjangoModelFactory):
+    class Meta:
+        model = OutboxMessage
+
+    task = "jobserver.slacks.notify_new_user"
@@ -4,6 +4,8 @@ import pytest
 from requests.exceptions import HTTPError
 
 from airlock.views import AirlockEvent, EventType, airlock_event_view
+from jobserver import outbox
+from jobserver.models import OutboxMessage
 from tests.factories import (
     BackendFactory,
     BackendMembershipFactory,
@@ -107,6 +109,46 @@ def test_api_post_release_request_post_by_non_author(
         assert len(slack_messages) == 0
 
 
+@patch("airlock.views._get_github_api", FakeGitHubAPI)
+def test_api_post_release_request_with_outbox_enabled(
+    api_rf, mailoutbox, settings, slack_messages
+):
+    settings.OUTBOX_ENABLED = True
+
+    author = UserFactory(username="author")
+    user = UserFactory(username="user")
+    WorkspaceFactory(name="test-workspace")
+    backend = BackendFactory(auth_token="test", name="test-backend")
+    BackendMembershipFactory(backend=backend, user=user)
+    ReleaseFactory(id="01AAA1AAAAAAA1AAAAA11A1AAA")
+
+    data = {
+        "event_type": "request_released",
+        "updates": None,
+        "workspace": "test-workspace",
+        "request": "01AAA1AAAAAAA1AAAAA11A1AAA",
+        "request_author": author.username,
+        "user": user.username,
+    }
+    request = api_rf.post(
+        "/",
+        data=data,
+        format="json",
+        headers={"authorization": "test", "os-user": user.username},
+    )
+    response = airlock_event_view(request)
+
+    assert response.status_code == 201
+    assert response.data == {"status": "ok"}
+
+    # notifications are queued rather than sent
+    assert len(mailoutbox) == 0
+    assert OutboxMessage.objects.count() == 2
+
+    assert outbox.deliver_pending() == (2, 0)
+    assert len(mailoutbox) == 1
+
+
 @patch("airlock.views._get_github_api", FakeGitHubAPI)
 @patch("airlock.views.create_output_checking_issue")
 def test_api_post_release_request_custom_org_and_repo(mock_create_issue, api_rf):
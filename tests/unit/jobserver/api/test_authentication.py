@@ -32,3 +32,35 @@ def test_token_backend_success():
 def test_token_backend_unknown_backend():
     with pytest.raises(NotAuthenticated):
         get_backend_from_token("test")
+
+
+def test_token_backend_cached(django_assert_num_queries):
+    backend = BackendFactory(slug="tpp")
+    get_backend_from_token(backend.auth_token)
+
+    with django_assert_num_queries(0):
+        assert get_backend_from_token(backend.auth_token) == backend
+
+
+def test_token_backend_cache_cleared_on_rotation():
+    backend = BackendFactory(slug="tpp")
+    old_token = backend.auth_token
+    get_backend_from_token(old_token)
+
+    backend.rotate_token()
+
+    with pytest.raises(NotAuthenticated):
+        get_backend_from_token(old_token)
+
+    assert get_backend_from_token(backend.auth_token) == backend
+
+
+def test_token_backend_cache_kept_on_partial_save(django_assert_num_queries):
+    backend = BackendFactory(slug="tpp")
+    get_backend_from_token(backend.auth_token)
+
+    backend.jobrunner_state = {"mode": "test"}
+    backend.save(update_fields=["jobrunner_state"])
+
+    with django_assert_num_queries(0):
+        get_backend_from_token(backend.auth_token)
@@ -0,0 +1,225 @@
+from datetime import UTC, datetime
+
+import pytest
+from rest_framework import serializers
+
+from jobserver.api import fast_validation
+from jobserver.api.fast_validation import Fallback
+
+
+class ItemSerializer(serializers.Serializer):
+    name = serializers.CharField()
+    count = serializers.IntegerField()
+    created_at = serializers.DateTimeField()
+    metadata = serializers.DictField()
+    extra = serializers.JSONField()
+    note = serializers.CharField(allow_blank=True, required=False, default="")
+    optional = serializers.CharField(required=False)
+    identifier = serializers.CharField(read_only=True)
+
+
+class BatchSerializer(serializers.Serializer):
+    items = ItemSerializer(many=True)
+    completed_at = serializers.DateTimeField(allow_null=True)
+
+
+def drf_validate(serializer_class, data, many=False):
+    serializer = serializer_class(data=data, many=many)
+    serializer.is_valid(raise_exception=True)
+    return serializer.validated_data
+
+
+@pytest.fixture
+def item():
+    return {
+        "name": "  test  ",
+        "count": 3,
+        "created_at": "2024-01-02T03:04:05.678Z",
+        "metadata": {"foo": ["bar"]},
+        "extra": [1, "two"],
+    }
+
+
+def test_validate_fast_path_matches_drf(item):
+    data = {"items": [item], "completed_at": None}
+
+    output = fast_validation.validate(BatchSerializer, data)
+
+    assert output == drf_validate(BatchSerializer, data)
+    assert output["items"][0]["name"] == "test"
+    assert output["items"][0]["note"] == ""
+    assert output["items"][0]["created_at"] == datetime(
+        2024, 1, 2, 3, 4, 5, 678000, tzinfo=UTC
+    )
+    assert "optional" not in output["items"][0]
+
+
+def test_validate_many_matches_drf(item):
+    output = fast_validation.validate(ItemSerializer, [item, item], many=True)
+
+    assert output == drf_validate(ItemSerializer, [item, item], many=True)
+
+
+@pytest.mark.parametrize("changes", [{"name": 1}, {"count": "3"}])
+def test_validate_coerced_data_matches_drf(item, changes):
+    data = item | changes
+
+    output = fast_validation.validate(ItemSerializer, data)
+
+    assert output == drf_validate(ItemSerializer, data)
+
+
+@pytest.mark.parametrize(
+    "changes",
+    [
+        {"name": ""},
+        {"name": "nul\x00"},
+        {"name": "\ud800"},
+        {"count": True},
+        {"created_at": "not a date"},
+        {"created_at": "2024-13-45T00:00:00Z"},
+        {"created_at": 1},
+        {"metadata": []},
+        {"name": None},
+    ],
+)
+def test_validate_invalid_data_matches_drf_errors(item, changes):
+    data = [item | changes]
+
+    with pytest.raises(serializers.ValidationError) as fast:
+        fast_validation.validate(ItemSerializer, data, many=True)
+
+    with pytest.raises(serializers.ValidationError) as drf:
+        drf_validate(ItemSerializer, data, many=True)
+
+    assert fast.value.detail == drf.value.detail
+
+
+def test_validate_missing_required_field(item):
+    del item["count"]
+
+    with pytest.raises(serializers.ValidationError) as exc:
+        fast_validation.validate(ItemSerializer, item)
+
+    assert exc.value.detail == {"count": ["This field is required."]}
+
+
+def test_validate_not_a_list():
+    with pytest.raises(serializers.ValidationError):
+        fast_validation.validate(ItemSerializer, {}, many=True)
+
+
+def test_validate_not_a_dict():
+    with pytest.raises(serializers.ValidationError):
+        fast_validation.validate(ItemSerializer, [])
+
+
+def test_validate_serializer_validate_method():
+    class Serializer(serializers.Serializer):
+        size = serializers.IntegerField()
+
+        def validate(self, data):
+            if data["size"] > 10:
+                raise serializers.ValidationError("too big")
+            return data
+
+    assert fast_validation.validate(Serializer, {"size": 1}) == {"size": 1}
+
+    with pytest.raises(serializers.ValidationError) as exc:
+        fast_validation.validate(Serializer, {"size": 11})
+
+    assert exc.value.detail == {"non_field_errors": ["too big"]}
+
+
+@pytest.mark.parametrize(
+    "field",
+    [
+        serializers.CharField(source="other"),
+        serializers.CharField(max_length=10),
+        serializers.DateTimeField(input_formats=["%Y"]),
+        serializers.DictField(child=serializers.CharField()),
+        serializers.IntegerField(min_value=0),
+        serializers.JSONField(binary=True),
+        serializers.ListField(child=serializers.CharField()),
+    ],
+)
+def test_validate_unhandled_fields_match_drf(field):
+    class Serializer(serializers.Serializer):
+        value = field
+
+    data = {
+        "value": {
+            serializers.CharField: "some text",
+            serializers.DateTimeField: "2024",
+            serializers.DictField: {"a": "b"},
+            serializers.IntegerField: 5,
+            serializers.JSONField: '{"a": 1}',
+            serializers.ListField: ["a"],
+        }[type(field)]
+    }
+
+    assert fast_validation.validate(Serializer, data) == drf_validate(Serializer, data)
+
+
+def test_validate_with_field_validate_method():
+    class Serializer(serializers.Serializer):
+        name = serializers.CharField()
+
+        def validate_name(self, value):
+            return value.upper()
+
+    assert fast_validation.validate(Serializer, {"name": "a"}) == {"name": "A"}
+
+
+def test_validate_with_serializer_validators():
+    class Serializer(serializers.Serializer):
+        name = serializers.CharField()
+
+        class Meta:
+            validators = [lambda data: None]
+
+    assert fast_validation.validate(Serializer, {"name": "a"}) == {"name": "a"}
+
+
+def test_validate_dict_allow_empty():
+    field = serializers.DictField(allow_empty=False)
+
+    with pytest.raises(Fallback):
+        fast_validation.validate_dict(field, {})
+
+
+def test_validate_list_allow_empty():
+    field = ItemSerializer(many=True, allow_empty=False)
+
+    with pytest.raises(Fallback):
+        fast_validation.validate_list(field, [])
+
+
+def test_validate_list_with_length_limits():
+    field = ItemSerializer(many=True, max_length=2)
+
+    with pytest.raises(Fallback):
+        fast_validation.validate_list(field, [])
+
+
+def test_validate_without_trim_whitespace():
+    class Serializer(serializers.Serializer):
+        name = serializers.CharField(trim_whitespace=False)
+
+    assert fast_validation.validate(Serializer, {"name": " a "}) == {"name": " a "}
+
+
+def test_validate_char_with_validators():
+    def no_spaces(value):
+        if " " in value:
+            raise serializers.ValidationError("no spaces")
+
+    class Serializer(serializers.Serializer):
+        name = serializers.CharField(validators=[no_spaces])
+
+    assert fast_validation.validate(Serializer, {"name": "a"}) == {"name": "a"}
+
+    with pytest.raises(serializers.ValidationError) as exc:
+        fast_validation.validate(Serializer, {"name": "a b"})
+
+    assert exc.value.detail == {"name": ["no spaces"]}
@@ -0,0 +1,74 @@
+import gzip
+import io
+from datetime import UTC, date, datetime
+from decimal import Decimal
+
+import pytest
+from rest_framework.exceptions import ParseError
+from rest_framework.renderers import JSONRenderer
+
+from jobserver.api import fastjson
+from jobserver.api.fastjson import ORJSONParser, ORJSONRenderer
+
+
+def parse(body, rf, **headers):
+    request = rf.post("/", headers=headers)
+    return ORJSONParser().parse(io.BytesIO(body), parser_context={"request": request})
+
+
+def test_decompress_too_large(monkeypatch):
+    monkeypatch.setattr(fastjson, "MAX_DECOMPRESSED_SIZE", 10)
+
+    with pytest.raises(ParseError, match="too large"):
+        fastjson.decompress(gzip.compress(b"[" + b"1," * 100 + b"1]"))
+
+
+def test_orjsonparser_gzipped(rf):
+    body = gzip.compress(b'{"foo": ["bar", 1]}')
+
+    assert parse(body, rf, content_encoding="gzip") == {"foo": ["bar", 1]}
+
+
+def test_orjsonparser_invalid_gzip(rf):
+    with pytest.raises(ParseError, match="Invalid gzip"):
+        parse(b'{"foo": "bar"}', rf, content_encoding="gzip")
+
+
+def test_orjsonparser_invalid_json(rf):
+    with pytest.raises(ParseError, match="JSON parse error"):
+        parse(b'{"foo": ', rf)
+
+
+def test_orjsonparser_success(rf):
+    assert parse(b'{"foo": "bar"}', rf) == {"foo": "bar"}
+
+
+def test_orjsonparser_without_request():
+    assert ORJSONParser().parse(io.BytesIO(b"[1, 2]")) == [1, 2]
+
+
+@pytest.mark.parametrize(
+    "data",
+    [
+        {"date": date(2024, 1, 2)},
+        {"datetime": datetime(2024, 1, 2, 3, 4, 5, 678901, tzinfo=UTC)},
+        {"decimal": Decimal("1.50")},
+        {"nested": [{"unicode": "café ☕"}, None, True, 1.5]},
+        {"separators": "  and  "},
+        {1: "non-string key"},
+    ],
+)
+def test_orjsonrenderer_matches_jsonrenderer(data):
+    assert ORJSONRenderer().render(data) == JSONRenderer().render(data)
+
+
+def test_orjsonrenderer_none():
+    assert ORJSONRenderer().render(None) == b""
+
+
+def test_orjsonrenderer_with_indent():
+    output = ORJSONRenderer().render(
+        {"foo": [1]}, accepted_media_type="application/json; indent=4"
+    )
+
+    assert output == b'{\n  "foo": [\n    1\n  ]\n}'
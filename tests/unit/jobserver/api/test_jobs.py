@@ -1,10 +1,15 @@
+import gzip
 import json
+import threading
 from collections import OrderedDict
 
 import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
 from django.utils import timezone
 from rest_framework.exceptions import NotAuthenticated
 
+from jobserver import outbox
 from jobserver.api.jobs import (
     JobAPIUpdate,
     JobRequestAPIList,
@@ -14,7 +19,7 @@ from jobserver.api.jobs import (
     update_stats,
 )
 from jobserver.authorization import ProjectDeveloper, StaffAreaAdministrator
-from jobserver.models import Job, JobRequest, Stats
+from jobserver.models import Job, JobRequest, OutboxMessage, Stats
 from tests.factories import (
     AnalysisRequestFactory,
     BackendFactory,
@@ -22,12 +27,12 @@ from tests.factories import (
     JobRequestFactory,
     OrgFactory,
     OrgMembershipFactory,
+    ProjectCollaborationFactory,
     ProjectFactory,
     StatsFactory,
     UserFactory,
     WorkspaceFactory,
 )
-from tests.fakes import FakeGitHubAPI
 from tests.utils import minutes_ago, seconds_ago
 
 
@@ -145,7 +150,7 @@ def test_jobapiupdate_all_existing(api_rf, freezer):
     request = api_rf.post(
         "/", headers={"authorization": backend.auth_token}, data=data, format="json"
     )
-    response = JobAPIUpdate.as_view(get_github_api=FakeGitHubAPI)(request)
+    response = JobAPIUpdate.as_view()(request)
 
     assert response.status_code == 200, response.data
 
@@ -229,12 +234,201 @@ def test_jobapiupdate_all_new(api_rf):
     request = api_rf.post(
         "/", headers={"authorization": backend.auth_token}, data=data, format="json"
     )
-    response = JobAPIUpdate.as_view(get_github_api=FakeGitHubAPI)(request)
+    response = JobAPIUpdate.as_view()(request)
 
     assert response.status_code == 200, response.data
     assert Job.objects.count() == 3
 
 
+def test_jobapiupdate_gzipped_body(api_rf):
+    backend = BackendFactory()
+    job_request = JobRequestFactory()
+
+    now = timezone.now().isoformat()
+    data = [
+        {
+            "identifier": "job1",
+            "job_request_id": job_request.identifier,
+            "action": "test-action",
+            "run_command": "do-research",
+            "status": "running",
+            "status_code": "",
+            "status_message": "",
+            "created_at": now,
+            "started_at": now,
+            "updated_at": now,
+            "completed_at": None,
+        },
+    ]
+
+    request = api_rf.post(
+        "/",
+        headers={"authorization": backend.auth_token, "content-encoding": "gzip"},
+        data=gzip.compress(json.dumps(data).encode()),
+        content_type="application/json",
+    )
+    response = JobAPIUpdate.as_view()(request)
+
+    assert response.status_code == 200, response.data
+    assert Job.objects.get().identifier == "job1"
+
+
+def test_jobapiupdate_delta_success(api_rf, freezer):
+    backend = BackendFactory(jobrunner_cursor=minutes_ago(timezone.now(), 5))
+    job_request = JobRequestFactory(backend=backend)
+
+    now = timezone.now()
+
+    unchanged = JobFactory(job_request=job_request, status="running")
+    changed = JobFactory(job_request=job_request, status="running")
+    removed = JobFactory(job_request=job_request, status="pending")
+
+    data = {
+        "cursor": backend.jobrunner_cursor,
+        "jobs": [
+            {
+                "identifier": changed.identifier,
+                "job_request_id": job_request.identifier,
+                "action": "test",
+                "run_command": "do-research",
+                "status": "succeeded",
+                "status_code": "",
+                "status_message": "",
+                "created_at": minutes_ago(now, 2),
+                "started_at": minutes_ago(now, 1),
+                "updated_at": now,
+                "completed_at": now,
+            },
+        ],
+        "deleted": [
+            {
+                "identifier": removed.identifier,
+                "job_request_id": job_request.identifier,
+            },
+        ],
+    }
+
+    request = api_rf.post(
+        "/", headers={"authorization": backend.auth_token}, data=data, format="json"
+    )
+    response = JobAPIUpdate.as_view()(request)
+
+    assert response.status_code == 200, response.data
+    assert response.data["cursor"] == now
+
+    # Jobs missing from a delta sync are left alone, only explicitly deleted
+    # Jobs are removed
+    assert set(job_request.jobs.values_list("pk", flat=True)) == {
+        unchanged.pk,
+        changed.pk,
+    }
+    changed.refresh_from_db()
+    assert changed.status == "succeeded"
+
+    backend.refresh_from_db()
+    assert backend.jobrunner_cursor == now
+
+
+def test_jobapiupdate_delta_with_newly_completed_job_request(api_rf, mocker):
+    backend = BackendFactory()
+    job_request = JobRequestFactory(backend=backend)
+    JobFactory(job_request=job_request, status="succeeded")
+    job = JobFactory(job_request=job_request, status="running")
+
+    mocked_notify = mocker.patch(
+        "jobserver.api.jobs.handle_job_request_notifications", autospec=True
+    )
+
+    now = timezone.now()
+
+    data = {
+        "cursor": None,
+        "jobs": [
+            {
+                "identifier": job.identifier,
+                "job_request_id": job_request.identifier,
+                "action": "test",
+                "run_command": "do-research",
+                "status": "succeeded",
+                "status_code": "",
+                "status_message": "",
+                "created_at": minutes_ago(now, 2),
+                "started_at": minutes_ago(now, 1),
+                "updated_at": now,
+                "completed_at": now,
+            },
+        ],
+    }
+
+    request = api_rf.post(
+        "/", headers={"authorization": backend.auth_token}, data=data, format="json"
+    )
+    response = JobAPIUpdate.as_view()(request)
+
+    assert response.status_code == 200, response.data
+
+    # the status was derived from the Job we were sent and the one we weren't
+    mocked_notify.assert_called_once()
+    assert mocked_notify.call_args.kwargs["status"] == "succeeded"
+
+
+def test_jobapiupdate_delta_with_only_deletions(api_rf):
+    backend = BackendFactory()
+    job_request = JobRequestFactory(backend=backend)
+    job = JobFactory(job_request=job_request)
+
+    data = {
+        "cursor": None,
+        "jobs": [],
+        "deleted": [
+            {"identifier": job.identifier, "job_request_id": job_request.identifier},
+        ],
+    }
+
+    request = api_rf.post(
+        "/", headers={"authorization": backend.auth_token}, data=data, format="json"
+    )
+    response = JobAPIUpdate.as_view()(request)
+
+    assert response.status_code == 200, response.data
+    assert response.data["cursor"] is None
+    assert not Job.objects.exists()
+
+
+def test_jobapiupdate_delta_with_stale_cursor(api_rf):
+    now = timezone.now()
+    backend = BackendFactory(jobrunner_cursor=now)
+    job_request = JobRequestFactory(backend=backend)
+
+    data = {
+        "cursor": minutes_ago(now, 5),
+        "jobs": [
+            {
+                "identifier": "job1",
+                "job_request_id": job_request.identifier,
+                "action": "test",
+                "run_command": "do-research",
+                "status": "running",
+                "status_code": "",
+                "status_message": "",
+                "created_at": minutes_ago(now, 2),
+                "started_at": minutes_ago(now, 1),
+                "updated_at": now,
+                "completed_at": None,
+            },
+        ],
+    }
+
+    request = api_rf.post(
+        "/", headers={"authorization": backend.auth_token}, data=data, format="json"
+    )
+    response = JobAPIUpdate.as_view()(request)
+
+    assert response.status_code == 409, response.data
+    assert response.data["cursor"] == now
+    assert not Job.objects.exists()
+
+
 def test_jobapiupdate_invalid_payload(api_rf):
     backend = BackendFactory()
 
@@ -245,7 +439,7 @@ def test_jobapiupdate_invalid_payload(api_rf):
     request = api_rf.post(
         "/", headers={"authorization": backend.auth_token}, data=data, format="json"
     )
-    response = JobAPIUpdate.as_view(get_github_api=FakeGitHubAPI)(request)
+    response = JobAPIUpdate.as_view()(request)
 
     assert Job.objects.count() == 0
 
@@ -257,7 +451,7 @@ def test_jobapiupdate_invalid_payload(api_rf):
 
 def test_jobapiupdate_is_behind_auth(api_rf):
     request = api_rf.post("/")
-    response = JobAPIUpdate.as_view(get_github_api=FakeGitHubAPI)(request)
+    response = JobAPIUpdate.as_view()(request)
 
     assert response.status_code == 403, response.data
 
@@ -320,7 +514,7 @@ def test_jobapiupdate_mixture(api_rf, freezer):
     request = api_rf.post(
         "/", headers={"authorization": backend.auth_token}, data=data, format="json"
     )
-    response = JobAPIUpdate.as_view(get_github_api=FakeGitHubAPI)(request)
+    response = JobAPIUpdate.as_view()(request)
 
     assert response.status_code == 200, response.data
 
@@ -348,6 +542,86 @@ def test_jobapiupdate_mixture(api_rf, freezer):
     assert job3.completed_at is None
 
 
+def test_jobapiupdate_num_queries_independent_of_job_count(api_rf):
+    now = timezone.now()
+
+    # make sure each request takes the same path when moving the sync cursor
+    # and recording stats
+    backend = BackendFactory(jobrunner_cursor=now)
+    StatsFactory(backend=backend, url="/")
+
+    def build_job(job_request, identifier):
+        return {
+            "identifier": identifier,
+            "job_request_id": job_request.identifier,
+            "action": "test",
+            "run_command": "do-research",
+            "status": "running",
+            "status_code": "",
+            "status_message": "",
+            "created_at": minutes_ago(now, 2),
+            "started_at": minutes_ago(now, 1),
+            "updated_at": now,
+            "completed_at": None,
+        }
+
+    def count_queries(num_jobs):
+        # one existing Job to update and the rest to create
+        job_request = JobRequestFactory()
+        existing = JobFactory(job_request=job_request, status="pending")
+
+        data = [build_job(job_request, existing.identifier)] + [
+            build_job(job_request, f"{job_request.identifier}-{i}")
+            for i in range(num_jobs - 1)
+        ]
+        request = api_rf.post(
+            "/", headers={"authorization": backend.auth_token}, data=data, format="json"
+        )
+
+        with CaptureQueriesContext(connection) as queries:
+            response = JobAPIUpdate.as_view()(request)
+
+        assert response.status_code == 200, response.data
+        assert job_request.jobs.count() == num_jobs
+        return len(queries)
+
+    assert count_queries(2) == count_queries(50)
+
+
+def test_jobapiupdate_with_duplicate_jobs(api_rf):
+    backend = BackendFactory()
+    job_request = JobRequestFactory()
+
+    now = timezone.now()
+
+    job = {
+        "identifier": "job1",
+        "job_request_id": job_request.identifier,
+        "action": "test",
+        "run_command": "do-research",
+        "status": "running",
+        "status_code": "",
+        "status_message": "",
+        "created_at": minutes_ago(now, 2),
+        "started_at": minutes_ago(now, 1),
+        "updated_at": now,
+        "completed_at": None,
+    }
+    data = [job, {**job, "status": "succeeded", "completed_at": now}]
+
+    request = api_rf.post(
+        "/", headers={"authorization": backend.auth_token}, data=data, format="json"
+    )
+    response = JobAPIUpdate.as_view()(request)
+
+    assert response.status_code == 200, response.data
+
+    # the last version of the Job we were sent wins
+    job = Job.objects.get()
+    assert job.status == "succeeded"
+    assert job.completed_at == now
+
+
 def test_jobapiupdate_notifications_on_with_move_to_succeeded(api_rf, mocker):
     workspace = WorkspaceFactory()
     job_request = JobRequestFactory(workspace=workspace, will_notify=True)
@@ -381,12 +655,56 @@ def test_jobapiupdate_notifications_on_with_move_to_succeeded(api_rf, mocker):
         format="json",
     )
 
-    response = JobAPIUpdate.as_view(get_github_api=FakeGitHubAPI)(request)
+    response = JobAPIUpdate.as_view()(request)
 
     mocked_send.assert_called_once()
     assert response.status_code == 200
 
 
+def test_jobapiupdate_notifications_with_outbox_enabled(api_rf, mailoutbox, settings):
+    settings.OUTBOX_ENABLED = True
+
+    job_request = JobRequestFactory(will_notify=True)
+    job = JobFactory(job_request=job_request, status="running")
+
+    now = timezone.now()
+
+    data = [
+        {
+            "identifier": job.identifier,
+            "job_request_id": job_request.identifier,
+            "action": "test",
+            "run_command": "do-research",
+            "status": "succeeded",
+            "status_code": "",
+            "status_message": "",
+            "created_at": minutes_ago(now, 2),
+            "started_at": minutes_ago(now, 1),
+            "updated_at": now,
+            "completed_at": seconds_ago(now, 30),
+        },
+    ]
+    request = api_rf.post(
+        "/",
+        headers={"authorization": job_request.backend.auth_token},
+        data=data,
+        format="json",
+    )
+
+    response = JobAPIUpdate.as_view()(request)
+
+    assert response.status_code == 200
+
+    # the email is queued rather than sent
+    assert len(mailoutbox) == 0
+    message = OutboxMessage.objects.get(
+        task="jobserver.emails.send_finished_notification"
+    )
+
+    outbox.deliver(message)
+    assert len(mailoutbox) == 1
+
+
 def test_jobapiupdate_notifications_on_without_move_to_completed(api_rf, mocker):
     workspace = WorkspaceFactory()
     job_request = JobRequestFactory(workspace=workspace, will_notify=True)
@@ -423,7 +741,7 @@ def test_jobapiupdate_notifications_on_without_move_to_completed(api_rf, mocker)
         format="json",
     )
 
-    response = JobAPIUpdate.as_view(get_github_api=FakeGitHubAPI)(request)
+    response = JobAPIUpdate.as_view()(request)
 
     mocked_send_finished.assert_not_called()
     mocked_create_output_checking_request.assert_not_called()
@@ -457,7 +775,7 @@ def test_jobapiupdate_post_job_request_error(api_rf):
     request = api_rf.post(
         "/", headers={"authorization": backend.auth_token}, data=data, format="json"
     )
-    response = JobAPIUpdate.as_view(get_github_api=FakeGitHubAPI)(request)
+    response = JobAPIUpdate.as_view()(request)
 
     assert response.status_code == 200, response.data
     assert Job.objects.count() == 1
@@ -468,27 +786,19 @@ def test_jobapiupdate_post_only(api_rf):
 
     # GET
     request = api_rf.get("/", headers={"authorization": backend.auth_token})
-    assert (
-        JobAPIUpdate.as_view(get_github_api=FakeGitHubAPI)(request).status_code == 405
-    )
+    assert JobAPIUpdate.as_view()(request).status_code == 405
 
     # HEAD
     request = api_rf.head("/", headers={"authorization": backend.auth_token})
-    assert (
-        JobAPIUpdate.as_view(get_github_api=FakeGitHubAPI)(request).status_code == 405
-    )
+    assert JobAPIUpdate.as_view()(request).status_code == 405
 
     # PATCH
     request = api_rf.patch("/", headers={"authorization": backend.auth_token})
-    assert (
-        JobAPIUpdate.as_view(get_github_api=FakeGitHubAPI)(request).status_code == 405
-    )
+    assert JobAPIUpdate.as_view()(request).status_code == 405
 
     # PUT
     request = api_rf.put("/", headers={"authorization": backend.auth_token})
-    assert (
-        JobAPIUpdate.as_view(get_github_api=FakeGitHubAPI)(request).status_code == 405
-    )
+    assert JobAPIUpdate.as_view()(request).status_code == 405
 
 
 @pytest.mark.parametrize(
@@ -523,14 +833,14 @@ def test_jobapiupdate_post_with_errors(api_rf, mocker, error_message):
     request_1 = api_rf.post(
         "/", headers={"authorization": backend.auth_token}, data=data, format="json"
     )
-    JobAPIUpdate.as_view(get_github_api=FakeGitHubAPI)(request_1)
+    JobAPIUpdate.as_view()(request_1)
 
     data[0]["status"] = "failed"
     data[0]["status_message"] = error_message
     request_2 = api_rf.post(
         "/", headers={"authorization": backend.auth_token}, data=data, format="json"
     )
-    response = JobAPIUpdate.as_view(get_github_api=FakeGitHubAPI)(request_2)
+    response = JobAPIUpdate.as_view()(request_2)
 
     assert response.status_code == 200, response.data
 
@@ -575,7 +885,7 @@ def test_jobapiupdate_post_with_flags(api_rf):
             "flags": flags,
         },
     )
-    response = JobAPIUpdate.as_view(get_github_api=FakeGitHubAPI)(request)
+    response = JobAPIUpdate.as_view()(request)
 
     assert response.status_code == 200, response.data
     assert Job.objects.count() == 1
@@ -616,7 +926,7 @@ def test_jobapiupdate_post_with_failed_job_request_from_interactive(
         format="json",
     )
 
-    response = JobAPIUpdate.as_view(get_github_api=FakeGitHubAPI)(request)
+    response = JobAPIUpdate.as_view()(request)
 
     assert response.status_code == 200
 
@@ -661,7 +971,7 @@ def test_jobapiupdate_post_with_successful_job_request_from_interactive(api_rf,
         format="json",
     )
 
-    response = JobAPIUpdate.as_view(get_github_api=lambda: mocked_api)(request)
+    response = JobAPIUpdate.as_view()(request)
 
     assert response.status_code == 200
     mocked_api.create_issue.assert_called_once()
@@ -692,13 +1002,222 @@ def test_jobapiupdate_unknown_job_request(api_rf):
     request = api_rf.post(
         "/", headers={"authorization": backend.auth_token}, data=data, format="json"
     )
-    response = JobAPIUpdate.as_view(get_github_api=FakeGitHubAPI)(request)
+    response = JobAPIUpdate.as_view()(request)
 
     # Jobs associated with unknown requests should be ignored
     assert response.status_code == 200, response.data
     assert not Job.objects.exists()
 
 
+def test_jobrequestapilist_etag_changes_with_job_requests(api_rf):
+    backend = BackendFactory()
+    job_request = JobRequestFactory(backend=backend)
+
+    def get_etag():
+        backend.refresh_from_db()
+        request = api_rf.get("/", headers={"authorization": backend.auth_token})
+        return JobRequestAPIList.as_view()(request).headers["ETag"]
+
+    etag = get_etag()
+
+    # fields the list doesn't use don't change the ETag
+    job_request.last_updated_at = timezone.now()
+    job_request.save(update_fields=["last_updated_at"])
+    assert get_etag() == etag
+
+    job_request.request_cancellation()
+    assert get_etag() != etag
+
+    etag = get_etag()
+    JobRequestFactory(backend=backend)
+    assert get_etag() != etag
+
+
+def assert_modified(api_rf, backend, change):
+    headers = {"authorization": backend.auth_token}
+    backend.refresh_from_db()
+    response = JobRequestAPIList.as_view()(api_rf.get("/", headers=headers))
+    etag = response.headers["ETag"]
+
+    change()
+
+    request = api_rf.get("/", headers={**headers, "if-none-match": etag})
+    response = JobRequestAPIList.as_view()(request)
+
+    assert response.status_code == 200
+    return response
+
+
+def test_jobrequestapilist_modified_by_deleting_job_request(api_rf):
+    job_request = JobRequestFactory()
+
+    response = assert_modified(api_rf, job_request.backend, job_request.delete)
+
+    assert response.data["results"] == []
+
+
+def test_jobrequestapilist_modified_by_deleting_workspace(api_rf):
+    job_request = JobRequestFactory()
+
+    response = assert_modified(
+        api_rf, job_request.backend, job_request.workspace.delete
+    )
+
+    assert response.data["results"] == []
+
+
+def test_jobrequestapilist_modified_by_workspace_change(api_rf):
+    job_request = JobRequestFactory()
+    workspace = job_request.workspace
+
+    def change():
+        workspace.branch = "new-branch"
+        workspace.save(update_fields=["branch"])
+
+    response = assert_modified(api_rf, job_request.backend, change)
+
+    assert response.data["results"][0]["workspace"]["branch"] == "new-branch"
+
+
+def test_jobrequestapilist_modified_by_project_change(api_rf):
+    job_request = JobRequestFactory()
+    project = job_request.workspace.project
+
+    def change():
+        project.slug = "new-slug"
+        project.save()
+
+    response = assert_modified(api_rf, job_request.backend, change)
+
+    assert response.data["results"][0]["project"] == "new-slug"
+
+
+def test_jobrequestapilist_modified_by_org_change(api_rf):
+    job_request = JobRequestFactory()
+    org = OrgFactory()
+    ProjectCollaborationFactory(org=org, project=job_request.workspace.project)
+
+    def change():
+        org.slug = "new-slug"
+        org.save(update_fields=["slug"])
+
+    response = assert_modified(api_rf, job_request.backend, change)
+
+    assert response.data["results"][0]["orgs"] == ["new-slug"]
+
+
+def test_jobrequestapilist_modified_by_adding_org(api_rf):
+    job_request = JobRequestFactory()
+    org = OrgFactory(slug="added")
+
+    def change():
+        ProjectCollaborationFactory(org=org, project=job_request.workspace.project)
+
+    response = assert_modified(api_rf, job_request.backend, change)
+
+    assert response.data["results"][0]["orgs"] == ["added"]
+
+
+def test_jobrequestapilist_etag_varies_by_query_string(api_rf):
+    backend = BackendFactory()
+    headers = {"authorization": backend.auth_token}
+
+    first = JobRequestAPIList.as_view()(api_rf.get("/?limit=1", headers=headers))
+    second = JobRequestAPIList.as_view()(api_rf.get("/?limit=2", headers=headers))
+
+    assert first.headers["ETag"] != second.headers["ETag"]
+
+
+def test_jobrequestapilist_not_modified(api_rf, django_assert_num_queries):
+    backend = BackendFactory()
+    JobRequestFactory(backend=backend)
+    StatsFactory(backend=backend, url="/")
+
+    request = api_rf.get("/", headers={"authorization": backend.auth_token})
+    etag = JobRequestAPIList.as_view()(request).headers["ETag"]
+
+    request = api_rf.get(
+        "/",
+        headers={"authorization": backend.auth_token, "if-none-match": etag},
+    )
+    # 1. refresh the cached backend's job_requests_version
+    # 2. record its Stats
+    with django_assert_num_queries(2):
+        response = JobRequestAPIList.as_view()(request)
+
+    assert response.status_code == 304
+
+
+def test_jobrequestapilist_unauthenticated_has_no_etag(api_rf):
+    response = JobRequestAPIList.as_view()(api_rf.get("/"))
+
+    assert response.status_code == 200
+    assert "ETag" not in response.headers
+
+
+@pytest.mark.django_db(transaction=True)
+def test_jobrequestapilist_long_poll_returns_changes(api_rf, job_request_listener):
+    backend = BackendFactory()
+    headers = {"authorization": backend.auth_token}
+
+    response = JobRequestAPIList.as_view()(api_rf.get("/", headers=headers))
+    etag = response.headers["ETag"]
+
+    def create_job_request():
+        JobRequestFactory(backend=backend)
+        connection.close()
+
+    # create a JobRequest once the poll has started waiting
+    timer = threading.Timer(0.5, create_job_request)
+    timer.start()
+
+    request = api_rf.get("/?wait=10", headers={**headers, "if-none-match": etag})
+    response = JobRequestAPIList.as_view()(request)
+    timer.join()
+
+    assert response.status_code == 200
+    assert len(response.data["results"]) == 1
+    assert response.headers["ETag"] != etag
+
+
+@pytest.mark.django_db(transaction=True)
+def test_jobrequestapilist_long_poll_times_out(api_rf, job_request_listener):
+    backend = BackendFactory()
+    headers = {"authorization": backend.auth_token}
+
+    response = JobRequestAPIList.as_view()(api_rf.get("/", headers=headers))
+    etag = response.headers["ETag"]
+
+    request = api_rf.get("/?wait=0.5", headers={**headers, "if-none-match": etag})
+    response = JobRequestAPIList.as_view()(request)
+
+    assert response.status_code == 304
+
+
+def test_jobrequestapilist_long_poll_with_stale_etag(api_rf, job_request_listener):
+    backend = BackendFactory()
+    JobRequestFactory(backend=backend)
+
+    request = api_rf.get(
+        "/?wait=10",
+        headers={"authorization": backend.auth_token, "if-none-match": '"stale"'},
+    )
+    response = JobRequestAPIList.as_view()(request)
+
+    assert response.status_code == 200
+    assert len(response.data["results"]) == 1
+
+
+def test_jobrequestapilist_long_poll_with_invalid_wait(api_rf):
+    backend = BackendFactory()
+
+    request = api_rf.get("/?wait=soon", headers={"authorization": backend.auth_token})
+    response = JobRequestAPIList.as_view()(request)
+
+    assert response.status_code == 400
+    assert response.data == {"wait": "Must be a number of seconds"}
+
+
 def test_jobrequestapilist_filter_by_backend(api_rf):
     backend = BackendFactory()
     JobRequestFactory(backend=backend)
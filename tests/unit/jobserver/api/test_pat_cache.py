@@ -0,0 +1,77 @@
+from datetime import timedelta
+
+from jobserver.api.pat_cache import UserPATCache
+
+from ....factories import UserFactory
+
+
+def test_userpatcache_hit_and_miss():
+    user = UserFactory()
+    token = user.rotate_token()
+    cache = UserPATCache()
+
+    assert not cache.verified(token, user)
+
+    cache.set(token, user)
+
+    assert cache.verified(token, user)
+    assert (cache.hits, cache.misses) == (1, 1)
+
+
+def test_userpatcache_does_not_store_tokens():
+    user = UserFactory()
+    token = user.rotate_token()
+    cache = UserPATCache()
+
+    cache.set(token, user)
+
+    assert token not in cache._entries
+
+
+def test_userpatcache_expires(freezer, settings):
+    settings.USER_PAT_CACHE_TTL = 10
+    user = UserFactory()
+    token = user.rotate_token()
+    cache = UserPATCache()
+
+    cache.set(token, user)
+
+    freezer.tick(timedelta(seconds=9))
+    assert cache.verified(token, user)
+
+    freezer.tick(timedelta(seconds=2))
+    assert not cache.verified(token, user)
+
+
+def test_userpatcache_with_another_user():
+    user = UserFactory()
+    token = user.rotate_token()
+    cache = UserPATCache()
+
+    cache.set(token, user)
+
+    assert not cache.verified(token, UserFactory())
+
+
+def test_userpatcache_with_rotated_token():
+    user = UserFactory()
+    token = user.rotate_token()
+    cache = UserPATCache()
+
+    cache.set(token, user)
+
+    # rotating elsewhere changes the hash we load for the user
+    user.pat_token = "new hash"
+
+    assert not cache.verified(token, user)
+
+
+def test_userpatcache_disabled(settings):
+    settings.USER_PAT_CACHE_TTL = 0
+    user = UserFactory()
+    token = user.rotate_token()
+    cache = UserPATCache()
+
+    cache.set(token, user)
+
+    assert not cache.verified(token, user)
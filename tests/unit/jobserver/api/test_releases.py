@@ -1,23 +1,33 @@
+import hashlib
+import io
 import json
 import random
 import string
+import tarfile
 
 import pytest
 from django.contrib.auth.models import AnonymousUser
+from django.core.files.uploadedfile import SimpleUploadedFile
 from django.utils import timezone
-from rest_framework.exceptions import NotAuthenticated, PermissionDenied
+from rest_framework.exceptions import NotAuthenticated, ParseError, PermissionDenied
 
+from jobserver import outbox, releases
 from jobserver.api.releases import (
     Level4AuthorisationAPI,
     Level4TokenAuthenticationAPI,
     ReleaseAPI,
+    ReleaseBatchUploadAPI,
     ReleaseFileAPI,
     ReleaseNotificationAPICreate,
+    ReleaseUploadAPI,
+    ReleaseUploadSessionAPI,
     ReleaseWorkspaceAPI,
+    RequestTooLarge,
     ReviewAPI,
     SnapshotAPI,
     SnapshotCreateAPI,
     SnapshotPublishAPI,
+    TarParser,
     WorkspaceStatusAPI,
     is_interactive_report,
     validate_release_access,
@@ -26,11 +36,14 @@ from jobserver.api.releases import (
 from jobserver.authorization import (
     OutputChecker,
     ProjectCollaborator,
+    ProjectDeveloper,
     StaffAreaAdministrator,
     permissions,
 )
+from jobserver.commands import project_members
 from jobserver.commands.users import generate_login_token
 from jobserver.models import (
+    OutboxMessage,
     Project,
     PublishRequest,
     Release,
@@ -137,6 +150,28 @@ def test_releaseapi_get_with_permission(
     }
 
 
+def test_releaseapi_get_not_modified(
+    api_rf, build_release_with_files, project_membership
+):
+    release = build_release_with_files(["file.txt"])
+    project_membership(
+        user=release.created_by,
+        project=release.workspace.project,
+        roles=[ProjectCollaborator],
+    )
+
+    request = api_rf.get("/")
+    request.user = release.created_by
+    etag = ReleaseAPI.as_view()(request, release_id=release.id)["ETag"]
+
+    request = api_rf.get("/", headers={"if-none-match": etag})
+    request.user = release.created_by
+    response = ReleaseAPI.as_view()(request, release_id=release.id)
+
+    assert response.status_code == 304
+    assert response["ETag"] == etag
+
+
 def test_releaseapi_get_without_permission(api_rf):
     release = ReleaseFactory()
 
@@ -325,6 +360,39 @@ def test_releaseapi_post_success(api_rf, slack_messages, build_release, file_con
     assert release.backend.name in text
 
 
+def test_releaseapi_post_success_with_outbox_enabled(
+    api_rf, settings, slack_messages, build_release, file_content
+):
+    settings.OUTBOX_ENABLED = True
+
+    uploading_user = UserFactory(roles=[OutputChecker])
+    release = build_release(["file.txt"])
+    BackendMembershipFactory(backend=release.backend, user=uploading_user)
+
+    request = api_rf.post(
+        "/",
+        content_type="application/octet-stream",
+        data=file_content,
+        headers={
+            "content-disposition": "attachment; filename=file.txt",
+            "authorization": release.backend.auth_token,
+            "os-user": uploading_user.username,
+        },
+    )
+
+    response = ReleaseAPI.as_view()(request, release_id=release.id)
+
+    assert response.status_code == 201, response.data
+
+    # the Slack notification is queued rather than sent
+    assert len(slack_messages) == 0
+    message = OutboxMessage.objects.get()
+    assert message.task == "jobserver.slacks.notify_release_file_uploaded"
+
+    outbox.deliver(message)
+    assert len(slack_messages) == 1
+
+
 def test_releaseapi_post_success_for_analysis_request(
     api_rf, slack_messages, build_release, file_content
 ):
@@ -519,6 +587,545 @@ def test_releaseapi_post_with_no_backend_token(api_rf):
     assert response.status_code == 403
 
 
+@pytest.fixture
+def batch_release(build_release):
+    """A Release waiting for its files, and the headers to upload them with"""
+    user = UserFactory(roles=[OutputChecker])
+    release = build_release(["output/a.txt", "output/b.txt"])
+    BackendMembershipFactory(backend=release.backend, user=user)
+
+    headers = {
+        "authorization": release.backend.auth_token,
+        "os-user": user.username,
+    }
+    return release, headers
+
+
+def build_tar(files, mode="w"):
+    buf = io.BytesIO()
+    with tarfile.open(fileobj=buf, mode=mode) as tar:
+        for name, content in files.items():
+            info = tarfile.TarInfo(name)
+            info.size = len(content)
+            tar.addfile(info, io.BytesIO(content))
+    return buf.getvalue()
+
+
+def test_releasebatchuploadapi_multipart(api_rf, batch_release, slack_messages):
+    release, headers = batch_release
+
+    request = api_rf.post(
+        "/",
+        data={
+            "output/a.txt": SimpleUploadedFile("a.txt", b"a"),
+            "output/b.txt": SimpleUploadedFile("b.txt", b"b"),
+        },
+        format="multipart",
+        headers=headers,
+    )
+    response = ReleaseBatchUploadAPI.as_view()(request, release_id=release.id)
+
+    assert response.status_code == 201, response.data
+    assert [f["name"] for f in response.data["files"]] == [
+        "output/a.txt",
+        "output/b.txt",
+    ]
+    a = release.files.get(name="output/a.txt")
+    assert a.absolute_path().read_bytes() == b"a"
+    assert response.data["files"][0]["url"].endswith(f"/releases/file/{a.id}")
+
+    # one notification for the whole batch
+    assert len(slack_messages) == 1
+    text, channel = slack_messages[0]
+    assert "uploaded 2 files" in text
+    assert "`output/a.txt`" in text
+    assert "`output/b.txt`" in text
+
+
+@pytest.mark.parametrize("mode", ["w", "w:gz"])
+def test_releasebatchuploadapi_tar(api_rf, batch_release, slack_messages, mode):
+    release, headers = batch_release
+    data = build_tar({"./output/a.txt": b"a", "output/b.txt": b"b"}, mode=mode)
+
+    request = api_rf.post(
+        "/", data=data, content_type="application/x-tar", headers=headers
+    )
+    response = ReleaseBatchUploadAPI.as_view()(request, release_id=release.id)
+
+    assert response.status_code == 201, response.data
+    assert release.files.get(name="output/a.txt").absolute_path().read_bytes() == b"a"
+    assert release.files.get(name="output/b.txt").absolute_path().read_bytes() == b"b"
+
+
+def test_releasebatchuploadapi_tar_too_large(
+    api_rf, batch_release, settings, slack_messages
+):
+    settings.RELEASE_FILE_SIZE_LIMIT = 1
+    release, headers = batch_release
+
+    # a tar of files at the limit is fine
+    data = build_tar({"output/a.txt": b"a", "output/b.txt": b"b"})
+    request = api_rf.post(
+        "/", data=data, content_type="application/x-tar", headers=headers
+    )
+    response = ReleaseBatchUploadAPI.as_view()(request, release_id=release.id)
+    assert response.status_code == 201, response.data
+
+    # but one which is bigger than every requested file could be is not
+    data = build_tar({"output/a.txt": b"a" * 20_000})
+    request = api_rf.post(
+        "/", data=data, content_type="application/x-tar", headers=headers
+    )
+    response = ReleaseBatchUploadAPI.as_view()(request, release_id=release.id)
+    assert response.status_code == 413
+
+
+def test_releasebatchuploadapi_multipart_too_large(api_rf, batch_release, settings):
+    settings.RELEASE_FILE_SIZE_LIMIT = 1
+    release, headers = batch_release
+
+    request = api_rf.post(
+        "/",
+        data={"output/a.txt": SimpleUploadedFile("a.txt", b"a" * 20_000)},
+        format="multipart",
+        headers=headers,
+    )
+    response = ReleaseBatchUploadAPI.as_view()(request, release_id=release.id)
+
+    assert response.status_code == 413
+    assert not release.files.filter(uploaded_at__isnull=False).exists()
+
+
+def test_releasebatchuploadapi_without_content_length(api_rf, batch_release):
+    release, headers = batch_release
+
+    request = api_rf.post(
+        "/",
+        data=build_tar({"output/a.txt": b"a"}),
+        content_type="application/x-tar",
+        headers=headers,
+    )
+    del request.META["CONTENT_LENGTH"]
+    response = ReleaseBatchUploadAPI.as_view()(request, release_id=release.id)
+
+    assert response.status_code == 413
+
+
+def test_releasebatchuploadapi_some_files_fail(
+    api_rf, batch_release, slack_messages, file_content
+):
+    release, headers = batch_release
+    ReleaseFileFactory(
+        release=release,
+        name="output/b.txt",
+        filehash=hashlib.sha256(file_content).hexdigest(),
+        size=len(file_content),
+        uploaded_at=None,
+    )
+
+    request = api_rf.post(
+        "/",
+        data={
+            "output/a.txt": SimpleUploadedFile("a.txt", b"a"),
+            "output/b.txt": SimpleUploadedFile("b.txt", b"not the reviewed file"),
+        },
+        format="multipart",
+        headers=headers,
+    )
+    response = ReleaseBatchUploadAPI.as_view()(request, release_id=release.id)
+
+    assert response.status_code == 400
+    assert [f["name"] for f in response.data["files"]] == ["output/a.txt"]
+    assert list(response.data["errors"]) == ["output/b.txt"]
+    assert release.files.get(name="output/a.txt").uploaded_at
+
+
+def test_releasebatchuploadapi_all_files_fail(
+    api_rf, batch_release, slack_messages, file_content
+):
+    release, headers = batch_release
+    ReleaseFileFactory(
+        release=release,
+        name="output/a.txt",
+        filehash=hashlib.sha256(file_content).hexdigest(),
+        size=len(file_content),
+        uploaded_at=None,
+    )
+
+    request = api_rf.post(
+        "/",
+        data={"output/a.txt": SimpleUploadedFile("a.txt", b"not the reviewed file")},
+        format="multipart",
+        headers=headers,
+    )
+    response = ReleaseBatchUploadAPI.as_view()(request, release_id=release.id)
+
+    assert response.status_code == 400
+    assert response.data["files"] == []
+    assert slack_messages == []
+
+
+@pytest.mark.parametrize(
+    "files,error",
+    [
+        ({"output/c.txt": b"c"}, "not requested"),
+        ({"output/a.txt": b"a" * 10}, "too large"),
+    ],
+)
+def test_releasebatchuploadapi_invalid_files(
+    api_rf, batch_release, settings, files, error
+):
+    settings.RELEASE_FILE_SIZE_LIMIT = 5
+    release, headers = batch_release
+
+    request = api_rf.post(
+        "/",
+        data=build_tar(files | {"output/b.txt": b"b"}),
+        content_type="application/x-tar",
+        headers=headers,
+    )
+    response = ReleaseBatchUploadAPI.as_view()(request, release_id=release.id)
+
+    # nothing is stored unless every file is valid
+    assert response.status_code == 400
+    (name,) = files
+    assert error in response.data["errors"][name]
+    assert not release.files.exists()
+
+
+def test_releasebatchuploadapi_duplicate_files(api_rf, batch_release):
+    release, headers = batch_release
+
+    buf = io.BytesIO()
+    with tarfile.open(fileobj=buf, mode="w") as tar:
+        for content in [b"a", b"b"]:
+            info = tarfile.TarInfo("output/a.txt")
+            info.size = len(content)
+            tar.addfile(info, io.BytesIO(content))
+
+    request = api_rf.post(
+        "/", data=buf.getvalue(), content_type="application/x-tar", headers=headers
+    )
+    response = ReleaseBatchUploadAPI.as_view()(request, release_id=release.id)
+
+    assert response.status_code == 400
+    assert "more than once" in response.data["errors"]["output/a.txt"]
+
+
+def test_releasebatchuploadapi_no_files(api_rf, batch_release):
+    release, headers = batch_release
+
+    request = api_rf.post("/", data={}, format="multipart", headers=headers)
+    response = ReleaseBatchUploadAPI.as_view()(request, release_id=release.id)
+
+    assert response.status_code == 400
+    assert "No data" in response.data["detail"]
+
+
+def test_releasebatchuploadapi_bad_backend_token(api_rf, batch_release):
+    release, _ = batch_release
+
+    request = api_rf.post("/", headers={"authorization": "invalid"})
+    response = ReleaseBatchUploadAPI.as_view()(request, release_id=release.id)
+
+    assert response.status_code == 403
+
+
+def test_tarparser_skips_directories():
+    buf = io.BytesIO()
+    with tarfile.open(fileobj=buf, mode="w") as tar:
+        info = tarfile.TarInfo("output")
+        info.type = tarfile.DIRTYPE
+        tar.addfile(info)
+    buf.seek(0)
+
+    assert not TarParser().parse(buf).files
+
+
+def test_tarparser_rejects_links():
+    buf = io.BytesIO()
+    with tarfile.open(fileobj=buf, mode="w") as tar:
+        info = tarfile.TarInfo("output/link")
+        info.type = tarfile.SYMTYPE
+        info.linkname = "/etc/passwd"
+        tar.addfile(info)
+    buf.seek(0)
+
+    with pytest.raises(ParseError, match="not a regular file"):
+        TarParser().parse(buf)
+
+
+def test_tarparser_max_upload_size():
+    class View:
+        max_upload_size = 10
+
+    with pytest.raises(RequestTooLarge):
+        TarParser().parse(io.BytesIO(b"a" * 11), parser_context={"view": View()})
+
+
+@pytest.mark.parametrize("stream", [None, io.BytesIO(b"not a tar")])
+def test_tarparser_invalid(stream):
+    with pytest.raises(ParseError):
+        TarParser().parse(stream)
+
+
+@pytest.fixture
+def pending_upload(build_release, file_content):
+    """A ReleaseFile waiting to be uploaded, and the headers to upload it with"""
+    user = UserFactory(roles=[OutputChecker])
+    release = build_release(["output/file.txt"])
+    BackendMembershipFactory(backend=release.backend, user=user)
+
+    rfile = ReleaseFileFactory(
+        release=release,
+        name="output/file.txt",
+        filehash=hashlib.sha256(file_content).hexdigest(),
+        size=len(file_content),
+        uploaded_at=None,
+    )
+    headers = {
+        "authorization": release.backend.auth_token,
+        "os-user": user.username,
+    }
+    return rfile, headers
+
+
+def put_chunk(api_rf, rfile, headers, chunk, start, **extra):
+    request = api_rf.put(
+        "/",
+        data=chunk,
+        content_type="application/octet-stream",
+        headers=headers
+        | {
+            "content-range": f"bytes {start}-{start + len(chunk) - 1}/{rfile.size}",
+            "chunk-sha256": hashlib.sha256(chunk).hexdigest(),
+        }
+        | extra,
+    )
+    return ReleaseUploadSessionAPI.as_view()(request, file_id=rfile.id)
+
+
+def test_releaseuploadapi_success(api_rf, pending_upload, slack_messages, file_content):
+    rfile, headers = pending_upload
+
+    request = api_rf.post(
+        "/",
+        headers=headers
+        | {"content-disposition": "attachment; filename=output/file.txt"},
+    )
+    response = ReleaseUploadAPI.as_view()(request, release_id=rfile.release.id)
+
+    assert response.status_code == 201, response.data
+    assert response.headers["Location"].endswith(f"/releases/upload/{rfile.id}")
+    assert response.headers["File-Id"] == rfile.id
+    assert response.headers["Upload-Offset"] == "0"
+
+    for start in range(0, rfile.size, 4):
+        response = put_chunk(
+            api_rf, rfile, headers, file_content[start : start + 4], start
+        )
+        assert response.status_code == 200, response.data
+
+    request = api_rf.get("/", headers=headers)
+    response = ReleaseUploadSessionAPI.as_view()(request, file_id=rfile.id)
+    assert response.status_code == 200
+    assert response.headers["Upload-Offset"] == str(rfile.size)
+
+    request = api_rf.post("/", headers=headers)
+    response = ReleaseUploadSessionAPI.as_view()(request, file_id=rfile.id)
+
+    assert response.status_code == 201, response.data
+    assert response.headers["Location"].endswith(f"/releases/file/{rfile.id}")
+    rfile.refresh_from_db()
+    assert rfile.uploaded_at
+    assert rfile.absolute_path().read_bytes() == file_content
+    assert len(slack_messages) == 1
+
+
+def test_releaseuploadapi_already_uploaded(api_rf, pending_upload):
+    rfile, headers = pending_upload
+    rfile.uploaded_at = timezone.now()
+    rfile.save()
+
+    request = api_rf.post(
+        "/",
+        headers=headers
+        | {"content-disposition": "attachment; filename=output/file.txt"},
+    )
+    response = ReleaseUploadAPI.as_view()(request, release_id=rfile.release.id)
+
+    assert response.status_code == 400
+    assert "already been uploaded" in response.data["detail"]
+
+
+def test_releaseuploadapi_bad_filename(api_rf, pending_upload):
+    rfile, headers = pending_upload
+
+    request = api_rf.post(
+        "/", headers=headers | {"content-disposition": "attachment; filename=wrong.txt"}
+    )
+    response = ReleaseUploadAPI.as_view()(request, release_id=rfile.release.id)
+
+    assert response.status_code == 400
+    assert "wrong.txt" in response.data["detail"]
+
+
+def test_releaseuploadapi_no_filename(api_rf, pending_upload):
+    rfile, headers = pending_upload
+
+    request = api_rf.post("/", headers=headers)
+    response = ReleaseUploadAPI.as_view()(request, release_id=rfile.release.id)
+
+    assert response.status_code == 400
+    assert "Content-Disposition" in response.data["detail"]
+
+
+def test_releaseuploadapi_bad_backend(api_rf, pending_upload):
+    rfile, headers = pending_upload
+    user = UserFactory(roles=[OutputChecker])
+    backend = BackendFactory()
+    BackendMembershipFactory(backend=backend, user=user)
+
+    request = api_rf.post(
+        "/",
+        headers={
+            "authorization": backend.auth_token,
+            "os-user": user.username,
+            "content-disposition": "attachment; filename=output/file.txt",
+        },
+    )
+    response = ReleaseUploadAPI.as_view()(request, release_id=rfile.release.id)
+
+    assert response.status_code == 400
+    assert backend.slug in response.data["detail"]
+
+
+def test_releaseuploadsessionapi_bad_backend_token(api_rf, pending_upload):
+    rfile, _ = pending_upload
+
+    request = api_rf.get("/", headers={"authorization": "invalid"})
+    response = ReleaseUploadSessionAPI.as_view()(request, file_id=rfile.id)
+
+    assert response.status_code == 403
+
+
+def test_releaseuploadsessionapi_unknown_file(api_rf):
+    request = api_rf.get("/")
+    response = ReleaseUploadSessionAPI.as_view()(request, file_id="unknown")
+
+    assert response.status_code == 404
+
+
+def test_releaseuploadsessionapi_get_not_started(api_rf, pending_upload):
+    rfile, headers = pending_upload
+
+    request = api_rf.get("/", headers=headers)
+    response = ReleaseUploadSessionAPI.as_view()(request, file_id=rfile.id)
+
+    assert response.status_code == 404
+
+
+def test_releaseuploadsessionapi_put_not_started(api_rf, pending_upload):
+    rfile, headers = pending_upload
+
+    response = put_chunk(api_rf, rfile, headers, b"abcd", 0)
+
+    assert response.status_code == 404
+
+
+def test_releaseuploadsessionapi_put_wrong_offset(api_rf, pending_upload):
+    rfile, headers = pending_upload
+    releases.start_upload(rfile)
+
+    response = put_chunk(api_rf, rfile, headers, b"abcd", 4)
+
+    assert response.status_code == 409
+    assert response.headers["Upload-Offset"] == "0"
+
+
+def test_releaseuploadsessionapi_put_checksum_mismatch(api_rf, pending_upload):
+    rfile, headers = pending_upload
+    releases.start_upload(rfile)
+
+    response = put_chunk(
+        api_rf, rfile, headers, b"abcd", 0, **{"chunk-sha256": "0" * 64}
+    )
+
+    assert response.status_code == 400
+    assert "sha256" in response.data["detail"]
+
+
+def test_releaseuploadsessionapi_put_empty_body(api_rf, pending_upload):
+    rfile, headers = pending_upload
+    releases.start_upload(rfile)
+
+    response = put_chunk(
+        api_rf, rfile, headers, b"", 0, **{"content-range": f"bytes 0-3/{rfile.size}"}
+    )
+
+    assert response.status_code == 400
+
+
+def test_releaseuploadsessionapi_put_without_checksum(api_rf, pending_upload):
+    rfile, headers = pending_upload
+    releases.start_upload(rfile)
+
+    response = put_chunk(api_rf, rfile, headers, b"abcd", 0, **{"chunk-sha256": ""})
+
+    assert response.status_code == 400
+    assert "Chunk-Sha256" in response.data["detail"]
+
+
+@pytest.mark.parametrize(
+    "content_range",
+    ["", "bytes 0-3", "bytes 0-3/*", "bytes 3-0/10", "bytes 8-11/10", "bytes 0-3/11"],
+)
+def test_releaseuploadsessionapi_put_bad_content_range(
+    api_rf, pending_upload, content_range
+):
+    rfile, headers = pending_upload
+    releases.start_upload(rfile)
+
+    response = put_chunk(
+        api_rf, rfile, headers, b"abcd", 0, **{"content-range": content_range}
+    )
+
+    assert response.status_code == 400
+    assert "Content-Range" in response.data["detail"]
+
+
+def test_releaseuploadsessionapi_put_too_large(api_rf, pending_upload, settings):
+    settings.RELEASE_FILE_SIZE_LIMIT = 2
+    rfile, headers = pending_upload
+    releases.start_upload(rfile)
+
+    response = put_chunk(api_rf, rfile, headers, b"abcd", 0)
+
+    assert response.status_code == 400
+    assert "too large" in response.data[0]
+
+
+def test_releaseuploadsessionapi_post_not_started(api_rf, pending_upload):
+    rfile, headers = pending_upload
+
+    request = api_rf.post("/", headers=headers)
+    response = ReleaseUploadSessionAPI.as_view()(request, file_id=rfile.id)
+
+    assert response.status_code == 404
+
+
+def test_releaseuploadsessionapi_post_hash_mismatch(api_rf, pending_upload):
+    rfile, headers = pending_upload
+    releases.start_upload(rfile)
+    put_chunk(api_rf, rfile, headers, b"abcd", 0)
+
+    request = api_rf.post("/", headers=headers)
+    response = ReleaseUploadSessionAPI.as_view()(request, file_id=rfile.id)
+
+    assert response.status_code == 400
+    assert "does not match" in response.data["detail"]
+
+
 def test_releasenotificationapicreate_success(api_rf, slack_messages):
     backend = BackendFactory(name="test")
 
@@ -649,6 +1256,112 @@ def test_releaseworkspaceapi_get_with_permission(
     }
 
 
+def test_releaseworkspaceapi_get_cached(
+    api_rf, build_release_with_files, django_assert_num_queries, project_membership
+):
+    release = build_release_with_files(["file1.txt", "file2.txt"])
+    workspace = release.workspace
+    project_membership(
+        user=release.created_by, project=workspace.project, roles=[ProjectCollaborator]
+    )
+
+    def get():
+        request = api_rf.get("/")
+        request.user = release.created_by
+        return ReleaseWorkspaceAPI.as_view(get_github_api=FakeGitHubAPI)(
+            request, workspace_name=workspace.name
+        )
+
+    first = get()
+    assert first.status_code == 200
+    assert len(first.data["files"]) == 2
+
+    # workspace, then the permission checks, but not the files
+    with django_assert_num_queries(3):
+        second = get()
+
+    assert second.status_code == 200
+    assert second.data == first.data
+    assert second["ETag"] == first["ETag"]
+
+
+def test_releaseworkspaceapi_get_invalidated_by_changes(
+    api_rf, build_release_with_files, project_membership
+):
+    release = build_release_with_files(["file1.txt"])
+    workspace = release.workspace
+    project_membership(
+        user=release.created_by, project=workspace.project, roles=[ProjectCollaborator]
+    )
+
+    def get():
+        request = api_rf.get("/")
+        request.user = release.created_by
+        return ReleaseWorkspaceAPI.as_view(get_github_api=FakeGitHubAPI)(
+            request, workspace_name=workspace.name
+        )
+
+    first = get()
+
+    # a new file
+    rfile = ReleaseFileFactory(release=release, workspace=workspace, name="new.txt")
+    second = get()
+    assert second["ETag"] != first["ETag"]
+    assert {f["name"] for f in second.data["files"]} == {
+        f"{release.backend.slug}/file1.txt",
+        f"{release.backend.slug}/new.txt",
+    }
+
+    # a redacted file
+    rfile.deleted_at = timezone.now()
+    rfile.deleted_by = UserFactory()
+    rfile.save()
+    third = get()
+    assert third["ETag"] != second["ETag"]
+    redacted = next(f for f in third.data["files"] if f["id"] == rfile.pk)
+    assert redacted["is_deleted"]
+
+
+def test_releaseworkspaceapi_get_not_modified(api_rf, build_release_with_files):
+    release = build_release_with_files(["file1.txt"])
+    workspace = release.workspace
+    user = UserFactory(roles=[OutputChecker])
+
+    request = api_rf.get("/")
+    request.user = user
+    etag = ReleaseWorkspaceAPI.as_view(get_github_api=FakeGitHubAPI)(
+        request, workspace_name=workspace.name
+    )["ETag"]
+
+    request = api_rf.get("/", headers={"if-none-match": etag})
+    request.user = user
+    response = ReleaseWorkspaceAPI.as_view(get_github_api=FakeGitHubAPI)(
+        request, workspace_name=workspace.name
+    )
+
+    assert response.status_code == 304
+    assert response["ETag"] == etag
+
+
+def test_releaseworkspaceapi_get_queries_dont_grow_with_files(
+    api_rf, build_release_with_files, django_assert_num_queries
+):
+    release = build_release_with_files([f"file{i}.txt" for i in range(10)])
+    user = UserFactory(roles=[OutputChecker])
+
+    request = api_rf.get("/")
+    request.user = user
+
+    # workspace, its project and the user's membership of it to check
+    # permissions, then the files with everything the index needs
+    with django_assert_num_queries(4):
+        response = ReleaseWorkspaceAPI.as_view(get_github_api=FakeGitHubAPI)(
+            request, workspace_name=release.workspace.name
+        )
+
+    assert len(response.data["files"]) == 10
+
+
 def test_releaseworkspaceapi_get_without_permission(api_rf):
     workspace = WorkspaceFactory()
 
@@ -1261,6 +1974,29 @@ def test_snapshotapi_published_without_permission(api_rf):
     assert response.data == {"files": []}
 
 
+def test_snapshotapi_publishing_changes_etag(api_rf):
+    snapshot = SnapshotFactory()
+    publish_request = PublishRequestFactory(snapshot=snapshot)
+
+    def get():
+        request = api_rf.get("/")
+        request.user = UserFactory(roles=[ProjectCollaborator])
+        return SnapshotAPI.as_view()(
+            request,
+            workspace_id=snapshot.workspace.name,
+            snapshot_id=snapshot.pk,
+        )
+
+    before = get()
+
+    publish_request.decision = PublishRequest.Decisions.APPROVED
+    publish_request.decision_at = timezone.now()
+    publish_request.decision_by = UserFactory()
+    publish_request.save()
+
+    assert get()["ETag"] != before["ETag"]
+
+
 def test_snapshotapi_unpublished_with_anonymous_user(api_rf):
     snapshot = SnapshotFactory()
     PublishRequestFactory(snapshot=snapshot)
@@ -1866,6 +2602,96 @@ def test_level4authorisationapi_success(
     }
 
 
+def test_level4authorisationapi_queries_dont_grow_with_projects(
+    api_rf, django_assert_num_queries, project_membership, token_login_user
+):
+    for _ in range(5):
+        project = ProjectFactory()
+        WorkspaceFactory(project=project)
+        WorkspaceFactory(project=project)
+        project_membership(
+            user=token_login_user, project=project, roles=[ProjectDeveloper]
+        )
+
+    backend = token_login_user.backends.first()
+    request = api_rf.post(
+        "/",
+        data={"user": token_login_user.username},
+        headers={"authorization": backend.auth_token},
+        format="json",
+    )
+
+    # backend, user, social auth, backends, the workspaces, then the user's
+    # roles in their projects
+    with django_assert_num_queries(6):
+        response = Level4AuthorisationAPI.as_view()(request)
+
+    assert response.status_code == 200
+    assert len(response.data["workspaces"]) == 10
+
+
+def test_level4authorisationapi_cached(
+    api_rf, project_membership, token_login_user, role_factory
+):
+    project = ProjectFactory()
+    workspace = WorkspaceFactory(project=project)
+    project_membership(
+        user=token_login_user,
+        project=project,
+        roles=[role_factory(permission=permissions.unreleased_outputs_view)],
+    )
+    backend = token_login_user.backends.first()
+
+    def post(**headers):
+        request = api_rf.post(
+            "/",
+            data={"user": token_login_user.username},
+            headers={"authorization": backend.auth_token, **headers},
+            format="json",
+        )
+        return Level4AuthorisationAPI.as_view()(request)
+
+    first = post()
+    assert first.status_code == 200
+    assert not first.data["workspaces"][workspace.name]["archived"]
+
+    # revalidating
+    response = post(if_none_match=first["ETag"])
+    assert response.status_code == 304
+    assert response["ETag"] == first["ETag"]
+
+    # archiving a workspace
+    workspace.is_archived = True
+    workspace.save()
+    second = post(if_none_match=first["ETag"])
+    assert second.status_code == 200
+    assert second.data["workspaces"][workspace.name]["archived"]
+
+    # changing the project's status
+    project.status = Project.Statuses.RETIRED
+    project.save()
+    third = post(if_none_match=second["ETag"])
+    assert third.status_code == 200
+    assert not third.data["workspaces"][workspace.name]["project_details"]["ongoing"]
+
+    # removing the user's roles on the project
+    project_members.update_roles(
+        membership=project.memberships.get(user=token_login_user),
+        by=UserFactory(),
+        roles=[],
+    )
+    fourth = post(if_none_match=third["ETag"])
+    assert fourth.status_code == 200
+    assert fourth.data["workspaces"] == {}
+
+    # the user's own roles
+    token_login_user.roles = [OutputChecker]
+    token_login_user.save()
+    fifth = post(if_none_match=fourth["ETag"])
+    assert fifth.status_code == 200
+    assert fifth.data["output_checker"]
+
+
 def test_level4authorisationapi_bad_backend_token(api_rf, token_login_user):
     request_data = {"user": token_login_user.username}
     request = api_rf.post(
@@ -0,0 +1,115 @@
+from datetime import timedelta
+
+from django.utils import timezone
+
+from jobserver.api.token_cache import BackendTokenCache
+from jobserver.models import Backend
+
+from ....factories import BackendFactory
+
+
+def test_backendtokencache_hit_and_miss():
+    backend = BackendFactory()
+    cache = BackendTokenCache()
+
+    assert cache.get(backend.auth_token) is None
+
+    cache.set(backend.auth_token, backend)
+    cached = cache.get(backend.auth_token)
+
+    assert cached == backend
+    assert cached is not backend
+    assert (cache.hits, cache.misses) == (1, 1)
+
+
+def test_backendtokencache_does_not_store_tokens():
+    backend = BackendFactory()
+    cache = BackendTokenCache()
+
+    cache.set(backend.auth_token, backend)
+
+    assert backend.auth_token not in cache._entries
+
+
+def test_backendtokencache_expires(freezer, settings):
+    settings.BACKEND_TOKEN_CACHE_TTL = 10
+    backend = BackendFactory()
+    cache = BackendTokenCache()
+
+    cache.set(backend.auth_token, backend)
+
+    freezer.tick(timedelta(seconds=9))
+    assert cache.get(backend.auth_token) == backend
+
+    freezer.tick(timedelta(seconds=2))
+    assert cache.get(backend.auth_token) is None
+
+
+def test_backendtokencache_disabled(settings):
+    settings.BACKEND_TOKEN_CACHE_TTL = 0
+    backend = BackendFactory()
+    cache = BackendTokenCache()
+
+    cache.set(backend.auth_token, backend)
+
+    assert cache.get(backend.auth_token) is None
+
+
+def test_backendtokencache_clear():
+    backend = BackendFactory()
+    cache = BackendTokenCache()
+    cache.set(backend.auth_token, backend)
+
+    cache.clear()
+
+    assert cache.get(backend.auth_token) is None
+
+
+def test_backendtokencache_rotated_in_another_process(freezer, settings):
+    settings.BACKEND_TOKEN_CACHE_CHECK_INTERVAL = 10
+    backend = BackendFactory()
+    cache = BackendTokenCache()
+    cache.set(backend.auth_token, backend)
+
+    freezer.tick(timedelta(seconds=1))
+    # bypass Backend.save() as another process's cache would be left alone
+    Backend.objects.filter(pk=backend.pk).update(
+        auth_token="new", updated_at=timezone.now()
+    )
+
+    freezer.tick(timedelta(seconds=8))
+    assert cache.get(backend.auth_token) == backend
+
+    freezer.tick(timedelta(seconds=2))
+    assert cache.get(backend.auth_token) is None
+
+
+def test_backendtokencache_deleted_in_another_process(settings):
+    settings.BACKEND_TOKEN_CACHE_CHECK_INTERVAL = 0
+    backend = BackendFactory()
+    cache = BackendTokenCache()
+    cache.set(backend.auth_token, backend)
+
+    Backend.objects.filter(pk=backend.pk).delete()
+
+    assert cache.get(backend.auth_token) is None
+
+
+def test_backendtokencache_checks_backends_once_per_interval(
+    django_assert_num_queries, freezer, settings
+):
+    settings.BACKEND_TOKEN_CACHE_CHECK_INTERVAL = 10
+    backend1 = BackendFactory()
+    backend2 = BackendFactory()
+    cache = BackendTokenCache()
+    cache.set(backend1.auth_token, backend1)
+    cache.set(backend2.auth_token, backend2)
+
+    with django_assert_num_queries(0):
+        assert cache.get(backend1.auth_token) == backend1
+
+    freezer.tick(timedelta(seconds=11))
+
+    with django_assert_num_queries(1):
+        assert cache.get(backend1.auth_token) == backend1
+        assert cache.get(backend2.auth_token) == backend2
@@ -0,0 +1,24 @@
+from jobserver.api.ttl_cache import TTLCache
+
+
+class Cache(TTLCache):
+    key_salt = "tests.ttl_cache"
+    ttl_setting = "USER_PAT_CACHE_TTL"
+
+
+def test_ttlcache_keys_differ_by_salt():
+    class Other(Cache):
+        key_salt = "tests.ttl_cache.other"
+
+    assert Cache()._key("token") != Other()._key("token")
+
+
+def test_ttlcache_get_with_is_valid():
+    cache = Cache()
+    cache.set("token", "value")
+
+    assert cache.get("token", is_valid=lambda value: value == "other") is None
+
+    # a value which isn't valid for one caller is kept for others
+    assert cache.get("token", is_valid=lambda value: value == "value") == "value"
+    assert (cache.hits, cache.misses) == (1, 1)
@@ -1,5 +1,10 @@
 from jobserver.authorization import ProjectCollaborator, StaffAreaAdministrator
-from jobserver.authorization.mappers import get_project_roles_for_user
+from jobserver.authorization.mappers import (
+    get_project_roles_for_user,
+    get_projects_roles_for_user,
+    roles_cache,
+)
+from jobserver.commands import project_members
 
 from ....factories import (
     ProjectFactory,
@@ -18,6 +23,26 @@ def test_get_project_roles_for_user_with_roles(project_membership):
     assert roles == [ProjectCollaborator]
 
 
+def test_get_project_roles_for_user_with_cache(
+    django_assert_num_queries, project_membership
+):
+    project = ProjectFactory()
+    user = UserFactory()
+
+    membership = project_membership(
+        project=project, user=user, roles=[ProjectCollaborator]
+    )
+
+    with roles_cache():
+        with django_assert_num_queries(1):
+            assert get_project_roles_for_user(project, user) == [ProjectCollaborator]
+            assert get_project_roles_for_user(project, user) == [ProjectCollaborator]
+
+        # changing a membership clears the cache
+        project_members.update_roles(membership=membership, by=user, roles=[])
+        assert get_project_roles_for_user(project, user) == []
+
+
 def test_get_project_roles_for_user_unknown_membership():
     project = ProjectFactory()
     user = UserFactory(roles=[StaffAreaAdministrator])
@@ -33,3 +58,27 @@ def test_get_project_roles_for_user_without_roles(project_membership):
     roles = get_project_roles_for_user(project, user)
 
     assert roles == []
+
+
+def test_get_projects_roles_for_user(django_assert_num_queries, project_membership):
+    project1 = ProjectFactory()
+    project2 = ProjectFactory()
+    project3 = ProjectFactory()
+    user = UserFactory()
+
+    project_membership(project=project1, user=user, roles=[ProjectCollaborator])
+    project_membership(project=project2, user=user, roles=[])
+
+    with roles_cache():
+        with django_assert_num_queries(1):
+            roles = get_projects_roles_for_user([project1, project2, project3], user)
+
+        assert roles == {
+            project1.pk: [ProjectCollaborator],
+            project2.pk: [],
+            project3.pk: [],
+        }
+
+        # the roles were cached for single lookups too
+        with django_assert_num_queries(0):
+            assert get_project_roles_for_user(project1, user) == [ProjectCollaborator]
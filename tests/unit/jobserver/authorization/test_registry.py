@@ -0,0 +1,39 @@
+from jobserver.authorization import (
+    OutputChecker,
+    OutputPublisher,
+    ProjectDeveloper,
+    permissions,
+)
+from jobserver.authorization.registry import (
+    ROLE_PERMISSIONS,
+    ROLES_BY_MODEL,
+    ROLES_BY_NAME,
+    ROLES_BY_PATH,
+    permissions_for,
+    role_permissions,
+)
+
+
+def test_registry_lookups():
+    assert ROLES_BY_NAME["OutputChecker"] == OutputChecker
+    assert ROLES_BY_PATH["jobserver.authorization.roles.OutputChecker"] == OutputChecker
+    assert OutputChecker in ROLES_BY_MODEL["jobserver.models.user.User"]
+    assert ROLE_PERMISSIONS[OutputPublisher] == frozenset(OutputPublisher.permissions)
+
+
+def test_permissions_for():
+    output = permissions_for([OutputPublisher, ProjectDeveloper])
+
+    assert output == frozenset(OutputPublisher.permissions) | frozenset(
+        ProjectDeveloper.permissions
+    )
+
+
+def test_permissions_for_no_roles():
+    assert permissions_for([]) == frozenset()
+
+
+def test_role_permissions_with_unregistered_role(role_factory):
+    role = role_factory(permission=permissions.job_run)
+
+    assert role_permissions(role) == frozenset([permissions.job_run])
@@ -9,6 +9,7 @@ from jobserver.authorization import (
     has_permission,
     has_role,
     roles_for,
+    roles_for_projects,
     strings_to_roles,
 )
 from jobserver.models import ProjectMembership
@@ -91,6 +92,28 @@ def test_roles_for_success():
     assert output == [InteractiveReporter, ProjectCollaborator, ProjectDeveloper]
 
 
+def test_roles_for_projects(django_assert_num_queries, project_membership):
+    project1 = ProjectFactory()
+    project2 = ProjectFactory()
+    user = UserFactory(roles=[OutputPublisher])
+
+    project_membership(project=project1, user=user, roles=[ProjectDeveloper])
+
+    with django_assert_num_queries(1):
+        roles = roles_for_projects(user, [project1, project2])
+
+    assert roles == {
+        project1: {OutputPublisher, ProjectDeveloper},
+        project2: {OutputPublisher},
+    }
+
+
+def test_roles_for_projects_unauthenticated():
+    project = ProjectFactory()
+
+    assert roles_for_projects(AnonymousUser(), [project]) == {project: set()}
+
+
 def test_strings_to_roles_success():
     roles = strings_to_roles(["ProjectDeveloper"])
 
@@ -0,0 +1,59 @@
+import hashlib
+
+from django.core.management import call_command
+
+from jobserver import releases
+
+
+def test_dedupe_release_files(build_release_with_files, capsys, file_content):
+    first = build_release_with_files(["file1.txt"]).files.get()
+    second = build_release_with_files(["file2.txt"]).files.get()
+    blob = releases.blob_path(hashlib.sha256(file_content).hexdigest())
+
+    call_command("dedupe_release_files")
+
+    assert first.absolute_path().samefile(blob)
+    assert second.absolute_path().samefile(blob)
+    assert second.absolute_path().read_bytes() == file_content
+
+    output = capsys.readouterr().out.strip()
+    assert output == (
+        "linked 1, stored 1, skipped 0, missing 0, invalid 0, "
+        f"freed {len(file_content)} bytes"
+    )
+
+    # running again changes nothing
+    call_command("dedupe_release_files")
+
+    output = capsys.readouterr().out.strip()
+    assert output.startswith("linked 0, stored 0, skipped 2,")
+
+
+def test_dedupe_release_files_dry_run(build_release_with_files, capsys):
+    first = build_release_with_files(["file1.txt"]).files.get()
+    build_release_with_files(["file2.txt"])
+
+    call_command("dedupe_release_files", "--dry-run")
+
+    assert not releases.blob_path(first.filehash).exists()
+
+    output = capsys.readouterr().out.strip()
+    assert output.startswith("linked 1, stored 1, skipped 0,")
+
+
+def test_dedupe_release_files_with_bad_files(build_release_with_files, capsys):
+    missing = build_release_with_files(["file1.txt"]).files.get()
+    missing.absolute_path().unlink()
+
+    invalid = build_release_with_files(["file2.txt"]).files.get()
+    invalid.absolute_path().write_text("changed")
+
+    call_command("dedupe_release_files")
+
+    assert not releases.blob_path(invalid.filehash).exists()
+
+    captured = capsys.readouterr()
+    assert captured.out.startswith(
+        "linked 0, stored 0, skipped 0, missing 1, invalid 1"
+    )
+    assert "does not match its hash" in captured.err
@@ -1,5 +1,8 @@
+from django.db.models import F
 from django.urls import reverse
 
+from jobserver.models import Backend
+
 from ....factories import BackendFactory
 
 
@@ -35,7 +38,35 @@ def test_backend_rotate_token():
     assert backend.auth_token != "test"
 
 
+def test_backend_save_does_not_rewind_job_requests_version():
+    backend = BackendFactory()
+    stale = Backend.objects.get(pk=backend.pk)
+
+    Backend.objects.filter(pk=backend.pk).update(
+        job_requests_version=F("job_requests_version") + 1
+    )
+
+    stale.name = "new name"
+    stale.save()
+
+    backend.refresh_from_db()
+    assert backend.name == "new name"
+    assert backend.job_requests_version == 1
+
+
 def test_backend_str():
     backend = BackendFactory(slug="test-backend")
 
     assert str(backend) == "test-backend"
+
+
+def test_backend_save_auth_token_bumps_updated_at(freezer):
+    backend = BackendFactory()
+    updated_at = backend.updated_at
+
+    freezer.tick()
+    backend.auth_token = "new"
+    backend.save(update_fields=["auth_token"])
+
+    backend.refresh_from_db()
+    assert backend.updated_at > updated_at
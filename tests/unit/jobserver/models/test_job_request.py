@@ -5,7 +5,7 @@ from django.db import IntegrityError
 from django.urls import reverse
 from django.utils import timezone
 
-from jobserver.models import JobRequest
+from jobserver.models import Job, JobRequest
 
 from ....factories import (
     BackendFactory,
@@ -194,13 +194,13 @@ def test_jobrequest_previous_succeeded():
     backend = BackendFactory()
 
     job_request1 = JobRequestFactory(workspace=workspace, backend=backend)
-    job_request1.jobs.add(JobFactory(status="succeeded"))
-    job_request1.jobs.add(JobFactory(status="succeeded"))
+    JobFactory(job_request=job_request1, status="succeeded")
+    JobFactory(job_request=job_request1, status="succeeded")
 
     job_request2 = JobRequestFactory(workspace=workspace, backend=backend)
-    job_request2.jobs.add(JobFactory(status="succeeded"))
-    job_request2.jobs.add(JobFactory(status="failed"))
-    job_request2.jobs.add(JobFactory(status="zzzinvalidstatus"))
+    JobFactory(job_request=job_request2, status="succeeded")
+    JobFactory(job_request=job_request2, status="failed")
+    JobFactory(job_request=job_request2, status="zzzinvalidstatus")
 
     job_request3 = JobRequestFactory(workspace=workspace, backend=backend)
 
@@ -249,7 +249,7 @@ def test_jobrequest_runtime_one_job_missing_completed_at(freezer):
         completed_at=None,
     )
 
-    jr = JobRequest.objects.with_started_at().get(pk=job_request.pk)
+    jr = JobRequest.objects.get(pk=job_request.pk)
     assert jr.started_at
     assert not jr.completed_at
 
@@ -279,7 +279,7 @@ def test_jobrequest_runtime_one_job_missing_started_at(freezer):
         completed_at=timezone.now(),
     )
 
-    jr = JobRequest.objects.with_started_at().get(pk=job_request.pk)
+    jr = JobRequest.objects.get(pk=job_request.pk)
     assert jr.started_at
     assert jr.completed_at
 
@@ -293,7 +293,7 @@ def test_jobrequest_runtime_one_job_missing_started_at(freezer):
 
 def test_jobrequest_runtime_no_jobs():
     JobRequestFactory()
-    assert not JobRequest.objects.with_started_at().first().runtime
+    assert not JobRequest.objects.first().runtime
 
 
 def test_jobrequest_runtime_not_completed(freezer):
@@ -313,7 +313,7 @@ def test_jobrequest_runtime_not_completed(freezer):
         started_at=seconds_ago(now, 30),
     )
 
-    job_request = JobRequest.objects.with_started_at().first()
+    job_request = JobRequest.objects.first()
     assert job_request.started_at
     assert not job_request.completed_at
 
@@ -330,7 +330,7 @@ def test_jobrequest_runtime_not_started():
     JobFactory(job_request=jr, status="running")
     JobFactory(job_request=jr, status="pending")
 
-    assert not JobRequest.objects.with_started_at().first().runtime
+    assert not JobRequest.objects.first().runtime
 
 
 def test_jobrequest_runtime_success():
@@ -351,7 +351,7 @@ def test_jobrequest_runtime_success():
         completed_at=start + timedelta(minutes=3),
     )
 
-    job_request = JobRequest.objects.with_started_at().first()
+    job_request = JobRequest.objects.first()
     assert job_request.runtime
     assert job_request.runtime.hours == 0
     assert job_request.runtime.minutes == 2
@@ -418,26 +418,78 @@ def test_jobrequest_status_unknown():
     assert jr.status == "unknown"
 
 
-def test_jobrequest_status_uses_prefetch_cache(django_assert_num_queries):
+def test_jobrequest_status_does_not_query_jobs(django_assert_num_queries):
     for i in range(5):
         jr = JobRequestFactory()
-        JobFactory.create_batch(5, job_request=jr)
+        JobFactory.create_batch(5, job_request=jr, status="running")
+
+    with django_assert_num_queries(1):
+        statuses = [jr.status for jr in JobRequest.objects.all()]
 
-    with django_assert_num_queries(2):
-        # 1. select JobRequests
-        # 2. select Jobs for those JobRequests
-        [jr.status for jr in JobRequest.objects.with_started_at().all()]
+    assert statuses == ["running"] * 5
 
 
-def test_jobrequest_status_without_prefetching_jobs(django_assert_num_queries):
+def test_jobrequest_update_from_jobs():
     job_request = JobRequestFactory()
-    JobFactory.create_batch(5, job_request=job_request)
+    start = timezone.now() - timedelta(hours=1)
 
-    assert not hasattr(job_request, "_prefetched_objects_cache")
+    # bypass the factory hook so the JobRequest is only updated below
+    Job.objects.bulk_create(
+        [
+            Job(
+                job_request=job_request,
+                identifier="a",
+                status="succeeded",
+                started_at=start,
+                completed_at=start + timedelta(minutes=1),
+                updated_at=start + timedelta(minutes=1),
+            ),
+            Job(
+                job_request=job_request,
+                identifier="b",
+                status="failed",
+                started_at=start + timedelta(minutes=2),
+                completed_at=start + timedelta(minutes=4),
+                updated_at=start + timedelta(minutes=4),
+            ),
+        ]
+    )
+    assert job_request.status == "unknown"
 
-    job_request.status
+    job_request.update_from_jobs()
 
-    assert "jobs" in job_request._prefetched_objects_cache
+    job_request.refresh_from_db()
+    assert job_request.status == "failed"
+    assert job_request.started_at == start
+    assert job_request.completed_at == start + timedelta(minutes=4)
+    assert job_request.last_updated_at == start + timedelta(minutes=4)
+    assert job_request.runtime_seconds == 180
+    assert job_request.job_status_counts == {"failed": 1, "succeeded": 1}
+    assert job_request.num_completed == 1
+    assert job_request.num_jobs == 2
+
+
+def test_jobrequest_update_from_jobs_with_given_jobs(django_assert_num_queries):
+    job_request = JobRequestFactory()
+    job = JobFactory(job_request=job_request, status="running")
+    job.status = "succeeded"
+
+    # 1. update the JobRequest
+    # 2. bump its Backend's job_requests_version
+    # 3. notify anyone waiting on the Backend's JobRequests
+    with django_assert_num_queries(3):
+        job_request.update_from_jobs([job])
+
+    assert job_request.status == "succeeded"
+    assert job_request.job_status_counts == {"succeeded": 1}
+
+
+def test_jobrequest_update_from_jobs_unchanged(django_assert_num_queries):
+    job_request = JobRequestFactory()
+    job = JobFactory(job_request=job_request, status="running")
+
+    with django_assert_num_queries(0):
+        job_request.update_from_jobs([job])
 
 
 def test_jobrequest_str():
@@ -446,14 +498,18 @@ def test_jobrequest_str():
     assert str(job_request) == str(job_request.pk)
 
 
-def test_jobrequestmanager_with_started_at():
-    JobRequestFactory.create_batch(5)
-
-    workspace = WorkspaceFactory()
-    JobRequestFactory(workspace=workspace)
-    JobRequestFactory(workspace=workspace)
+def test_jobrequestqueryset_active():
+    no_jobs = JobRequestFactory()
+    pending = JobRequestFactory()
+    JobFactory(job_request=pending, status="pending")
+    running = JobRequestFactory()
+    JobFactory(job_request=running, status="running")
+    JobFactory(job_request=running, status="succeeded")
+    finished = JobRequestFactory()
+    JobFactory(job_request=finished, status="succeeded")
 
-    assert JobRequest.objects.with_started_at().filter(workspace=workspace).count() == 2
+    assert set(JobRequest.objects.active()) == {no_jobs, pending, running}
+    assert finished not in JobRequest.objects.active()
 
 
 def test_jobrequest_database_name_with_no_project_number(build_job_request):
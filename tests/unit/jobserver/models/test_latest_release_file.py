@@ -0,0 +1,155 @@
+from django.utils import timezone
+
+from jobserver.models import LatestReleaseFile, ReleaseFile
+from tests.factories import (
+    BackendFactory,
+    ReleaseFactory,
+    ReleaseFileFactory,
+    UserFactory,
+    WorkspaceFactory,
+)
+from tests.utils import minutes_ago
+
+
+def test_latestreleasefile_recorded_when_releasefile_created():
+    rfile = ReleaseFileFactory(name="output/file.txt")
+
+    latest = LatestReleaseFile.objects.get()
+
+    assert latest.workspace == rfile.workspace
+    assert latest.backend == rfile.release.backend
+    assert latest.name == "output/file.txt"
+    assert latest.release_file == rfile
+    assert latest.release_created_at == rfile.release.created_at
+
+
+def test_latestreleasefile_record_newer_release():
+    workspace = WorkspaceFactory()
+    backend = BackendFactory()
+    now = timezone.now()
+
+    older = ReleaseFactory(
+        workspace=workspace, backend=backend, created_at=minutes_ago(now, 2)
+    )
+    newer = ReleaseFactory(
+        workspace=workspace, backend=backend, created_at=minutes_ago(now, 1)
+    )
+
+    ReleaseFileFactory(release=older, workspace=workspace, name="file.txt")
+    rfile = ReleaseFileFactory(release=newer, workspace=workspace, name="file.txt")
+
+    assert LatestReleaseFile.objects.get().release_file == rfile
+
+
+def test_latestreleasefile_record_older_release():
+    workspace = WorkspaceFactory()
+    backend = BackendFactory()
+    now = timezone.now()
+
+    older = ReleaseFactory(
+        workspace=workspace, backend=backend, created_at=minutes_ago(now, 2)
+    )
+    newer = ReleaseFactory(
+        workspace=workspace, backend=backend, created_at=minutes_ago(now, 1)
+    )
+
+    rfile = ReleaseFileFactory(release=newer, workspace=workspace, name="file.txt")
+    ReleaseFileFactory(release=older, workspace=workspace, name="file.txt")
+
+    assert LatestReleaseFile.objects.get().release_file == rfile
+
+
+def test_latestreleasefile_record_many():
+    workspace = WorkspaceFactory()
+    backend = BackendFactory()
+    now = timezone.now()
+
+    older = ReleaseFactory(
+        workspace=workspace, backend=backend, created_at=minutes_ago(now, 2)
+    )
+    newer = ReleaseFactory(
+        workspace=workspace, backend=backend, created_at=minutes_ago(now, 1)
+    )
+    user = UserFactory()
+    # bulk_create skips ReleaseFile.save, as create_release does
+    rfiles = ReleaseFile.objects.bulk_create(
+        [
+            ReleaseFileFactory.build(
+                release=release, workspace=workspace, name=name, created_by=user
+            )
+            for release, name in [
+                (newer, "file.txt"),
+                (older, "file.txt"),
+                (older, "other.txt"),
+            ]
+        ]
+    )
+    assert not LatestReleaseFile.objects.exists()
+
+    LatestReleaseFile.objects.record(rfiles)
+
+    assert {f.name: f.release_file_id for f in LatestReleaseFile.objects.all()} == {
+        "file.txt": rfiles[0].pk,
+        "other.txt": rfiles[2].pk,
+    }
+
+
+def test_latestreleasefile_record_nothing():
+    LatestReleaseFile.objects.record([])
+
+    assert not LatestReleaseFile.objects.exists()
+
+
+def test_latestreleasefile_str():
+    rfile = ReleaseFileFactory(name="file.txt")
+
+    latest = LatestReleaseFile.objects.get()
+
+    assert str(latest) == f"{rfile.release.backend_id}/file.txt ({rfile.pk})"
+
+
+def test_latestreleasefile_record_compares_in_a_single_query(
+    django_assert_num_queries,
+):
+    workspace = WorkspaceFactory()
+    backend = BackendFactory()
+    now = timezone.now()
+
+    older = ReleaseFactory(
+        workspace=workspace, backend=backend, created_at=minutes_ago(now, 2)
+    )
+    newer = ReleaseFactory(
+        workspace=workspace, backend=backend, created_at=minutes_ago(now, 1)
+    )
+    rfile = ReleaseFileFactory(release=newer, workspace=workspace, name="file.txt")
+    user = UserFactory()
+    # as a concurrent request which read the recorded files before rfile was
+    # recorded would try to
+    stale = ReleaseFile.objects.bulk_create(
+        [
+            ReleaseFileFactory.build(
+                release=older, workspace=workspace, name="file.txt", created_by=user
+            )
+        ]
+    )
+
+    # there's no separate read of the recorded files for a concurrent write
+    # to slip in after
+    with django_assert_num_queries(1):
+        LatestReleaseFile.objects.record(stale)
+
+    assert LatestReleaseFile.objects.get().release_file == rfile
+
+
+def test_latestreleasefile_record_same_release_time():
+    workspace = WorkspaceFactory()
+    backend = BackendFactory()
+    now = timezone.now()
+
+    first = ReleaseFactory(workspace=workspace, backend=backend, created_at=now)
+    second = ReleaseFactory(workspace=workspace, backend=backend, created_at=now)
+
+    ReleaseFileFactory(release=first, workspace=workspace, name="file.txt")
+    rfile = ReleaseFileFactory(release=second, workspace=workspace, name="file.txt")
+
+    assert LatestReleaseFile.objects.get().release_file == rfile
@@ -34,8 +34,10 @@ MUTABLE_MODELS = [
         "jobserver.BackendMembership",
         "jobserver.Job",
         "jobserver.JobRequest",
+        "jobserver.LatestReleaseFile",
         "jobserver.Org",
         "jobserver.OrgMembership",
+        "jobserver.OutboxMessage",
         "jobserver.Project",
         "jobserver.ProjectCollaboration",
         "jobserver.PublishRequest",
@@ -308,6 +308,20 @@ UNPAIRED_FIELDS = [
     ),
     ("jobserver.Backend", "created_at", "updated_at"),
     ("jobserver.Job", "completed_at", "created_at", "started_at", "updated_at"),
+    (
+        "jobserver.JobRequest",
+        "completed_at",
+        "last_updated_at",
+        "started_at",
+    ),
+    ("jobserver.LatestReleaseFile", "release_created_at"),
+    (
+        "jobserver.OutboxMessage",
+        "created_at",
+        "delivered_at",
+        "failed_at",
+        "next_attempt_at",
+    ),
     ("jobserver.Project", "copilot_support_ends_at"),
     ("jobserver.ReleaseFile", "uploaded_at"),
     ("jobserver.User", "created_by", "login_token_expires_at", "pat_expires_at"),
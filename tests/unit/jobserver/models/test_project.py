@@ -41,6 +41,18 @@ def test_project_constraints_updated_at_and_updated_by_only_one_set():
         Project.objects.update(updated_at=None)
 
 
+def test_project_delete_bumps_members_level4_version(project_membership):
+    project = ProjectFactory()
+    user = project_membership(project=project).user
+    user.refresh_from_db()
+    version = user.level4_version
+
+    project.delete()
+
+    user.refresh_from_db()
+    assert user.level4_version == version + 1
+
+
 def test_project_get_absolute_url():
     project = ProjectFactory()
 
@@ -2,7 +2,7 @@ import pytest
 from django.urls import reverse
 from django.utils import timezone
 
-from jobserver.models import PublishRequest, Snapshot
+from jobserver.models import OutboxMessage, PublishRequest, Snapshot
 from jobserver.utils import set_from_qs
 from tests.factories import (
     PublishRequestFactory,
@@ -46,6 +46,27 @@ def test_publishrequest_approve_default_now(freezer):
     assert request.decision == PublishRequest.Decisions.APPROVED
 
 
+def test_publishrequest_approve_prewarms_archive(settings):
+    settings.OUTBOX_ENABLED = True
+    settings.RELEASE_ARCHIVE_PREWARM = True
+    request = PublishRequestFactory(snapshot=SnapshotFactory())
+
+    request.approve(user=UserFactory())
+
+    message = OutboxMessage.objects.get()
+    assert message.task == "jobserver.releases.warm_snapshot_archive"
+    assert message.kwargs["snapshot"]["pk"] == request.snapshot.pk
+
+
+def test_publishrequest_approve_without_prewarm(settings):
+    settings.OUTBOX_ENABLED = True
+    request = PublishRequestFactory(snapshot=SnapshotFactory())
+
+    request.approve(user=UserFactory())
+
+    assert not OutboxMessage.objects.exists()
+
+
 def test_publishrequest_create_from_files_success():
     workspace = WorkspaceFactory()
     rfile = ReleaseFileFactory(workspace=workspace)
@@ -102,6 +102,14 @@ def test_releasefile_get_latest_url():
     )
 
 
+def test_releasefile_get_upload_url():
+    rfile = ReleaseFileFactory()
+
+    url = rfile.get_upload_url()
+
+    assert url == reverse("api:release-upload", kwargs={"file_id": rfile.id})
+
+
 def test_releasefile_get_api_url_without_is_published():
     rfile = ReleaseFileFactory()
 
@@ -128,6 +136,20 @@ def test_releasefile_get_api_url_with_is_published():
     )
 
 
+def test_releasefile_save_bumps_workspace_files_version():
+    rfile = ReleaseFileFactory()
+
+    rfile.workspace.refresh_from_db()
+    assert rfile.workspace.files_version == 1
+
+    rfile.deleted_at = timezone.now()
+    rfile.deleted_by = UserFactory()
+    rfile.save()
+
+    rfile.workspace.refresh_from_db()
+    assert rfile.workspace.files_version == 2
+
+
 def test_releasefile_str():
     rfile = ReleaseFileFactory(id="12345", name="important/research.html")
 
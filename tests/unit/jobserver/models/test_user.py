@@ -268,6 +268,30 @@ def test_user_valid_pat_success():
     assert user.has_valid_pat(token)
 
 
+def test_user_valid_pat_cached(monkeypatch):
+    user = UserFactory()
+    token = user.rotate_token()
+
+    assert user.has_valid_pat(token)
+
+    # a verified token isn't hashed again
+    def fail(token):
+        raise AssertionError("token was hashed")
+
+    monkeypatch.setattr("jobserver.models.user.hash_user_pat", fail)
+    assert user.has_valid_pat(token)
+
+
+def test_user_valid_pat_after_rotating():
+    user = UserFactory()
+    token = user.rotate_token()
+    assert user.has_valid_pat(token)
+
+    user.rotate_token()
+
+    assert not user.has_valid_pat(token)
+
+
 def test_user_valid_pat_with_empty_token():
     user = UserFactory()
 
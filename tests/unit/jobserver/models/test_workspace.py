@@ -55,6 +55,82 @@ def test_workspace_constraints_missing_updated_at_or_updated_by():
         Workspace.objects.filter(pk=workspace.pk).update(updated_at=None)
 
 
+def test_workspace_bump_files_version():
+    workspace1 = WorkspaceFactory()
+    workspace2 = WorkspaceFactory()
+
+    Workspace.objects.bump_files_version([workspace1.pk])
+    Workspace.objects.bump_files_version([workspace1.pk, workspace2.pk])
+
+    workspace1.refresh_from_db()
+    workspace2.refresh_from_db()
+    assert workspace1.files_version == 2
+    assert workspace2.files_version == 1
+
+
+def test_workspace_save_does_not_rewind_files_version():
+    workspace = WorkspaceFactory()
+    stale = Workspace.objects.get(pk=workspace.pk)
+
+    Workspace.objects.bump_files_version([workspace.pk])
+
+    stale.purpose = "new purpose"
+    stale.save()
+
+    workspace.refresh_from_db()
+    assert workspace.purpose == "new purpose"
+    assert workspace.files_version == 1
+
+
+def test_workspace_save_bumps_members_level4_version(project_membership):
+    workspace = WorkspaceFactory()
+    user = project_membership(project=workspace.project).user
+    user.refresh_from_db()
+    version = user.level4_version
+
+    workspace.should_notify = True
+    workspace.save(update_fields=["should_notify"])
+    user.refresh_from_db()
+    assert user.level4_version == version
+
+    workspace.is_archived = True
+    workspace.save()
+    user.refresh_from_db()
+    assert user.level4_version == version + 1
+
+
+def test_workspace_save_moved_bumps_both_projects_level4_version(project_membership):
+    workspace = WorkspaceFactory()
+    new_project = ProjectFactory()
+    old_member = project_membership(project=workspace.project).user
+    new_member = project_membership(project=new_project).user
+    old_member.refresh_from_db()
+    new_member.refresh_from_db()
+    old_version = old_member.level4_version
+    new_version = new_member.level4_version
+
+    workspace = Workspace.objects.get(pk=workspace.pk)
+    workspace.project = new_project
+    workspace.save(update_fields=["project"])
+
+    old_member.refresh_from_db()
+    new_member.refresh_from_db()
+    assert old_member.level4_version == old_version + 1
+    assert new_member.level4_version == new_version + 1
+
+
+def test_workspace_delete_bumps_members_level4_version(project_membership):
+    workspace = WorkspaceFactory()
+    user = project_membership(project=workspace.project).user
+    user.refresh_from_db()
+    version = user.level4_version
+
+    workspace.delete()
+
+    user.refresh_from_db()
+    assert user.level4_version == version + 1
+
+
 def test_workspace_get_absolute_url():
     project = ProjectFactory()
     workspace = WorkspaceFactory(project=project)
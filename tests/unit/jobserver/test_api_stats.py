@@ -0,0 +1,67 @@
+from datetime import timedelta
+
+from django.utils import timezone
+
+from jobserver.api_stats import StatsRecorder
+from jobserver.models import Stats
+
+from ...factories import BackendFactory, StatsFactory
+
+
+def test_statsrecorder_record_with_no_interval(settings):
+    settings.API_STATS_FLUSH_INTERVAL = 0
+    backend = BackendFactory()
+
+    StatsRecorder().record(backend, "/foo/")
+
+    stats = Stats.objects.get(backend=backend, url="/foo/")
+    assert stats.api_last_seen is not None
+
+
+def test_statsrecorder_record_buffers_until_flushed(
+    settings, django_assert_num_queries
+):
+    settings.API_STATS_FLUSH_INTERVAL = 60
+    backend1 = BackendFactory()
+    backend2 = BackendFactory()
+    StatsFactory(backend=backend1, url="/foo/", api_last_seen=None)
+
+    recorder = StatsRecorder()
+    with django_assert_num_queries(0):
+        recorder.record(backend1, "/foo/")
+        recorder.record(backend1, "/foo/")
+        recorder.record(backend2, "/bar/")
+
+    assert not Stats.objects.exclude(api_last_seen=None).exists()
+
+    with django_assert_num_queries(1):
+        recorder.flush()
+
+    assert Stats.objects.count() == 2
+    assert not Stats.objects.filter(api_last_seen=None).exists()
+
+    # nothing left to write
+    with django_assert_num_queries(0):
+        recorder.flush()
+
+
+def test_statsrecorder_last_seen_includes_unflushed(settings):
+    settings.API_STATS_FLUSH_INTERVAL = 60
+    backend = BackendFactory()
+    stored = timezone.now() - timedelta(hours=1)
+    StatsFactory(backend=backend, url="/foo/", api_last_seen=stored)
+
+    recorder = StatsRecorder()
+    assert recorder.last_seen(backend) == stored
+
+    recorder.record(backend, "/bar/")
+    assert recorder.last_seen(backend) > stored
+
+    recorder.flush()
+
+
+def test_statsrecorder_last_seen_never_seen():
+    backend = BackendFactory()
+    StatsFactory(backend=backend, api_last_seen=None)
+
+    assert StatsRecorder().last_seen(backend) is None
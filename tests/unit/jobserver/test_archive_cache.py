@@ -0,0 +1,185 @@
+import os
+from pathlib import Path
+
+import pytest
+from django.utils import timezone
+
+from jobserver import archive_cache
+from jobserver.models import ReleaseFile
+from tests.factories import ReleaseFileFactory, UserFactory
+
+
+def build(key, chunks, release_files):
+    return b"".join(archive_cache.store(key, chunks, release_files))
+
+
+def test_fingerprint_ignores_order():
+    files = ReleaseFileFactory.create_batch(2)
+
+    assert archive_cache.fingerprint(files, "") == archive_cache.fingerprint(
+        list(reversed(files)), ""
+    )
+
+
+def test_fingerprint_changes_with_files():
+    first, second = ReleaseFileFactory.create_batch(2)
+
+    key = archive_cache.fingerprint([first], "")
+
+    assert key != archive_cache.fingerprint([first, second], "")
+
+    first.filehash = "0" * 64
+    assert key != archive_cache.fingerprint([first], "")
+
+
+def test_fingerprint_with_redacted_files():
+    rfile = ReleaseFileFactory()
+    before = archive_cache.fingerprint([rfile], "http://a/")
+
+    # the site's URL only matters once there's a redaction notice to link it
+    assert before == archive_cache.fingerprint([rfile], "http://b/")
+
+    rfile.deleted_at = timezone.now()
+    redacted = archive_cache.fingerprint([rfile], "http://a/")
+
+    assert redacted != before
+    assert redacted != archive_cache.fingerprint([rfile], "http://b/")
+
+    rfile.deleted_by = UserFactory()
+    assert redacted != archive_cache.fingerprint([rfile], "http://a/")
+
+
+def test_lookup_missing():
+    assert archive_cache.lookup("missing") is None
+
+
+def test_lookup_disabled(settings):
+    rfile = ReleaseFileFactory()
+    build("key", [b"data"], [rfile])
+
+    settings.RELEASE_ARCHIVE_CACHE_SIZE = 0
+
+    assert archive_cache.lookup("key") is None
+
+
+def test_lookup_marks_archive_used():
+    build("key", [b"data"], [ReleaseFileFactory()])
+    path = archive_cache.archive_path("key")
+    os.utime(path, (0, 0))
+
+    assert archive_cache.lookup("key") == path
+    assert path.stat().st_mtime > 0
+
+
+def test_store():
+    rfile = ReleaseFileFactory()
+
+    assert build("key", [b"a", b"b"], [rfile]) == b"ab"
+
+    assert archive_cache.archive_path("key").read_bytes() == b"ab"
+    assert sorted(p.name for p in archive_cache.cache_dir().iterdir()) == [
+        "key.json",
+        "key.zip",
+    ]
+
+
+def test_store_abandoned():
+    chunks = archive_cache.store("key", iter([b"a", b"b"]), [ReleaseFileFactory()])
+
+    assert next(chunks) == b"a"
+    chunks.close()
+
+    assert list(archive_cache.cache_dir().iterdir()) == []
+
+
+def test_store_error():
+    def chunks():
+        yield b"a"
+        raise OSError
+
+    with pytest.raises(OSError):
+        build("key", chunks(), [ReleaseFileFactory()])
+
+    assert list(archive_cache.cache_dir().iterdir()) == []
+
+
+def test_store_caching_error(monkeypatch):
+    def evict():
+        raise OSError
+
+    monkeypatch.setattr(archive_cache, "evict", evict)
+
+    # the archive has been sent, so the download still succeeds
+    assert build("key", [b"a", b"b"], [ReleaseFileFactory()]) == b"ab"
+
+    assert not list(archive_cache.cache_dir().glob("*.tmp"))
+
+
+def test_store_file_redacted_while_building():
+    rfile = ReleaseFileFactory()
+
+    def chunks():
+        yield b"a"
+        ReleaseFile.objects.filter(pk=rfile.pk).update(
+            deleted_at=timezone.now(), deleted_by=UserFactory()
+        )
+
+    build("key", chunks(), [rfile])
+
+    assert list(archive_cache.cache_dir().iterdir()) == []
+
+
+def test_store_evicts_least_recently_used(settings):
+    settings.RELEASE_ARCHIVE_CACHE_SIZE = 5
+    rfile = ReleaseFileFactory()
+
+    build("old", [b"aa"], [rfile])
+    build("used", [b"bb"], [rfile])
+    os.utime(archive_cache.archive_path("old"), (0, 0))
+    os.utime(archive_cache.archive_path("used"), (1, 1))
+    archive_cache.lookup("used")
+
+    build("new", [b"cc"], [rfile])
+
+    assert not archive_cache.archive_path("old").exists()
+    assert archive_cache.archive_path("used").exists()
+    assert archive_cache.archive_path("new").exists()
+
+
+def test_evict_archive_removed_concurrently(settings, monkeypatch):
+    settings.RELEASE_ARCHIVE_CACHE_SIZE = 1
+    archive_cache.cache_dir().mkdir(parents=True)
+    archive_cache.archive_path("gone").write_bytes(b"aa")
+    archive_cache.archive_path("kept").write_bytes(b"bb")
+
+    # another process removes an archive after we've listed the directory
+    glob = Path.glob
+
+    def listed_then_removed(self, pattern):
+        paths = list(glob(self, pattern))
+        archive_cache.remove("gone")
+        return paths
+
+    monkeypatch.setattr(Path, "glob", listed_then_removed)
+
+    archive_cache.evict()
+
+    assert not archive_cache.archive_path("kept").exists()
+
+
+def test_invalidate():
+    first, second = ReleaseFileFactory.create_batch(2)
+    build("first", [b"a"], [first])
+    build("both", [b"b"], [first, second])
+    build("second", [b"c"], [second])
+
+    archive_cache.invalidate(first)
+
+    assert sorted(p.stem for p in archive_cache.cache_dir().iterdir()) == [
+        "second",
+        "second",
+    ]
+
+
+def test_invalidate_without_cache():
+    archive_cache.invalidate(ReleaseFileFactory())
@@ -0,0 +1,42 @@
+import pytest
+
+from jobserver import job_request_events
+
+from ...factories import BackendFactory, JobRequestFactory
+
+
+@pytest.mark.django_db(transaction=True)
+def test_listener_wakes_on_job_request_change(job_request_listener):
+    backend = BackendFactory()
+
+    marker = job_request_listener.mark(backend.pk)
+    JobRequestFactory(backend=backend)
+
+    assert job_request_listener.wait(backend.pk, marker, timeout=5)
+
+
+@pytest.mark.django_db(transaction=True)
+def test_listener_ignores_other_backends(job_request_listener):
+    backend = BackendFactory()
+
+    marker = job_request_listener.mark(backend.pk)
+    JobRequestFactory()
+
+    assert not job_request_listener.wait(backend.pk, marker, timeout=0.5)
+
+
+def test_listener_stop_when_not_started():
+    listener = job_request_events.Listener()
+
+    listener.stop()
+
+    assert not listener.listening.is_set()
+
+
+@pytest.mark.django_db(transaction=True)
+def test_notify(job_request_listener):
+    marker = job_request_listener.mark(42)
+
+    job_request_events.notify(42)
+
+    assert job_request_listener.wait(42, marker, timeout=5)
@@ -3,10 +3,15 @@ from django.template.response import TemplateResponse
 from django.test.utils import override_settings
 from django.views.generic import DetailView, View
 
-from jobserver.middleware import ClientAddressIdentification, TemplateNameMiddleware
+from jobserver.authorization import ProjectDeveloper, has_permission
+from jobserver.middleware import (
+    ClientAddressIdentification,
+    RolesCacheMiddleware,
+    TemplateNameMiddleware,
+)
 from jobserver.models import Project
 
-from ...factories import BackendFactory, ProjectFactory
+from ...factories import BackendFactory, ProjectFactory, UserFactory
 
 
 @override_settings(BACKEND_IP_MAP={"1.2.3.4": "tpp"})
@@ -148,3 +153,17 @@ def test_template_name_middleware_with_template_name_as_a_string(rf):
     TemplateNameMiddleware(None).process_template_response(request, response)
 
     assert response.context_data["template_name"] == "my_template"
+
+
+def test_roles_cache_middleware(django_assert_num_queries, project_membership, rf):
+    project = ProjectFactory()
+    user = UserFactory()
+    project_membership(project=project, user=user, roles=[ProjectDeveloper])
+
+    def view(request):
+        assert has_permission(user, "job_run", project=project)
+        assert has_permission(user, "job_cancel", project=project)
+        return HttpResponse()
+
+    with django_assert_num_queries(1):
+        RolesCacheMiddleware(view)(rf.get("/"))
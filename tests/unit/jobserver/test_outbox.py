@@ -0,0 +1,175 @@
+from datetime import timedelta
+
+import pytest
+from django.core.management import call_command
+from django.utils import timezone
+
+from jobserver import outbox
+from jobserver.models import OutboxMessage
+from tests.factories import BackendFactory
+
+
+CALLS = []
+
+
+def record(**kwargs):
+    CALLS.append(kwargs)
+
+
+def explode(**kwargs):
+    raise Exception("third party is down")
+
+
+@pytest.fixture(autouse=True)
+def clear_calls():
+    CALLS.clear()
+
+
+@pytest.fixture
+def outbox_enabled(settings):
+    settings.OUTBOX_ENABLED = True
+
+
+def test_enqueue_when_disabled():
+    backend = BackendFactory()
+
+    outbox.enqueue(record, backend=backend, count=1)
+
+    assert CALLS == [{"backend": backend, "count": 1}]
+    assert not OutboxMessage.objects.exists()
+
+
+def test_enqueue_when_enabled(outbox_enabled):
+    backend = BackendFactory()
+
+    outbox.enqueue(record, backend=backend, count=1)
+
+    assert CALLS == []
+
+    message = OutboxMessage.objects.get()
+    assert message.task == "tests.unit.jobserver.test_outbox.record"
+    assert message.kwargs == {
+        "backend": {"model": "jobserver.backend", "pk": backend.pk},
+        "count": {"value": 1},
+    }
+
+
+def test_enqueue_when_enabled_with_unserializable_kwargs(outbox_enabled):
+    with pytest.raises(TypeError):
+        outbox.enqueue(record, thing=object())
+
+
+def test_deliver_success(outbox_enabled):
+    backend = BackendFactory()
+    outbox.enqueue(record, backend=backend, count=1)
+
+    assert outbox.deliver(OutboxMessage.objects.get())
+
+    # model instances are looked up again
+    assert CALLS == [{"backend": backend, "count": 1}]
+
+    message = OutboxMessage.objects.get()
+    assert message.attempts == 1
+    assert message.delivered_at
+    assert message.failed_at is None
+
+
+def test_deliver_with_error_is_retried(outbox_enabled, freezer):
+    outbox.enqueue(explode)
+
+    assert not outbox.deliver(OutboxMessage.objects.get())
+
+    message = OutboxMessage.objects.get()
+    assert message.attempts == 1
+    assert message.delivered_at is None
+    assert message.failed_at is None
+    assert message.last_error == "Exception('third party is down')"
+    assert message.next_attempt_at == timezone.now() + outbox.RETRY_DELAY
+
+
+def test_deliver_with_error_gives_up(outbox_enabled):
+    outbox.enqueue(explode)
+
+    assert not outbox.deliver(OutboxMessage.objects.get(), max_attempts=1)
+
+    message = OutboxMessage.objects.get()
+    assert message.attempts == 1
+    assert message.delivered_at is None
+    assert message.failed_at
+
+
+def test_get_retry_delay():
+    assert outbox.get_retry_delay(1) == outbox.RETRY_DELAY
+    assert outbox.get_retry_delay(3) == outbox.RETRY_DELAY * 4
+    assert outbox.get_retry_delay(20) == outbox.MAX_RETRY_DELAY
+
+
+def test_claim(outbox_enabled, freezer):
+    outbox.enqueue(record, count=1)
+    outbox.enqueue(record, count=2)
+    OutboxMessage.objects.filter(kwargs__count__value=2).update(
+        next_attempt_at=timezone.now() + timedelta(minutes=1)
+    )
+
+    # only due messages are claimed
+    (message,) = outbox.claim(batch_size=10)
+    assert message.kwargs["count"] == {"value": 1}
+
+    # and once claimed they aren't picked up again
+    assert outbox.claim(batch_size=10) == []
+
+    message.refresh_from_db()
+    assert message.next_attempt_at == timezone.now() + outbox.CLAIM_TIMEOUT
+
+
+def test_deliver_pending(outbox_enabled):
+    outbox.enqueue(record, count=1)
+    outbox.enqueue(explode)
+
+    assert outbox.deliver_pending() == (1, 1)
+    assert CALLS == [{"count": 1}]
+
+
+@pytest.mark.django_db(transaction=True)
+def test_deliver_pending_with_concurrency(outbox_enabled):
+    for i in range(5):
+        outbox.enqueue(record, count=i)
+
+    assert outbox.deliver_pending(concurrency=3) == (5, 0)
+    assert sorted(c["count"] for c in CALLS) == list(range(5))
+    assert not OutboxMessage.objects.filter(delivered_at=None).exists()
+
+
+def test_deliver_outbox_command(outbox_enabled, capsys):
+    outbox.enqueue(record, count=1)
+
+    call_command("deliver_outbox", "--once", "--concurrency=1")
+
+    assert capsys.readouterr().out.strip() == "Delivered 1, failed 0"
+    assert CALLS == [{"count": 1}]
+
+
+def test_deliver_outbox_command_with_nothing_to_deliver(capsys):
+    call_command("deliver_outbox", "--once")
+
+    assert capsys.readouterr().out == ""
+
+
+def test_prune():
+    now = timezone.now()
+    old = now - outbox.RETENTION - timedelta(minutes=1)
+    recent = now - outbox.RETENTION + timedelta(minutes=1)
+
+    OutboxMessage.objects.create(task="old.delivered", delivered_at=old)
+    OutboxMessage.objects.create(task="old.failed", failed_at=old)
+    OutboxMessage.objects.create(task="recent.delivered", delivered_at=recent)
+    OutboxMessage.objects.create(task="recent.failed", failed_at=recent)
+    OutboxMessage.objects.create(task="old.pending", created_at=old)
+
+    assert outbox.prune() == 2
+
+    assert set(OutboxMessage.objects.values_list("task", flat=True)) == {
+        "recent.delivered",
+        "recent.failed",
+        "old.pending",
+    }
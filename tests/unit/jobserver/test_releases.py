@@ -3,16 +3,18 @@ import io
 import zipfile
 
 import pytest
+from django.core.files.uploadedfile import SimpleUploadedFile
 from django.db import DatabaseError
 from django.utils import timezone
 from rest_framework.exceptions import NotFound
 
-from jobserver import releases
+from jobserver import archive_cache, releases
 from jobserver.models import ReleaseFile
 from jobserver.models.release_file import absolute_file_path
 from tests.factories import (
     BackendFactory,
     ReleaseFileFactory,
+    SnapshotFactory,
     UserFactory,
     WorkspaceFactory,
 )
@@ -24,8 +26,8 @@ def raise_error(**kwargs):
     raise DatabaseError("test error")
 
 
-def test_build_outputs_zip(release):
-    zf = releases.build_outputs_zip(release.files.all(), None)
+def test_stream_outputs_zip(release):
+    zf = io.BytesIO(b"".join(releases.stream_outputs_zip(release.files.all(), None)))
 
     with zipfile.ZipFile(zf, "r") as zip_obj:
         assert zip_obj.testzip() is None
@@ -42,7 +44,7 @@ def test_build_outputs_zip(release):
         assert zipped_contents == original_contents
 
 
-def test_build_outputs_zip_with_missing_files(build_release_with_files):
+def test_stream_outputs_zip_with_missing_files(build_release_with_files):
     release = build_release_with_files(["test1", "test3", "test5"])
 
     # create a couple of deleted files
@@ -57,7 +59,7 @@ def test_build_outputs_zip_with_missing_files(build_release_with_files):
     release.requested_files.append([{"name": "test2"}, {"name": "test4"}])
     files = release.files.order_by("name")
 
-    zf = releases.build_outputs_zip(files, lambda u: u)
+    zf = io.BytesIO(b"".join(releases.stream_outputs_zip(files, lambda u: u)))
 
     with zipfile.ZipFile(zf, "r") as zip_obj:
         assert zip_obj.testzip() is None
@@ -107,6 +109,81 @@ def test_create_release_reupload():
         )
 
 
+def test_create_release_reupload_among_many():
+    rfile = ReleaseFileFactory(name="file2.txt", filehash="hash2")
+
+    files = [
+        {
+            "name": f"file{i}.txt",
+            "sha256": f"hash{i}",
+            "size": 4,
+            "date": "2022-08-17T13:37Z",
+            "metadata": {},
+        }
+        for i in range(5)
+    ]
+
+    with pytest.raises(releases.ReleaseFileAlreadyExists, match="file2.txt"):
+        releases.create_release(
+            rfile.release.workspace,
+            rfile.release.backend,
+            rfile.release.created_by,
+            files,
+        )
+
+
+def test_create_release_same_name_or_hash_isnt_a_reupload():
+    first = ReleaseFileFactory(name="file1.txt", filehash="hash1")
+    ReleaseFileFactory(release=first.release, name="file2.txt", filehash="hash2")
+
+    # each name and each hash has been seen, but not as a pair
+    files = [
+        {
+            "name": "file1.txt",
+            "sha256": "hash2",
+            "size": 4,
+            "date": "2022-08-17T13:37Z",
+            "metadata": {},
+        },
+        {
+            "name": "file2.txt",
+            "sha256": "hash1",
+            "size": 4,
+            "date": "2022-08-17T13:37Z",
+            "metadata": {},
+        },
+    ]
+
+    release = releases.create_release(
+        first.release.workspace, first.release.backend, first.release.created_by, files
+    )
+
+    assert release.files.count() == 2
+
+
+def test_create_release_queries_dont_grow_with_files(django_assert_num_queries):
+    backend = BackendFactory()
+    workspace = WorkspaceFactory()
+    user = UserFactory()
+    files = [
+        {
+            "name": f"file{i}.txt",
+            "sha256": f"hash{i}",
+            "size": 4,
+            "date": "2022-08-17T13:37Z",
+            "metadata": {},
+        }
+        for i in range(50)
+    ]
+
+    # savepoint, duplicate check, release, files, current latest files, latest
+    # files, files version, release savepoint
+    with django_assert_num_queries(8):
+        release = releases.create_release(workspace, backend, user, files)
+
+    assert release.files.count() == 50
+
+
 def test_create_release_success():
     backend = BackendFactory()
     workspace = WorkspaceFactory()
@@ -133,6 +210,136 @@ def test_create_release_success():
     rfile.size == 7
 
 
+def test_stream_outputs_zip_compression(build_release_with_files, monkeypatch):
+    release = build_release_with_files(["output.csv", "plot.png"])
+
+    # read files in small chunks so each is streamed in several pieces
+    monkeypatch.setattr(releases, "UPLOAD_CHUNK_SIZE", 3)
+    chunks = list(releases.stream_outputs_zip(release.files.order_by("name"), None))
+
+    assert len(chunks) > 2
+    assert all(chunks)
+
+    with zipfile.ZipFile(io.BytesIO(b"".join(chunks)), "r") as zip_obj:
+        assert zip_obj.testzip() is None
+
+        # PNGs are already compressed so are stored as they are
+        assert zip_obj.getinfo("output.csv").compress_type == zipfile.ZIP_DEFLATED
+        assert zip_obj.getinfo("plot.png").compress_type == zipfile.ZIP_STORED
+
+
+def test_outputs_zip_response(rf, release):
+    response = releases.outputs_zip_response(
+        rf.get("/"), release.files.all(), filename="release.zip"
+    )
+
+    assert response["Content-Type"] == "application/zip"
+    assert response["Content-Disposition"] == 'attachment; filename="release.zip"'
+
+    zf = io.BytesIO(b"".join(response.streaming_content))
+    with zipfile.ZipFile(zf, "r") as zip_obj:
+        assert zip_obj.namelist() == ["file1.txt"]
+
+
+def test_outputs_zip_response_with_mod_zip(rf, build_release_with_files):
+    release = build_release_with_files(["a file.csv", "file1.txt"])
+    request = rf.get("/", headers={"Releases-Zip": "/storage"})
+
+    response = releases.outputs_zip_response(
+        request, release.files.order_by("name"), filename="release.zip"
+    )
+
+    assert response["X-Archive-Files"] == "zip"
+    assert response["Content-Disposition"] == 'attachment; filename="release.zip"'
+
+    prefix = f"/storage/{release.workspace.name}/releases/{release.id}"
+    assert response.content.decode().split("\r\n") == [
+        f"- 10 {prefix}/a%20file.csv a file.csv",
+        f"- 10 {prefix}/file1.txt file1.txt",
+        "",
+    ]
+
+
+def test_outputs_zip_response_with_mod_zip_and_redacted_file(rf, release):
+    ReleaseFileFactory(
+        release=release,
+        name="redacted.txt",
+        deleted_at=timezone.now(),
+        deleted_by=UserFactory(),
+    )
+    request = rf.get("/", headers={"Releases-Zip": "/storage"})
+
+    response = releases.outputs_zip_response(
+        request, release.files.all(), filename="release.zip"
+    )
+
+    # nginx can't add the redaction notice, so we build the zip ourselves
+    assert "X-Archive-Files" not in response
+    zf = io.BytesIO(b"".join(response.streaming_content))
+    with zipfile.ZipFile(zf, "r") as zip_obj:
+        assert set(zip_obj.namelist()) == {"file1.txt", "redacted.txt"}
+
+
+def test_outputs_zip_response_cached(rf, release):
+    first = releases.outputs_zip_response(
+        rf.get("/"), release.files.all(), filename="release.zip"
+    )
+    content = b"".join(first.streaming_content)
+
+    response = releases.outputs_zip_response(
+        rf.get("/"), release.files.all(), filename="release.zip"
+    )
+
+    assert response["Content-Type"] == "application/zip"
+    assert response["Content-Disposition"] == 'attachment; filename="release.zip"'
+    assert b"".join(response.streaming_content) == content
+
+
+def test_outputs_zip_response_cached_with_redirect(rf, release):
+    first = releases.outputs_zip_response(
+        rf.get("/"), release.files.all(), filename="release.zip"
+    )
+    b"".join(first.streaming_content)
+
+    request = rf.get("/", headers={"Releases-Redirect": "/storage"})
+    response = releases.outputs_zip_response(
+        request, release.files.all(), filename="release.zip"
+    )
+
+    key = archive_cache.fingerprint(release.files.all(), "")
+    assert response["X-Accel-Redirect"] == f"/storage/archives/{key}.zip"
+    assert response["Content-Disposition"] == 'attachment; filename="release.zip"'
+
+
+def test_outputs_zip_response_with_cache_disabled(rf, release, settings):
+    settings.RELEASE_ARCHIVE_CACHE_SIZE = 0
+
+    response = releases.outputs_zip_response(
+        rf.get("/"), release.files.all(), filename="release.zip"
+    )
+    b"".join(response.streaming_content)
+
+    assert not archive_cache.cache_dir().exists()
+
+
+def test_warm_snapshot_archive(monkeypatch, release):
+    snapshot = SnapshotFactory()
+    snapshot.files.set(release.files.all())
+
+    releases.warm_snapshot_archive(snapshot)
+
+    key = archive_cache.fingerprint(snapshot.files.all(), "")
+    path = archive_cache.archive_path(key)
+    with zipfile.ZipFile(path, "r") as zip_obj:
+        assert zip_obj.namelist() == ["file1.txt"]
+
+    # a second call reuses the cached archive rather than building another
+    monkeypatch.setattr(
+        releases, "stream_outputs_zip", lambda *args: pytest.fail("rebuilt")
+    )
+    releases.warm_snapshot_archive(snapshot)
+
+
 def test_handle_release_upload_file_created(build_release, file_content):
     release = build_release(["file1.txt"])
 
@@ -159,6 +366,7 @@ def test_handle_release_upload_exists_in_db_and_not_on_disk(file_content):
         name="file1.txt",
         path="foo/file1.txt",
         filehash=filehash,
+        size=len(file_content),
         uploaded_at=None,
     )
 
@@ -215,6 +423,259 @@ def test_handle_release_upload_exists_with_incorrect_filehash(file_content):
         )
 
 
+def test_handle_release_upload_exists_with_incorrect_filehash_cleans_up(
+    file_content,
+):
+    existing = ReleaseFileFactory(
+        name="file1.txt",
+        filehash="hash",
+        size=len(file_content),
+        uploaded_at=None,
+    )
+
+    with pytest.raises(releases.ReleaseFileHashMismatch):
+        releases.handle_file_upload(
+            existing.release,
+            existing.release.backend,
+            existing.created_by,
+            io.BytesIO(file_content),
+            "file1.txt",
+        )
+
+    # neither the final file or the temporary one it was written to are left
+    # on disk
+    directory = absolute_file_path(
+        f"{existing.release.workspace.name}/releases/{existing.release.id}"
+    )
+    assert list(directory.iterdir()) == []
+
+
+def test_handle_release_upload_larger_than_expected(file_content, monkeypatch):
+    existing = ReleaseFileFactory(
+        name="file1.txt",
+        filehash=hashlib.sha256(file_content).hexdigest(),
+        size=3,
+        uploaded_at=None,
+    )
+
+    # read in small chunks so we can check the upload isn't read any further
+    # than it needs to be
+    monkeypatch.setattr(releases, "UPLOAD_CHUNK_SIZE", 2)
+    stream = io.BytesIO(file_content)
+
+    with pytest.raises(releases.ReleaseFileHashMismatch):
+        releases.handle_file_upload(
+            existing.release,
+            existing.release.backend,
+            existing.created_by,
+            stream,
+            "file1.txt",
+        )
+
+    assert stream.tell() == 4
+
+    directory = absolute_file_path(
+        f"{existing.release.workspace.name}/releases/{existing.release.id}"
+    )
+    assert list(directory.iterdir()) == []
+
+
+def test_handle_release_upload_uploaded_file(build_release, file_content):
+    release = build_release(["file1.txt"])
+
+    upload = SimpleUploadedFile("file1.txt", file_content)
+
+    rfile = releases.handle_file_upload(
+        release,
+        release.backend,
+        release.created_by,
+        upload,
+        "file1.txt",
+    )
+
+    assert rfile.filehash == hashlib.sha256(file_content).hexdigest()
+    assert rfile.absolute_path().read_bytes() == file_content
+    assert list(rfile.absolute_path().parent.iterdir()) == [rfile.absolute_path()]
+
+
+def test_handle_release_upload_stores_file_once(build_release, file_content):
+    first = build_release(["file1.txt"])
+    second = build_release(["file1.txt"])
+
+    for release in [first, second]:
+        releases.handle_file_upload(
+            release,
+            release.backend,
+            release.created_by,
+            io.BytesIO(file_content),
+            "file1.txt",
+        )
+
+    first_path = first.files.get().absolute_path()
+    second_path = second.files.get().absolute_path()
+    blob = releases.blob_path(hashlib.sha256(file_content).hexdigest())
+
+    assert first_path.read_bytes() == file_content
+    assert first_path.samefile(blob)
+    assert second_path.samefile(blob)
+    assert blob.stat().st_nlink == 3
+
+
+def test_handle_release_upload_with_stored_file(build_release, file_content):
+    filehash = hashlib.sha256(file_content).hexdigest()
+
+    release = build_release(["file1.txt"])
+    releases.handle_file_upload(
+        release,
+        release.backend,
+        release.created_by,
+        io.BytesIO(file_content),
+        "file1.txt",
+    )
+
+    existing = ReleaseFileFactory(
+        name="file1.txt",
+        filehash=filehash,
+        size=len(file_content),
+        uploaded_at=None,
+    )
+
+    stream = io.BytesIO(file_content)
+    rfile = releases.handle_file_upload(
+        existing.release,
+        existing.release.backend,
+        existing.created_by,
+        stream,
+        "file1.txt",
+    )
+
+    # we already had this file so the upload was checked but not stored again
+    assert stream.tell() == len(file_content)
+    assert rfile.uploaded_at
+    assert rfile.absolute_path().samefile(releases.blob_path(filehash))
+    assert releases.blob_path(filehash).stat().st_nlink == 3
+
+
+def test_handle_release_upload_with_stored_file_hash_mismatch(
+    build_release, file_content
+):
+    filehash = hashlib.sha256(file_content).hexdigest()
+
+    release = build_release(["file1.txt"])
+    releases.handle_file_upload(
+        release,
+        release.backend,
+        release.created_by,
+        io.BytesIO(file_content),
+        "file1.txt",
+    )
+
+    existing = ReleaseFileFactory(
+        name="file1.txt",
+        filehash=filehash,
+        size=len(file_content),
+        uploaded_at=None,
+    )
+
+    with pytest.raises(releases.ReleaseFileHashMismatch):
+        releases.handle_file_upload(
+            existing.release,
+            existing.release.backend,
+            existing.created_by,
+            io.BytesIO(b"0" * len(file_content)),
+            "file1.txt",
+        )
+
+    existing.refresh_from_db()
+    assert not existing.uploaded_at
+    assert releases.blob_path(filehash).read_bytes() == file_content
+
+
+def test_handle_release_upload_stored_file_removed_concurrently(
+    file_content, monkeypatch
+):
+    filehash = hashlib.sha256(file_content).hexdigest()
+    blob = releases.blob_path(filehash)
+    blob.parent.mkdir(parents=True)
+    blob.write_bytes(file_content)
+
+    existing = ReleaseFileFactory(
+        name="file1.txt",
+        filehash=filehash,
+        size=len(file_content),
+        uploaded_at=None,
+    )
+
+    link_blob = releases.link_blob
+
+    def unlink_then_link_blob(filehash, absolute_path):
+        # as a concurrent _unlink() of the only other file linked to it would
+        blob.unlink()
+        link_blob(filehash, absolute_path)
+
+    monkeypatch.setattr(releases, "link_blob", unlink_then_link_blob)
+
+    rfile = releases.handle_file_upload(
+        existing.release,
+        existing.release.backend,
+        existing.created_by,
+        io.BytesIO(file_content),
+        "file1.txt",
+    )
+
+    assert rfile.uploaded_at
+    assert rfile.absolute_path().read_bytes() == file_content
+    assert rfile.absolute_path().samefile(blob)
+
+
+def test_delete_file_from_disk(build_release, file_content):
+    first = build_release(["file1.txt"])
+    second = build_release(["file1.txt"])
+
+    rfiles = [
+        releases.handle_file_upload(
+            release,
+            release.backend,
+            release.created_by,
+            io.BytesIO(file_content),
+            "file1.txt",
+        )
+        for release in [first, second]
+    ]
+    blob = releases.blob_path(rfiles[0].filehash)
+
+    releases.delete_file_from_disk(rfiles[0])
+
+    assert not rfiles[0].absolute_path().exists()
+    assert rfiles[1].absolute_path().read_bytes() == file_content
+
+    releases.delete_file_from_disk(rfiles[1])
+
+    assert not rfiles[1].absolute_path().exists()
+    assert not blob.exists()
+
+
+def test_delete_file_from_disk_invalidates_archives(rf, release):
+    rfile = release.files.first()
+    response = releases.outputs_zip_response(
+        rf.get("/"), [rfile], filename="release.zip"
+    )
+    b"".join(response.streaming_content)
+    key = archive_cache.fingerprint([rfile], "")
+
+    releases.delete_file_from_disk(rfile)
+
+    assert not archive_cache.archive_path(key).exists()
+
+
+def test_delete_file_from_disk_not_stored_by_hash(release):
+    rfile = release.files.first()
+
+    releases.delete_file_from_disk(rfile)
+
+    assert not rfile.absolute_path().exists()
+
+
 def test_handle_release_upload_db_error(monkeypatch, build_release):
     release = build_release(["file1.txt"])
 
@@ -231,6 +692,7 @@ def test_handle_release_upload_db_error(monkeypatch, build_release):
     # check the file has been deleted due to the error
     rpath = f"{release.workspace.name}/releases/{release.id}/file1.txt"
     assert not absolute_file_path(rpath).exists()
+    assert not releases.blob_path(hashlib.sha256(b"test").hexdigest()).exists()
 
 
 def test_serve_file(rf):
@@ -257,6 +719,97 @@ def test_serve_file_with_non_text_file(build_release, build_release_file, rf):
     assert response.headers["Content-Type"] == "application/json"
 
 
+def test_serve_file_not_modified(build_release_with_files, rf):
+    release = build_release_with_files(["file.txt"])
+    rfile = release.files.first()
+
+    etag = releases.serve_file(rf.get("/"), rfile).headers["ETag"]
+    assert etag == f'"{rfile.filehash}"'
+
+    request = rf.get("/", headers={"if-none-match": etag})
+    response = releases.serve_file(request, rfile)
+
+    assert response.status_code == 304
+    assert response.headers["ETag"] == etag
+
+
+def test_serve_file_not_modified_with_nginx_redirect(build_release_with_files, rf):
+    release = build_release_with_files(["file.txt"])
+    rfile = release.files.first()
+
+    request = rf.get(
+        "/",
+        headers={
+            "if-none-match": f'"{rfile.filehash}"',
+            "releases-redirect": "/storage",
+        },
+    )
+    response = releases.serve_file(request, rfile)
+
+    assert response.status_code == 304
+    assert "X-Accel-Redirect" not in response.headers
+
+
+def test_serve_file_with_range(build_release_with_files, rf):
+    release = build_release_with_files(["file.txt"])
+    rfile = release.files.first()
+    contents = rfile.absolute_path().read_bytes()
+
+    request = rf.get("/", headers={"range": "bytes=2-5"})
+    response = releases.serve_file(request, rfile)
+
+    assert response.status_code == 206
+    assert b"".join(response.streaming_content) == contents[2:6]
+    assert response.headers["Content-Length"] == "4"
+    assert response.headers["Content-Range"] == f"bytes 2-5/{len(contents)}"
+    assert response.headers["Content-Type"] == "text/plain; charset=utf-8"
+
+
+def test_serve_file_with_stale_if_range(build_release_with_files, rf):
+    release = build_release_with_files(["file.txt"])
+    rfile = release.files.first()
+
+    request = rf.get("/", headers={"range": "bytes=2-5", "if-range": '"stale"'})
+    response = releases.serve_file(request, rfile)
+
+    assert response.status_code == 200
+    assert b"".join(response.streaming_content) == rfile.absolute_path().read_bytes()
+
+
+def test_serve_file_with_unsatisfiable_range(build_release_with_files, rf):
+    release = build_release_with_files(["file.txt"])
+    rfile = release.files.first()
+    size = rfile.absolute_path().stat().st_size
+
+    request = rf.get("/", headers={"range": f"bytes={size}-"})
+    response = releases.serve_file(request, rfile)
+
+    assert response.status_code == 416
+    assert response.headers["Content-Range"] == f"bytes */{size}"
+
+
+@pytest.mark.parametrize(
+    "header,expected",
+    [
+        ("bytes=0-9", (0, 10)),
+        ("bytes=90-", (90, 10)),
+        ("bytes=90-200", (90, 10)),
+        ("bytes=-10", (90, 10)),
+        ("bytes=-200", (0, 100)),
+        ("bytes=0-1,5-6", None),
+        ("items=0-1", None),
+    ],
+)
+def test_parse_range(header, expected):
+    assert releases.parse_range(header, 100) == expected
+
+
+@pytest.mark.parametrize("header", ["bytes=100-", "bytes=5-1", "bytes=-0"])
+def test_parse_range_unsatisfiable(header):
+    with pytest.raises(ValueError):
+        releases.parse_range(header, 100)
+
+
 def test_workspace_files_no_releases():
     workspace = WorkspaceFactory()
 
@@ -336,3 +889,176 @@ def test_workspace_files_many_releases(freezer, build_release_with_files):
         "backend1/test2": release3.files.get(name="test2"),
         "backend2/test1": release6.files.get(name="test1"),
     }
+
+
+@pytest.fixture
+def pending_file(file_content):
+    """A ReleaseFile which is waiting for its file to be uploaded"""
+    return ReleaseFileFactory(
+        name="output/file.txt",
+        filehash=hashlib.sha256(file_content).hexdigest(),
+        size=len(file_content),
+        uploaded_at=None,
+    )
+
+
+def upload_chunks(rfile, content, size):
+    for start in range(0, len(content), size):
+        chunk = content[start : start + size]
+        releases.write_upload_chunk(
+            rfile,
+            io.BytesIO(chunk),
+            start,
+            len(chunk),
+            hashlib.sha256(chunk).hexdigest(),
+        )
+
+
+def test_resumable_upload(pending_file, file_content):
+    assert releases.start_upload(pending_file) == 0
+
+    upload_chunks(pending_file, file_content, 4)
+    assert releases.get_upload_offset(pending_file) == len(file_content)
+
+    rfile = releases.finish_upload(pending_file)
+
+    rfile.refresh_from_db()
+    assert rfile.uploaded_at
+    assert (
+        rfile.path
+        == f"{rfile.release.workspace.name}/releases/{rfile.release.id}/output/file.txt"
+    )
+    assert rfile.absolute_path().read_bytes() == file_content
+    assert rfile.absolute_path().samefile(releases.blob_path(rfile.filehash))
+    assert not releases.upload_path(rfile).exists()
+
+
+def test_start_upload_resumes(pending_file, file_content):
+    releases.start_upload(pending_file)
+    upload_chunks(pending_file, file_content[:4], 4)
+
+    assert releases.start_upload(pending_file) == 4
+
+
+def test_start_upload_already_uploaded(pending_file):
+    pending_file.uploaded_at = timezone.now()
+
+    with pytest.raises(releases.ReleaseFileAlreadyExists):
+        releases.start_upload(pending_file)
+
+
+def test_start_upload_with_stored_file(pending_file, file_content):
+    blob = releases.blob_path(pending_file.filehash)
+    blob.parent.mkdir(parents=True)
+    blob.write_bytes(file_content)
+
+    # we have the file, but still need to check the upload matches it
+    assert releases.start_upload(pending_file) == 0
+    upload_chunks(pending_file, file_content, 4)
+
+    rfile = releases.finish_upload(pending_file)
+
+    assert rfile.absolute_path().samefile(blob)
+    assert not releases.upload_path(pending_file).exists()
+
+
+def test_finish_upload_stored_file_removed_concurrently(pending_file, file_content):
+    blob = releases.blob_path(pending_file.filehash)
+    blob.parent.mkdir(parents=True)
+    blob.write_bytes(file_content)
+
+    releases.start_upload(pending_file)
+    upload_chunks(pending_file, file_content, 4)
+
+    # as a concurrent _unlink() of the only other file linked to it would
+    blob.unlink()
+
+    rfile = releases.finish_upload(pending_file)
+
+    assert rfile.absolute_path().read_bytes() == file_content
+    assert rfile.absolute_path().samefile(blob)
+    assert blob.stat().st_nlink == 2
+    assert not releases.upload_path(pending_file).exists()
+
+
+def test_finish_upload_with_stored_file_hash_mismatch(pending_file, file_content):
+    blob = releases.blob_path(pending_file.filehash)
+    blob.parent.mkdir(parents=True)
+    blob.write_bytes(file_content)
+
+    releases.start_upload(pending_file)
+    upload_chunks(pending_file, b"0" * len(file_content), 4)
+
+    with pytest.raises(releases.ReleaseFileHashMismatch):
+        releases.finish_upload(pending_file)
+
+    assert not releases.upload_path(pending_file).exists()
+    assert blob.read_bytes() == file_content
+
+
+def test_get_upload_offset_not_started(pending_file):
+    with pytest.raises(releases.ReleaseFileUploadNotStarted):
+        releases.get_upload_offset(pending_file)
+
+
+def test_write_upload_chunk_not_started(pending_file):
+    with pytest.raises(releases.ReleaseFileUploadNotStarted):
+        releases.write_upload_chunk(pending_file, io.BytesIO(b"a"), 0, 1, "")
+
+
+def test_write_upload_chunk_wrong_offset(pending_file, file_content):
+    releases.start_upload(pending_file)
+    upload_chunks(pending_file, file_content[:4], 4)
+
+    chunk = file_content[2:6]
+    with pytest.raises(releases.ReleaseFileUploadOffsetMismatch) as exc:
+        releases.write_upload_chunk(
+            pending_file, io.BytesIO(chunk), 2, 4, hashlib.sha256(chunk).hexdigest()
+        )
+
+    assert exc.value.offset == 4
+
+
+@pytest.mark.parametrize(
+    "sent,length,checksum",
+    [
+        # doesn't match its checksum
+        (b"abcd", 4, hashlib.sha256(b"abce").hexdigest()),
+        # shorter than its range
+        (b"ab", 4, hashlib.sha256(b"ab").hexdigest()),
+    ],
+)
+def test_write_upload_chunk_mismatch(pending_file, sent, length, checksum):
+    releases.start_upload(pending_file)
+    upload_chunks(pending_file, b"0123", 4)
+
+    with pytest.raises(releases.ReleaseFileHashMismatch):
+        releases.write_upload_chunk(pending_file, io.BytesIO(sent), 4, length, checksum)
+
+    # the bad chunk was discarded
+    assert releases.upload_path(pending_file).read_bytes() == b"0123"
+
+
+def test_finish_upload_already_uploaded(pending_file):
+    pending_file.uploaded_at = timezone.now()
+
+    with pytest.raises(releases.ReleaseFileAlreadyExists):
+        releases.finish_upload(pending_file)
+
+
+def test_finish_upload_not_started(pending_file):
+    with pytest.raises(releases.ReleaseFileUploadNotStarted):
+        releases.finish_upload(pending_file)
+
+
+def test_finish_upload_hash_mismatch(pending_file, file_content):
+    releases.start_upload(pending_file)
+    upload_chunks(pending_file, file_content[:4], 4)
+
+    with pytest.raises(releases.ReleaseFileHashMismatch):
+        releases.finish_upload(pending_file)
+
+    # the upload is thrown away so it can be started again
+    assert not releases.upload_path(pending_file).exists()
+    pending_file.refresh_from_db()
+    assert pending_file.uploaded_at is None
@@ -50,7 +50,7 @@ def test_index_authenticated(
     request = rf.get("/")
     request.user = user
 
-    with django_assert_num_queries(15):
+    with django_assert_num_queries(13):
         response = Index.as_view()(request)
 
         assert len(response.context_data["all_job_requests"]) == 10
@@ -84,7 +84,7 @@ def test_index_unauthenticated(rf, django_assert_num_queries):
     request = rf.get("/")
     request.user = AnonymousUser()
 
-    with django_assert_num_queries(3):
+    with django_assert_num_queries(2):
         response = Index.as_view()(request)
         assert len(response.context_data["all_job_requests"]) == 10
 
@@ -1218,7 +1218,7 @@ def test_jobrequestdetail_with_permission_num_queries(
     request = rf.get("/")
     request.user = user
 
-    with django_assert_num_queries(9):
+    with django_assert_num_queries(8):
         response = JobRequestDetail.as_view()(
             request,
             project_slug=job_request.workspace.project.slug,
@@ -1227,7 +1227,7 @@ def test_jobrequestdetail_with_permission_num_queries(
         )
         assert response.status_code == 200
 
-    with django_assert_num_queries(4):
+    with django_assert_num_queries(3):
         response.render()
 
 
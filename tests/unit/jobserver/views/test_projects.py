@@ -417,7 +417,7 @@ def test_projecteventlog_num_queries(rf, django_assert_num_queries):
         response = ProjectEventLog.as_view()(request, project_slug=project.slug)
         assert response.status_code == 200
 
-    with django_assert_num_queries(6):
+    with django_assert_num_queries(5):
         response.render()
 
 
@@ -124,6 +124,7 @@ def test_publishedsnapshotfile_success(rf, release):
     assert b"".join(response.streaming_content) == rfile.absolute_path().read_bytes()
     assert response.headers["Content-Type"] == "text/plain; charset=utf-8"
     assert response.headers["Last-Modified"]
+    assert response.headers["ETag"] == f'"{rfile.filehash}"'
 
 
 def test_publishedsnapshotfile_with_unknown_release_file(rf):
@@ -685,7 +685,7 @@ def test_usereventlog_num_queries(rf, django_assert_num_queries):
         response = UserEventLog.as_view()(request, username=user.username)
         assert response.status_code == 200
 
-    with django_assert_num_queries(9):
+    with django_assert_num_queries(8):
         response.render()
 
 
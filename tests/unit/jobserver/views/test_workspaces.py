@@ -1,3 +1,4 @@
+import io
 import zipfile
 from datetime import timedelta
 
@@ -974,7 +975,8 @@ def test_workspacelatestoutputsdownload_success(
     assert response.status_code == 200
 
     # check the returned file has the 3 files in it
-    with zipfile.ZipFile(response.file_to_stream, "r") as zip_obj:
+    zf = io.BytesIO(b"".join(response.streaming_content))
+    with zipfile.ZipFile(zf, "r") as zip_obj:
         assert zip_obj.testzip() is None
 
         assert set(zip_obj.namelist()) == {"test1", "test2", "test3"}
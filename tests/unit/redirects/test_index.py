@@ -0,0 +1,48 @@
+from datetime import timedelta
+
+from django.utils import timezone
+
+from redirects.index import RedirectIndex
+from redirects.models import Redirect
+
+from ...factories import ProjectFactory, RedirectFactory, UserFactory
+
+
+def test_redirectindex_match_longest_prefix():
+    shortest = RedirectFactory(old_url="/abc/", project=ProjectFactory())
+    longest = RedirectFactory(old_url="/abc/123/", project=ProjectFactory())
+    index = RedirectIndex()
+
+    assert index.match("/abc/123/test/") == longest.pk
+    assert index.match("/abc/123") == shortest.pk
+    assert index.match("/def/") is None
+
+
+def test_redirectindex_rebuilds_when_stamp_changes(settings):
+    settings.REDIRECTS_INDEX_CHECK_INTERVAL = 0
+    index = RedirectIndex()
+
+    assert index.match("/abc/") is None
+
+    # bypass Redirect.save() as another process would
+    redirect = RedirectFactory.build(
+        old_url="/abc/", project=ProjectFactory(), created_by=UserFactory()
+    )
+    Redirect.objects.bulk_create([redirect])
+
+    assert index.match("/abc/") == redirect.pk
+
+
+def test_redirectindex_drops_expired_redirects(freezer):
+    redirect = RedirectFactory(
+        old_url="/abc/",
+        project=ProjectFactory(),
+        expires_at=timezone.now() + timedelta(minutes=1),
+    )
+    index = RedirectIndex()
+
+    assert index.match("/abc/") == redirect.pk
+
+    freezer.tick(timedelta(minutes=2))
+
+    assert index.match("/abc/") is None
@@ -1,6 +1,13 @@
+from django.utils import timezone
+
 from redirects.middleware import RedirectsMiddleware
 
-from ...factories import ProjectFactory, RedirectFactory, WorkspaceFactory
+from ...factories import (
+    ProjectFactory,
+    RedirectFactory,
+    UserFactory,
+    WorkspaceFactory,
+)
 
 
 def get_response(request):
@@ -52,3 +59,32 @@ def test_redirect_with_wildcard_in_path(rf):
     response = RedirectsMiddleware(get_response)(request)
 
     assert response.url == w2.get_absolute_url()
+
+
+def test_redirectsmiddleware_ignores_expired_and_deleted_redirects(rf):
+    RedirectFactory(
+        old_url="/abc/", project=ProjectFactory(), expires_at=timezone.now()
+    )
+    RedirectFactory(
+        old_url="/abc/123/",
+        project=ProjectFactory(),
+        deleted_at=timezone.now(),
+        deleted_by=UserFactory(),
+    )
+
+    request = rf.get("/abc/123/")
+
+    response = RedirectsMiddleware(get_response)(request)
+
+    assert response == "no match"
+
+
+def test_redirectsmiddleware_unknown_url_uses_index(django_assert_num_queries, rf):
+    RedirectFactory(old_url="/abc/123/", project=ProjectFactory())
+    middleware = RedirectsMiddleware(get_response)
+
+    # build the index
+    middleware(rf.get("/"))
+
+    with django_assert_num_queries(0):
+        assert middleware(rf.get("/def/")) == "no match"